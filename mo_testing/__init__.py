@@ -9,8 +9,30 @@
 #
 import os
 
-from mo_testing.fuzzytestcase import FuzzyTestCase, assertAlmostEqual, add_error_reporting
-
 IS_WINDOWS = os.name == "nt"
+os.environ.setdefault("TESTING", "1")  # AS fuzzytestcase DOES, WHICH IS NO LONGER IMPORTED HERE
+
+__all__ = ["IS_WINDOWS", "FuzzyTestCase", "assertAlmostEqual", "add_error_reporting", "compile_expected", "freeze"]
+
+# NAME -> MODULE, IMPORTED ON FIRST USE, SO mo_testing.mocks (OR IS_WINDOWS) DOES NOT LOAD THE COMPARISON ENGINE
+_lazy = {
+    "FuzzyTestCase": "mo_testing.fuzzytestcase",
+    "assertAlmostEqual": "mo_testing.fuzzytestcase",
+    "add_error_reporting": "mo_testing.fuzzytestcase",
+    "compile_expected": "mo_testing.matcher",
+    "freeze": "mo_testing.frozen",
+}
+
+
+def __getattr__(name):
+    module = _lazy.get(name)
+    if module is None:
+        raise AttributeError(f"module 'mo_testing' has no attribute {name!r}")
+    from importlib import import_module
+
+    value = globals()[name] = getattr(import_module(module), name)
+    return value
+
 
-__all__ = ["IS_WINDOWS", "FuzzyTestCase", "assertAlmostEqual", "add_error_reporting"]
+def __dir__():
+    return sorted(set(globals()) | set(_lazy))
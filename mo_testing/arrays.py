@@ -0,0 +1,306 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from array import array
+
+from mo_testing.frozen import FrozenList
+
+MAX_REPORTED = 10  # MISMATCHED INDEXES SHOWN IN THE FAILURE MESSAGE
+_array_types = {("numpy", "ndarray"), ("pandas", "Series"), ("pandas", "DataFrame")}
+_numeric_kinds = "iuf"  # numpy dtype.kind OF int, unsigned AND float
+
+
+def is_array(value):
+    """
+    :return: True IF value IS A numpy ARRAY, OR A pandas Series OR DataFrame
+    """
+    return is_array_class(value.__class__)
+
+
+def is_array_class(_class):
+    return (_class.__module__.split(".")[0], _class.__name__) in _array_types
+
+
+def to_list(value):
+    """
+    :return: THE PLAIN list OF ARRAY value; A DataFrame IS A list OF RECORDS
+    """
+    if value.__class__.__name__ == "DataFrame":
+        return value.to_dict("records")
+    return value.tolist()
+
+
+def compare_array(test, plan, path, context, compare, mismatch):
+    """
+    COMPARE AN ARRAY (OR FRAME) test WITH plan, WITH VECTOR OPERATIONS WHERE POSSIBLE
+    :param context: Context OF THE COMPARISON
+    :param compare: FUNCTION(test, plan, path, context) TO COMPARE ONE ELEMENT
+    :param mismatch: FUNCTION(template, params, path, cause) TO MAKE THE EXCEPTION TO RAISE
+    """
+    name = test.__class__.__name__
+    if name == "DataFrame":
+        return _compare_frame(test, plan, path, context, compare, mismatch)
+    if name == "Series":
+        if plan.is_data:
+            return compare(test.to_dict(), plan, path, context)
+        test = test.to_numpy()
+
+    if plan.is_set or plan.is_data or not plan.is_many:
+        return compare(test.tolist(), plan, path, context)
+
+    failures = _Failures()
+    if test.ndim > 1:
+        elements = plan.elements
+        for i in range(max(len(test), len(elements))):
+            e = elements[i] if i < len(elements) else None
+            if e is None:
+                continue
+            row = test[i] if i < len(test) else None
+            if row is not None and not e.is_many:
+                row = row.tolist()
+            failures.check(i, compare, row, e, (path, i, True), context)
+    else:
+        column = plan.arrays.get("vector")
+        if column is None:
+            column = plan.arrays["vector"] = _Column.of_plan(plan)
+        _compare_vector(failures, test, column, lambda i: (path, i, True), context, compare)
+    failures.report(max(len(test), len(plan.expected)), path, mismatch)
+
+
+def _compare_frame(frame, plan, path, context, compare, mismatch):
+    if plan.is_data:
+        # {column: values}
+        for k, key, e in plan.items:
+            column = frame[k] if k in frame.columns else None
+            compare(column, e, (path, key, False), context)
+        return
+
+    if plan.is_set or not plan.is_many:
+        return compare(frame.to_dict("records"), plan, path, context)
+
+    records = plan.elements
+    if not any(e.is_data for e in records):
+        # A LIST OF VALUES IS COMPARED WITH THE FIRST COLUMN
+        return compare(frame[frame.columns[0]], plan, path, context)
+    if not all(e.is_data or e.kind == "nothing" for e in records):
+        return compare(frame.to_dict("records"), plan, path, context)
+
+    # LIST OF RECORDS, COMPARED ONE COLUMN AT A TIME
+    columns = plan.arrays.get("columns")
+    if columns is None:
+        elements = {}
+        for i, record in enumerate(records):
+            if record.is_data:
+                for k, key, e in record.items:
+                    elements.setdefault(key, [None] * len(records))[i] = e
+        columns = plan.arrays["columns"] = {key: _Column.of_plans(e) for key, e in elements.items()}
+
+    failures = _Failures()
+    for key, column in columns.items():
+        values = frame[key].to_numpy() if key in frame.columns else _nothing(len(frame))
+        _compare_vector(
+            failures, values[: len(records)], column, lambda i: ((path, i, True), key, False), context, compare, key,
+        )
+    failures.report(max(len(frame), len(records)) * len(columns), path, mismatch)
+
+
+def _compare_vector(failures, values, column, path_of, context, compare, key=None):
+    """
+    COMPARE ONE-DIMENSIONAL values WITH THE EXPECTED column
+    :param key: THE COLUMN OF A FRAME, SO FAILURES ARE REPORTED BY (ROW, COLUMN)
+    """
+    if key is not None:
+        failures = _Cells(failures, key)
+    import numpy
+
+    numbers, known, free = column.numbers, column.known, column.free
+    size = min(len(values), column.size)
+    if values.dtype.kind in _numeric_kinds:
+        test = values[:size].astype(numpy.float64)
+        expect = numbers[:size]
+        todo = numpy.flatnonzero(known[:size] & (test != expect))
+        if len(todo):
+            bad = todo[~_close(test[todo], expect[todo], context.tolerance)]
+            for i in bad[:MAX_REPORTED]:
+                i = int(i)
+                failures.check(i, compare, values[i].item(), column.element(i), path_of(i), context)
+            failures.count += max(0, len(bad) - MAX_REPORTED)
+        slow = numpy.flatnonzero(~known[:size] & ~free[:size])
+    else:
+        slow = numpy.flatnonzero(~free[:size])
+
+    for i in slow:
+        i = int(i)
+        value = values[i]
+        value = value.item() if hasattr(value, "item") else value
+        failures.check(i, compare, value, column.element(i), path_of(i), context)
+
+    for i in numpy.flatnonzero(~free[size:]):
+        i = int(i) + size
+        failures.check(i, compare, None, column.element(i), path_of(i), context)
+
+
+class _Column:
+    """
+    EXPECTED VALUES OF ONE VECTOR
+    numbers - THE EXPECTED NUMBER
+    known - True IF THE ELEMENT IS A PLAIN NUMBER, SO CAN BE COMPARED AS A VECTOR
+    free - True IF ANYTHING MATCHES
+    element - FUNCTION(i) RETURNS THE PLAN OF ELEMENT i
+    """
+
+    __slots__ = ["size", "numbers", "known", "free", "element"]
+
+    def __init__(self, numbers, known, free, element):
+        self.size = len(numbers)
+        self.numbers = numbers
+        self.known = known
+        self.free = free
+        self.element = element
+
+    @classmethod
+    def of_plan(cls, plan):
+        """
+        THE ELEMENTS OF plan; PLAIN NUMBERS ARE READ WITHOUT MAKING A PLAN FOR EACH
+        """
+        import numpy
+
+        expected = plan.expected
+        if expected.__class__ is FrozenList:
+            expected = expected.values  # AN array, IF ITS NUMBERS ARE PACKED
+        if (
+            plan.has_elements
+            or expected.__class__ not in (list, tuple, array)
+            or (expected.__class__ is not array and not set(map(type, expected)) <= {int, float})
+        ):
+            return cls.of_plans(plan.elements)
+        numbers = numpy.array(expected, dtype=numpy.float64)
+        free = numpy.isnan(numbers)  # NaN IS NULL, WHICH MATCHES ANYTHING
+        return cls(numbers, ~free, free, plan.element)
+
+    @classmethod
+    def of_plans(cls, elements):
+        import numpy
+
+        size = len(elements)
+        numbers = numpy.zeros(size, dtype=numpy.float64)
+        known = numpy.zeros(size, dtype=bool)
+        free = numpy.zeros(size, dtype=bool)
+        for i, e in enumerate(elements):
+            if e is None or e.kind == "nothing":
+                free[i] = True
+            elif e.number is not None and e.kind in ("text", "structure") and not e.missing:
+                numbers[i] = e.number
+                known[i] = True
+        return cls(numbers, known, free, elements.__getitem__)
+
+
+def _close(test, expected, tolerance):
+    """
+    VECTOR VERSION OF Tolerance.compare(): True WHERE test IS CLOSE ENOUGH TO expected
+    """
+    import numpy
+
+    if tolerance.ambiguous:
+        return numpy.zeros(len(test), dtype=bool)
+
+    with numpy.errstate(all="ignore"):
+        diff = numpy.abs(test - expected)
+        if tolerance.digits is not None:
+            return numpy.rint(diff * pow(10, tolerance.digits)) == 0
+        if tolerance.delta is not None:
+            return diff <= tolerance.delta
+
+        places = 15 if tolerance.places is None else tolerance.places
+        magnitude = numpy.log(numpy.abs(test)) / numpy.log(10)
+        score = numpy.log(diff) / numpy.log(10) - (numpy.floor(magnitude) + 1) + places
+        close = score < -0.3
+
+        # numpy MAY ROUND log() DIFFERENTLY THAN math; CHECK NEAR-BOUNDARY VALUES ONE AT A TIME
+        edge = (numpy.abs(score + 0.3) < 1e-9) | (numpy.abs(magnitude - numpy.rint(magnitude)) < 1e-9)
+        for i in numpy.flatnonzero(edge):
+            try:
+                tolerance.compare(float(test[i]), float(expected[i]), None)
+                close[i] = True
+            except Exception:
+                close[i] = False
+        return close
+
+
+def _nothing(size):
+    import numpy
+
+    return numpy.full(size, None, dtype=object)
+
+
+class _Failures:
+    """
+    COUNT THE MISMATCHES, BUT KEEP ONLY THE FIRST FEW
+    """
+
+    __slots__ = ["count", "first"]
+
+    def __init__(self):
+        self.count = 0
+        self.first = []  # (index, cause) PAIRS
+
+    def check(self, index, compare, test, plan, path, context):
+        try:
+            compare(test, plan, path, context)
+        except Exception as cause:
+            self.count += 1
+            self.first.append((index, cause))
+            if len(self.first) > MAX_REPORTED * 2:
+                self.first.sort(key=lambda f: f[0])
+                del self.first[MAX_REPORTED:]
+
+    def report(self, total, path, mismatch):
+        if not self.count:
+            return
+        self.first.sort(key=lambda f: f[0])
+        first = sorted(set(i for i, _ in self.first[:MAX_REPORTED]))
+        if first[0].__class__ is tuple:
+            # (ROW, COLUMN) OF A FRAME, SHOWN AS JSON POINTERS BELOW path
+            from mo_testing.diff import pointer
+
+            raise mismatch(
+                "{count} of {total} cells do not match, starting at {first}",
+                {"count": self.count, "total": total, "first": [pointer(((None, i, True), k, False)) for i, k in first]},
+                path,
+                self.first[0][1],
+            )
+        raise mismatch(
+            "{count} of {total} elements do not match, starting at index {first}",
+            {"count": self.count, "total": total, "first": first},
+            path,
+            self.first[0][1],
+        )
+
+
+class _Cells:
+    """
+    THE _Failures OF ONE COLUMN OF A FRAME, KEPT BY (ROW, COLUMN)
+    """
+
+    __slots__ = ["failures", "key"]
+
+    def __init__(self, failures, key):
+        self.failures = failures
+        self.key = key
+
+    @property
+    def count(self):
+        return self.failures.count
+
+    @count.setter
+    def count(self, value):
+        self.failures.count = value
+
+    def check(self, index, compare, test, plan, path, context):
+        self.failures.check((index, self.key), compare, test, plan, path, context)
@@ -0,0 +1,18 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+"""
+SYNTHETIC WORKLOADS TO MEASURE THE SPEED, AND PEAK MEMORY, OF THE FUZZY COMPARISON
+
+    python -m mo_testing.benchmarks --output new.json --baseline old.json --threshold 0.2
+
+EXITS WITH 1 IF ANY WORKLOAD IS SLOWER, OR BIGGER, THAN THE BASELINE BY MORE THAN THE THRESHOLD
+"""
+from mo_testing.benchmarks.runner import compare_results, measure, run_benchmarks
+from mo_testing.benchmarks.workloads import WORKLOADS, Workload
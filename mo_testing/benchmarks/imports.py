@@ -0,0 +1,54 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import subprocess
+import sys
+
+MODULES = ["mo_testing", "mo_testing.mocks", "mo_testing.fuzzytestcase"]  # IMPORTS TO MEASURE
+
+
+def import_time(module):
+    """
+    :return: SECONDS TO IMPORT module, AND ALL IT IMPORTS, IN A NEW PROCESS, AS REPORTED BY python -X importtime
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module], capture_output=True, text=True, check=True,
+    )
+    top = module.split(".")[0]
+    total = 0
+    for line in process.stderr.splitlines():
+        # import time:  self | cumulative | imported package (INDENTED BY NESTING)
+        columns = line.split("|")
+        if len(columns) != 3:
+            continue
+        _, cumulative, name = columns
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            # A HEADER, OR A NESTED IMPORT, WHICH IS IN ITS PARENT'S CUMULATIVE TIME
+            continue
+        name = name.strip()
+        if name == module:
+            return int(cumulative) / 1e6
+        if name.split(".")[0] == top:
+            total += int(cumulative)
+    return total / 1e6
+
+
+def measure_import(module, repeat=5):
+    """
+    :return: dict OF THE RESULT, LIKE runner.measure()
+    """
+    best = min(import_time(module) for _ in range(max(1, repeat)))
+    return {
+        "name": "import:" + module,
+        "unit": "imports",
+        "count": 1,
+        "seconds": best,
+        "per_second": 1 / best if best else None,
+        "peak_bytes": None,
+    }
@@ -0,0 +1,158 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import argparse
+import gc
+import json
+import platform
+import sys
+import tracemalloc
+from timeit import default_timer
+
+from mo_testing.benchmarks.imports import MODULES, measure_import
+from mo_testing.benchmarks.workloads import WORKLOADS
+
+DEFAULT_THRESHOLD = 0.2  # 20% SLOWER (OR BIGGER) THAN THE BASELINE IS A REGRESSION
+FORMAT_VERSION = 1
+
+
+def measure(workload, scale=1.0, repeat=5):
+    """
+    RUN workload repeat TIMES FOR THE BEST TIME, AND ONCE MORE UNDER tracemalloc FOR THE PEAK MEMORY
+    :return: dict OF THE RESULT
+    """
+    task, count = workload.build(scale)
+    task()  # WARM UP
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = default_timer()
+        task()
+        duration = default_timer() - start
+        best = duration if best is None else min(best, duration)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        task()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "name": workload.name,
+        "unit": workload.unit,
+        "count": count,
+        "seconds": best,
+        "per_second": count / best if best else None,
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmarks(names=None, scale=1.0, repeat=5, log=None):
+    """
+    :param names: NAMES OF THE WORKLOADS TO RUN (DEFAULT ALL)
+    :param log: FUNCTION(result) CALLED AS EACH RESULT IS READY
+    :return: MACHINE-READABLE RESULTS, FOR json.dump()
+    """
+    imports = ["import:" + m for m in MODULES]
+    unknown = set(names or []) - {w.name for w in WORKLOADS} - set(imports)
+    if unknown:
+        raise ValueError("unknown workloads: " + ", ".join(sorted(unknown)))
+    results = {}
+    for workload in WORKLOADS:
+        if names and workload.name not in names:
+            continue
+        result = results[workload.name] = measure(workload, scale, repeat)
+        if log:
+            log(result)
+    for name, module in zip(imports, MODULES):
+        if names and name not in names:
+            continue
+        result = results[name] = measure_import(module, repeat)
+        if log:
+            log(result)
+    return {
+        "version": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    :return: LIST OF REGRESSIONS, EACH {name, measure, baseline, current, ratio}
+    ONLY WORKLOADS IN BOTH RESULTS, RUN AT THE SAME scale, ARE COMPARED
+    """
+    if baseline.get("scale") != current.get("scale"):
+        raise ValueError("can not compare results of different scale")
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        for key in ("seconds", "peak_bytes"):
+            old, new = before.get(key), now.get(key)
+            if not old or new is None:
+                continue
+            ratio = new / old
+            if ratio > 1 + threshold:
+                regressions.append({"name": name, "measure": key, "baseline": old, "current": new, "ratio": ratio})
+    return regressions
+
+
+def _show(result):
+    peak = result["peak_bytes"]
+    print(
+        f"{result['name']:<32} {result['count']:>9} {result['unit']:<7}"
+        f" {result['seconds'] * 1000:>10.1f} ms {result['per_second']:>14,.0f} {result['unit']}/second"
+        + ("" if peak is None else f" {peak / 1e6:>10.1f} MB peak"),
+        flush=True,
+    )
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m mo_testing.benchmarks", description="measure the speed of the fuzzy comparison"
+    )
+    parser.add_argument("names", nargs="*", help="workloads to run (default all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the size of every workload")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per workload; the best time is kept")
+    parser.add_argument("--output", help="write the results, as JSON, to this file")
+    parser.add_argument("--baseline", help="results of an earlier run, to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown, as a fraction")
+    parser.add_argument("--list", action="store_true", help="list the workloads, and exit")
+    options = parser.parse_args(args)
+
+    if options.list:
+        for workload in WORKLOADS:
+            print(workload.name)
+        for module in MODULES:
+            print("import:" + module)
+        return 0
+
+    results = run_benchmarks(options.names, options.scale, options.repeat, log=_show)
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    if not options.baseline:
+        return 0
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare_results(baseline, results, options.threshold)
+    for r in regressions:
+        print(
+            f"REGRESSION {r['name']} {r['measure']}: {r['baseline']:.6g} -> {r['current']:.6g} ({r['ratio']:.2f}x)",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
@@ -0,0 +1,198 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import datetime
+import json
+import random
+
+from mo_dots import to_data
+from mo_times import dates
+
+from mo_testing.fuzzytestcase import (
+    FuzzyTestCase,
+    add_error_reporting,
+    assertAlmostEqual,
+    assertAlmostEqualValue,
+)
+from mo_testing.matcher import compile_expected
+
+
+class Workload:
+    """
+    A SYNTHETIC WORKLOAD
+    build(scale) RETURNS (task, count), WHERE task() RUNS IT ONCE AND count IS THE NUMBER OF unit IT COVERS
+    """
+
+    __slots__ = ["name", "unit", "build"]
+
+    def __init__(self, name, unit, build):
+        self.name = name
+        self.unit = unit
+        self.build = build
+
+
+def _size(base, scale):
+    return max(1, int(base * scale))
+
+
+def count_nodes(value):
+    """
+    :return: NUMBER OF dict, list AND LEAF VALUES IN value
+    """
+    total = 0
+    todo = [value]
+    while todo:
+        value = todo.pop()
+        total += 1
+        if isinstance(value, dict):
+            todo.extend(value.values())
+        elif isinstance(value, (list, tuple, set)):
+            todo.extend(value)
+    return total
+
+
+def _record(i):
+    return {"id": i, "name": "n" + str(i), "value": i * 1.5, "tags": ["a", "b"], "sub": {"x": i, "y": [1, 2, 3]}}
+
+
+def wide_json(scale):
+    # ONE OBJECT WITH MANY PROPERTIES; test HAS MORE PROPERTIES THAN expected
+    size = _size(20_000, scale)
+    expected = {"k" + str(i): _record(i) for i in range(size)}
+    test = {k: dict(v, extra=True) for k, v in expected.items()}
+    test["unexpected"] = 1
+    return lambda: assertAlmostEqual(test, expected, places=6), count_nodes(expected)
+
+
+def deep_json(scale):
+    # EXPRESSION-LIKE NESTING, ALTERNATING OBJECTS AND LISTS
+    def nested(depth, leaf):
+        value = leaf
+        for i in range(depth):
+            value = {"op": "and", "args": [value, {"x": i}]} if i % 2 else [value, i]
+        return value
+
+    depth = _size(5_000, scale)
+    test, expected = nested(depth, 1.0), nested(depth, 1)
+    return lambda: assertAlmostEqual(test, expected), count_nodes(expected)
+
+
+def set_of_dicts(scale):
+    # UNORDERED ROWS, WITH FLOATS THAT ARE ONLY CLOSE
+    size = _size(5_000, scale)
+    expected = {to_data({"name": "row" + str(i), "v": i + 1.1}) for i in range(size)}
+    test = [{"name": "row" + str(i), "v": i + 1.1 + 1e-9, "extra": i} for i in range(size)]
+    random.Random(42).shuffle(test)
+    return lambda: assertAlmostEqual(test, expected, places=6), size * 3
+
+
+def numeric_arrays(scale):
+    # LONG LISTS OF FLOATS, COMPARED TO SIGNIFICANT places
+    size = _size(200_000, scale)
+    expected = [(i + 1) * 1.1 for i in range(size)]
+    test = [v * (1 + 1e-12) for v in expected]
+    return lambda: assertAlmostEqual(test, expected, places=6), size
+
+
+def compiled_records(scale):
+    # THE SAME expected MATCHED MANY TIMES
+    size = _size(5_000, scale)
+    expected = [_record(i) for i in range(size)]
+    test = [dict(e, extra=1) for e in expected]
+    matcher = compile_expected(expected)
+    return lambda: matcher(test), count_nodes(expected)
+
+
+def exact_json(scale):
+    # A PASSING ASSERTION WHERE test IS AN EQUAL COPY OF expected, CHECKED WITH exact
+    size = _size(20_000, scale)
+    expected = {"k" + str(i): _record(i) for i in range(size)}
+    test = json.loads(json.dumps(expected))
+    return lambda: assertAlmostEqual(test, expected, places=6, exact=True), count_nodes(expected)
+
+
+def wide_table(scale):
+    # A LIST OF FLAT RECORDS, WITH MANY COLUMNS OF TEXT AND NUMBERS
+    size = _size(5_000, scale)
+    expected = [
+        {**{"s" + str(c): "v" + str(i + c) for c in range(10)}, **{"n" + str(c): i * 1.5 + c for c in range(10)}}
+        for i in range(size)
+    ]
+    test = [dict(e, extra=True) for e in expected]
+    return lambda: assertAlmostEqual(test, expected, places=6), count_nodes(expected)
+
+
+def date_records(scale):
+    # TIMESTAMPS AS TEXT AND NUMBERS, EXPECTED AS DATES
+    size = _size(5_000, scale)
+    start = datetime.datetime(2024, 1, 1)
+    moments = [start + datetime.timedelta(minutes=i % 1440) for i in range(size)]
+    expected = [{"when": m, "unix": dates.Date(m)} for m in moments]
+    test = [{"when": m.strftime("%Y-%m-%d %H:%M:%S"), "unix": dates.Date(m).unix} for m in moments]
+    return lambda: assertAlmostEqual(test, expected), size * 2
+
+
+def scalar_values(scale):
+    # MANY SMALL CALLS TO assertAlmostEqualValue
+    size = _size(100_000, scale)
+    values = [(i, i * 0.5, "s" + str(i), i % 2 == 0, None)[i % 5] for i in range(size)]
+    close = [v + 1e-12 if isinstance(v, float) else v for v in values]
+
+    def task():
+        for t, e in zip(close, values):
+            assertAlmostEqualValue(t, e, places=6)
+
+    return task, size
+
+
+def failures(scale):
+    # ASSERTIONS THAT FAIL, CAUGHT BY assertRaises()
+    size = _size(1_000, scale)
+    testcase = FuzzyTestCase()
+    cases = [({"a": [1, 2, {"b": i}]}, {"a": [1, 2, {"b": i + 1}]}) for i in range(size)]
+
+    def task():
+        for test, expected in cases:
+            with testcase.assertRaises("does not match expected"):
+                assertAlmostEqual(test, expected)
+
+    return task, size
+
+
+def error_reporting(scale):
+    # PASSING TESTS, WRAPPED BY add_error_reporting
+    size = _size(100_000, scale)
+
+    @add_error_reporting
+    class Suite(FuzzyTestCase):
+        def test_nothing(self):
+            pass
+
+    test = Suite("test_nothing").test_nothing
+
+    def task():
+        for _ in range(size):
+            test()
+
+    return task, size
+
+
+WORKLOADS = [
+    Workload("wide_json", "nodes", wide_json),
+    Workload("deep_json", "nodes", deep_json),
+    Workload("set_of_dicts", "nodes", set_of_dicts),
+    Workload("numeric_arrays", "nodes", numeric_arrays),
+    Workload("compiled_records", "nodes", compiled_records),
+    Workload("exact_json", "nodes", exact_json),
+    Workload("wide_table", "nodes", wide_table),
+    Workload("date_records", "nodes", date_records),
+    Workload("scalar_values", "calls", scalar_values),
+    Workload("failures", "calls", failures),
+    Workload("error_reporting", "calls", error_reporting),
+]
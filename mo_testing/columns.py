@@ -0,0 +1,156 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from itertools import chain
+
+from mo_testing.frozen import FrozenData, FrozenList
+
+MIN_ROWS = 64  # SHORTER LISTS OF RECORDS ARE COMPARED ROW BY ROW
+
+# HOW A COLUMN IS COMPARED
+TEXT = "text"  # ALL str; EQUAL str MATCH
+NUMBER = "number"  # ALL int OR float; CLOSE-ENOUGH int OR float MATCH
+VALUE = "value"  # ALL OF ONE CLASS (bool, date, ...); EQUAL VALUES OF THE SAME CLASS MATCH
+GENERIC = "generic"  # ANYTHING ELSE; EVERY CELL IS COMPARED ON ITS OWN
+_value_classes = {"bool", "date", "datetime", "Date", "Decimal"}
+_none_type = type(None)
+_MAX_INT = 2 ** 53  # BIGGER int ARE LEFT TO THE ENGINE, WHICH EXPECTS float() TO OVERFLOW
+_record_classes = ({dict}, {FrozenData}, {dict, FrozenData})
+
+
+class Records:
+    """
+    AN expected LIST OF RECORDS (PLAIN dict, OR FrozenData), ONE Column PER PROPERTY
+    """
+
+    __slots__ = ["size", "columns"]
+
+    def __init__(self, size, columns):
+        self.size = size
+        self.columns = columns
+
+    @classmethod
+    def of_plan(cls, plan):
+        """
+        :return: Records OF plan, OR None IF plan IS NOT A LIST OF RECORDS
+        """
+        rows = plan.expected
+        if rows.__class__ is FrozenList:
+            rows = rows.values
+        if rows.__class__ not in (list, tuple) or len(rows) < 2:
+            return None
+        if set(map(type, rows)) not in _record_classes or not all(rows):
+            return None
+        keys = dict.fromkeys(chain.from_iterable(rows))  # ALL PROPERTIES, IN ORDER FIRST SEEN
+        if set(map(type, keys)) != {str} or "" in keys:
+            return None
+        return cls(len(rows), [Column.of_values(k, [row.get(k) for row in rows]) for k in keys])
+
+
+class Column:
+    """
+    THE expected VALUES OF ONE PROPERTY, None WHERE ANYTHING MATCHES
+    """
+
+    __slots__ = ["key", "kind", "values", "plans"]
+
+    def __init__(self, key, kind, values):
+        self.key = key
+        self.kind = kind
+        self.values = values
+        self.plans = {}  # ROW -> Plan, FOR THE CELLS COMPARED ON THEIR OWN
+
+    @classmethod
+    def of_values(cls, key, values):
+        classes = set(map(type, values))
+        nothing = {c for c in classes if c is _none_type or c.__name__ == "NullType"}
+        if nothing or float in classes:
+            # null (AND NaN) MATCH ANYTHING
+            values = [None if v.__class__ in nothing or (v.__class__ is float and v != v) else v for v in values]
+            classes -= nothing
+        if classes <= {str}:
+            return cls(key, TEXT, values)
+        if classes <= {int, float}:
+            if classes != {float} or nothing:
+                values = [None if v is None else float(v) for v in values]
+            return cls(key, NUMBER, values)
+        if len(classes) == 1 and next(iter(classes)).__name__ in _value_classes:
+            return cls(key, VALUE, values)
+        return cls(key, GENERIC, values)
+
+    def uncertain(self, cells, tolerance):
+        """
+        :return: INDEXES OF THE cells THAT MAY NOT MATCH; THE REST CERTAINLY DO
+        """
+        kind, values = self.kind, self.values
+        if kind is TEXT:
+            return [
+                i for i, (t, e) in enumerate(zip(cells, values)) if e is not None and (t.__class__ is not str or t != e)
+            ]
+        if kind is NUMBER:
+            if tolerance.ambiguous:
+                # LET THE ENGINE EXPLAIN
+                return [i for i, e in enumerate(values[: len(cells)]) if e is not None]
+            close = tolerance.close
+            return [
+                i
+                for i, (t, e) in enumerate(zip(cells, values))
+                if e is not None
+                and not (
+                    (t.__class__ is float or (t.__class__ is int and -_MAX_INT < t < _MAX_INT))
+                    and (t == e or close(t, e))
+                )
+            ]
+        if kind is VALUE:
+            return [
+                i
+                for i, (t, e) in enumerate(zip(cells, values))
+                if e is not None and not (t.__class__ is e.__class__ and t == e)
+            ]
+        return [i for i, e in enumerate(values[: len(cells)]) if e is not None and cells[i] is not e]
+
+    def plan(self, row, make_plan):
+        plan = self.plans.get(row)
+        if plan is None:
+            plan = self.plans[row] = make_plan(self.values[row])
+        return plan
+
+
+def walk_records(test, plan, records, path, context, start, matches, make_plan):
+    """
+    COMPARE THE LIST OF dict test WITH THE expected records, ONE COLUMN AT A TIME
+    ONLY THE CELLS A COLUMN CAN NOT PROVE MATCH ARE COMPARED ON THEIR OWN, AND ONLY THE ROWS WITH A MISMATCHED CELL
+    ARE COMPARED AS A WHOLE, IN ORDER, SO A FAILURE IS THE SAME AS THE ROW-BY-ROW COMPARISON WOULD RAISE
+    :param start: _start() OF THE ENGINE; THIS YIELDS THE GENERATORS IT RETURNS
+    :param matches: FUNCTION(test, plan, path, context) RETURNS True IF test MATCHES
+    :param make_plan: FUNCTION(expected) RETURNS A Plan
+    """
+    size = min(len(test), records.size)
+    rows = test if size == len(test) else test[:size]
+    tolerance = context.tolerance
+    bad = set()  # ROWS WITH A MISMATCHED CELL
+    for column in records.columns:
+        key = column.key
+        cells = [row.get(key) for row in rows]
+        for i in column.uncertain(cells, tolerance):
+            if i in bad:
+                continue
+            if not matches(cells[i], column.plan(i, make_plan), ((path, i, True), key, False), context):
+                bad.add(i)
+
+    for i in sorted(bad):
+        child = start(test[i], plan.element(i), (path, i, True), context)
+        if child is not None:
+            yield child
+
+    # ROWS BEYOND THE SHORTER LIST, AS zip_longest() WOULD PAIR THEM
+    for i in range(size, records.size):
+        child = start(None, plan.element(i), (path, i, True), context)
+        if child is not None:
+            yield child
@@ -0,0 +1,173 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import json
+import re
+
+from mo_dots import from_data
+from mo_logs.strings import expand_template
+
+from mo_testing.dispatch import TYPES
+from mo_testing.frozen import FrozenData, FrozenList
+
+MAX_SNIPPET = 200  # LONGEST TEXT SHOWN FOR A VALUE
+ELLIPSIS = "..."
+_COMPARED = ("test", "expected", "t", "e", "value")  # TEMPLATE PARAMETERS THAT ARE COMPARED VALUES
+_compared = re.compile(r"\{(" + "|".join(_COMPARED) + r")(\|[^}]*)?\}")
+
+
+def first_difference(mismatch):
+    """
+    :param mismatch: THE Mismatch RAISED BY THE COMPARISON
+    :return: {path, expected, actual, reason}, WHERE path IS A JSON POINTER, AND THE REST ARE SHORT TEXT
+    THE COMPARISON STOPS AT THE FIRST DIFFERENCE, SO ONLY ITS CHAIN OF CAUSES IS KNOWN; THE OTHERS ARE NOT FOUND
+    THE COST DEPENDS ON THE DEPTH OF THE MISMATCH, NOT THE SIZE OF THE DATA
+    """
+    chain = []  # OUTERMOST FIRST
+    cause = mismatch
+    while hasattr(cause, "template") and hasattr(cause, "path"):
+        chain.append(cause)
+        cause = cause.cause
+
+    path = None
+    values = None
+    for problem in reversed(chain):
+        if path is None and problem.path is not None:
+            path = problem.path
+        params = problem.params
+        if values is None and not problem.assertion:
+            # THE VALUES OF AN assertion MAY BE CONVERTED, FOR COMPARISON
+            if "test" in params and "expected" in params:
+                values = params["test"], params["expected"]
+            elif "t" in params and "e" in params:
+                values = params["t"], params["e"]
+        if path is not None and values is not None:
+            break
+
+    leaf = chain[-1]
+    if values is None and "test" in leaf.params:
+        values = leaf.params["test"], leaf.params.get("expected")
+    if cause is not None:
+        # AN expected FUNCTION RAISED SOMETHING OTHER THAN A Mismatch
+        reason = _first_line(str(cause))
+    else:
+        reason = " ".join(expand_template(leaf.template, {k: _small(v) for k, v in leaf.params.items()}).split())
+    actual, expected = values if values is not None else (None, None)
+    return {"path": pointer(path), "expected": snippet(expected), "actual": snippet(actual), "reason": reason}
+
+
+def kind(mismatch):
+    """
+    :return: SHORT TEXT OF WHERE, AND HOW, mismatch FAILED, WITHOUT THE VALUES, SO SIMILAR MISMATCHES CAN BE COUNTED
+    LIST INDEXES IN THE PATH ARE SHOWN AS *, AND THE COMPARED VALUES AS <test>, <expected>, ...
+    """
+    leaf = mismatch
+    path = None
+    while hasattr(leaf, "template") and hasattr(leaf, "path"):
+        if leaf.path is not None:
+            path = leaf.path
+        if not (hasattr(leaf.cause, "template") and hasattr(leaf.cause, "path")):
+            break
+        leaf = leaf.cause
+    steps = []
+    while path:
+        path, step, is_index = path
+        steps.append("/*" if is_index else "/" + str(step).replace("~", "~0").replace("/", "~1"))
+    where = "".join(reversed(steps)) or "/"
+    if leaf.cause is not None:
+        # AN expected FUNCTION RAISED SOMETHING OTHER THAN A Mismatch
+        return where + ": " + _first_line(str(leaf.cause))
+    template = _compared.sub(lambda m: "<" + m.group(1) + ">", leaf.template)
+    params = {k: _small(v) for k, v in leaf.params.items() if k not in _COMPARED}
+    return where + ": " + " ".join(expand_template(template, params).split())
+
+
+def render(difference):
+    """
+    :return: TEXT OF THE first_difference()
+    """
+    d = difference
+    return f"first difference\n  {d['path'] or '/'}: expected {d['expected']}, actual {d['actual']} - {d['reason']}"
+
+
+def pointer(path):
+    """
+    :param path: LINKED (parent, step, is_index) TUPLES, ENDING IN None
+    :return: JSON POINTER (RFC 6901) OF path
+    """
+    steps = []
+    while path:
+        path, step, _ = path
+        steps.append("/" + str(step).replace("~", "~0").replace("/", "~1"))
+    return "".join(reversed(steps))
+
+
+def snippet(value, limit=MAX_SNIPPET):
+    """
+    :return: JSON-LIKE TEXT OF value, CUT AT limit CHARACTERS, WITHOUT SERIALIZING MORE THAN THAT
+    """
+    output = []
+    size = 0
+    for token in _tokens(value, set()):
+        output.append(token)
+        size += len(token)
+        if size > limit:
+            return "".join(output)[:limit] + ELLIPSIS
+    return "".join(output)
+
+
+def _small(value):
+    # value, OR ITS SNIPPET IF value IS BIG
+    text = snippet(value)
+    return value if not text.endswith(ELLIPSIS) else text
+
+
+def _tokens(value, active):
+    _class = value.__class__
+    if _class in (str, int, float, bool) or value is None:
+        if _class is str and len(value) > MAX_SNIPPET:
+            value = value[: MAX_SNIPPET + 1]
+        yield json.dumps(value)
+        return
+    if TYPES[_class].generator:
+        yield "<generator>"
+        return
+    value = from_data(value)
+    _class = value.__class__
+    if _class is dict or _class is FrozenData or _class in (list, tuple, set, frozenset, FrozenList):
+        key = id(value)
+        if key in active:
+            yield "<cycle>"
+            return
+        active.add(key)
+        if _class is dict or _class is FrozenData:
+            yield "{"
+            for i, (k, v) in enumerate(value.items()):
+                if i:
+                    yield ", "
+                yield json.dumps(str(k)) + ": "
+                yield from _tokens(v, active)
+            yield "}"
+        else:
+            yield "["
+            for i, v in enumerate(value):
+                if i:
+                    yield ", "
+                yield from _tokens(v, active)
+            yield "]"
+        active.discard(key)
+        return
+    if value is None or _class.__name__ == "NullType":
+        yield "null"
+        return
+    yield _first_line(str(value))[: MAX_SNIPPET + 1]
+
+
+def _first_line(text):
+    return text.split("\n", 1)[0]
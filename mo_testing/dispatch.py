@@ -0,0 +1,106 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import datetime
+import sys
+import types
+
+from mo_dots import utils, Data, DataObject, FlatList, NullType
+from mo_future import generator_types, none_type
+
+from mo_testing.arrays import is_array_class
+from mo_testing.frozen import FrozenData, FrozenList
+
+_value_types = (str, int, float, bool, none_type, datetime.date, datetime.datetime)
+_date_types = (datetime.datetime, datetime.date)
+_changed_by_from_data = (NullType, Data, FlatList, DataObject, float)
+
+
+class TypeInfo:
+    """
+    WHAT mo_dots SAYS ABOUT A CLASS, WORKED OUT ONCE PER CLASS INSTEAD OF ONCE PER VALUE
+    (FrozenData AND FrozenList ARE data AND list HERE, WITHOUT REGISTERING THEM WITH mo_dots)
+    plain - from_data() RETURNS THE VALUE UNCHANGED
+    missable - is_missing() IS True WHEN THE VALUE IS EMPTY
+    value - A SCALAR, NEVER COMPARED AS A STRUCTURE
+    number - int OR float, SO float() IS ENOUGH
+    THE REST ARE THE mo_dots (AND mo_future) PREDICATES OF THE SAME NAME
+    """
+
+    __slots__ = [
+        "plain",
+        "null",
+        "missable",
+        "text",
+        "null_op",
+        "list",
+        "set",
+        "data",
+        "function",
+        "many",
+        "finite",
+        "generator",
+        "value",
+        "date",
+        "number",
+        "array",
+    ]
+
+    def __init__(self, _class):
+        null_types, many_types = utils._null_types, utils._many_types
+        self.generator = issubclass(_class, generator_types)
+        self.plain = not (_class in _changed_by_from_data or _class in generator_types)
+        self.null = _class in null_types
+        self.missable = issubclass(_class, (str, *null_types, *many_types, FrozenList))
+        self.text = _class is str
+        self.null_op = _class.__name__ == "NullOp"
+        self.list = issubclass(_class, (*utils.list_types, FrozenList))
+        self.set = issubclass(_class, set)
+        self.data = _class in utils._data_types or _class is FrozenData
+        self.function = issubclass(_class, types.FunctionType)
+        self.many = issubclass(_class, (*many_types, FrozenList)) or issubclass(_class, types.GeneratorType)
+        self.finite = issubclass(_class, (*utils.finite_types, FrozenList))
+        # mo_times IS NOT IMPORTED UNTIL A DATE IS COMPARED; UNTIL THEN, NO VALUE CAN BE ITS Date
+        dates = sys.modules.get("mo_times.dates")
+        self.value = _class in _value_types or (dates is not None and _class is dates.Date)
+        self.date = issubclass(_class, _date_types) or (dates is not None and issubclass(_class, dates.Date))
+        self.number = _class is int or _class is float
+        self.array = is_array_class(_class)
+
+
+class _TypeInfos(dict):
+    """
+    type -> TypeInfo, FILLED ON FIRST USE
+    """
+
+    def __missing__(self, _class):
+        info = self[_class] = TypeInfo(_class)
+        return info
+
+
+TYPES = _TypeInfos()
+_registries = (None, None, None, None, None)
+
+
+def refresh_types():
+    """
+    FORGET WHAT IS KNOWN ABOUT TYPES IF mo_dots HAS REGISTERED MORE SINCE THE LAST CALL
+    (register_many(), register_list(), register_data() AND register_null_type() REPLACE THESE TUPLES)
+    """
+    global _registries
+    null_types, data_types, list_types, finite_types, many_types = _registries
+    if (
+        utils._many_types is not many_types
+        or utils._data_types is not data_types
+        or utils.list_types is not list_types
+        or utils.finite_types is not finite_types
+        or utils._null_types is not null_types
+    ):
+        TYPES.clear()
+        _registries = (utils._null_types, utils._data_types, utils.list_types, utils.finite_types, utils._many_types)
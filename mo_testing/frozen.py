@@ -0,0 +1,287 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import sys
+from array import array
+
+from mo_dots import from_data
+from mo_future import generator_types
+from mo_logs import Log
+
+_MIN_INT = -(2 ** 63)  # SMALLEST int PACKED INTO AN array("q")
+_MAX_INT = 2 ** 63
+
+
+class Shape:
+    """
+    THE KEYS OF A FrozenData, IN ORDER, SHARED BY ALL FrozenData WITH THE SAME KEYS
+    """
+
+    __slots__ = ["keys", "index"]
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.index = {k: i for i, k in enumerate(keys)}
+
+    def __reduce__(self):
+        return _shape, (self.keys,)
+
+
+_shapes = {}  # KEYS -> Shape
+
+
+def _shape(keys):
+    shape = _shapes.get(keys)
+    if shape is None:
+        keys = tuple(sys.intern(k) if k.__class__ is str else k for k in keys)
+        shape = _shapes[keys] = Shape(keys)
+    return shape
+
+
+class FrozenData:
+    """
+    A READ-ONLY dict: ONE TUPLE OF VALUES, AND THE Shape OF ITS KEYS
+    """
+
+    __slots__ = ["shape", "values"]
+
+    def __init__(self, shape, values):
+        self.shape = shape
+        self.values = values
+
+    def get(self, key, default=None):
+        i = self.shape.index.get(key)
+        return default if i is None else self.values[i]
+
+    def __getitem__(self, key):
+        i = self.shape.index.get(key)
+        if i is None:
+            raise KeyError(key)
+        return self.values[i]
+
+    def __contains__(self, key):
+        return key in self.shape.index
+
+    def __iter__(self):
+        return iter(self.shape.keys)
+
+    def __len__(self):
+        return len(self.values)
+
+    def keys(self):
+        return self.shape.keys
+
+    def items(self):
+        return zip(self.shape.keys, self.values)
+
+    def __eq__(self, other):
+        if other.__class__ is FrozenData:
+            return self.shape.keys == other.shape.keys and self.values == other.values
+        if isinstance(other, dict):
+            return len(other) == len(self.values) and all(k in other and other[k] == v for k, v in self.items())
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.shape.keys, self.values))
+
+    def __data__(self):
+        return thaw(self)
+
+    def __repr__(self):
+        return f"freeze({thaw(self)!r})"
+
+    def __reduce__(self):
+        return FrozenData, (self.shape, self.values)
+
+
+class FrozenList:
+    """
+    A READ-ONLY list; WHEN ALL ELEMENTS ARE int, OR ALL ARE float, THEY ARE PACKED INTO AN array
+    """
+
+    __slots__ = ["values"]
+
+    def __init__(self, values):
+        self.values = values
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __eq__(self, other):
+        if other.__class__ is FrozenList:
+            return len(self.values) == len(other.values) and all(a == b for a, b in zip(self.values, other.values))
+        if isinstance(other, list):
+            return len(self.values) == len(other) and all(a == b for a, b in zip(self.values, other))
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self.values))
+
+    def __data__(self):
+        return thaw(self)
+
+    def __repr__(self):
+        return f"freeze({thaw(self)!r})"
+
+    def __reduce__(self):
+        return FrozenList, (self.values,)
+
+
+def freeze(expected, memo=None):
+    """
+    :return: A COMPACT, READ-ONLY COPY OF expected, FOR assertAlmostEqual (AND compile_expected) TO USE AS IS
+    dict BECOME FrozenData WITH SHARED, INTERNED KEYS; list BECOME FrozenList, WITH PACKED NUMBERS; EQUAL TEXT, AND
+    EQUAL SUBTREES, ARE KEPT ONCE. THE RESULT CAN BE PICKLED, AND KEEPS ITS SHARING WHEN IT IS
+    :param memo: dict OF THE TEXT AND SUBTREES ALREADY KEPT; PASS THE SAME memo TO SHARE THEM BETWEEN FIXTURES
+    """
+    if memo is None:
+        memo = {}
+    active = set()  # id() OF THE STRUCTURES ENCLOSING THE CURRENT ONE
+    frozen = {}  # id() OF STRUCTURES ALREADY FROZEN -> FROZEN VALUE, SO SHARED STRUCTURES ARE VISITED ONCE
+    # ONE FRAME PER STRUCTURE BEING FROZEN: [value, kind, keys, children, NEXT CHILD, FROZEN CHILDREN]
+    root = [None, None, None, [expected], 0, []]
+    stack = [root]
+    while True:
+        frame = stack[-1]
+        children, output = frame[3], frame[5]
+        i, size = frame[4], len(children)
+        while i < size:
+            value = children[i]
+            i += 1
+            _class = value.__class__
+            if _class in _leaves:
+                output.append(_leaf(value, memo))
+                continue
+            value = from_data(value)
+            _class = value.__class__
+            found = frozen.get(id(value))
+            if found is not None:
+                output.append(found)
+                continue
+            if isinstance(value, dict):
+                kind, keys, values = dict, tuple(value.keys()), list(value.values())
+            elif isinstance(value, list):
+                kind, keys, values = list, None, value
+            elif isinstance(value, tuple):
+                kind, keys, values = tuple, None, value
+            elif isinstance(value, (set, frozenset)):
+                kind, keys, values = (set if isinstance(value, set) else frozenset), None, list(value)
+            elif isinstance(value, generator_types):
+                Log.error("can not freeze a generator")
+            else:
+                output.append(_leaf(value, memo))
+                continue
+            if id(value) in active:
+                Log.error("can not freeze a structure that refers back to itself")
+            active.add(id(value))
+            frame[4] = i
+            stack.append([value, kind, keys, values, 0, []])
+            break
+        else:
+            # ALL CHILDREN OF THIS STRUCTURE ARE FROZEN
+            stack.pop()
+            if frame is root:
+                return output[0]
+            value, kind, keys = frame[0], frame[1], frame[2]
+            active.discard(id(value))
+            result = frozen[id(value)] = _structure(kind, keys, output, memo)
+            stack[-1][5].append(result)
+
+
+_leaves = {str, int, float, bool, type(None), FrozenData, FrozenList}
+
+
+def _leaf(value, memo):
+    _class = value.__class__
+    if _class is str or _class is int or (_class is float and value and value == value):
+        # EQUAL VALUES ARE KEPT ONCE (BUT NOT 0.0, WHICH EQUALS -0.0, NOR NaN, WHICH EQUALS NOTHING)
+        return memo.setdefault((_class, value), value)
+    return value
+
+
+def _structure(kind, keys, children, memo):
+    """
+    :return: THE FROZEN STRUCTURE OF kind; THE SAME OBJECT FOR THE SAME keys AND children
+    THE children ARE ALREADY FROZEN, SO EQUAL SUBTREES ARE THE SAME OBJECT, AND ARE COMPARED BY id()
+    """
+    if kind is dict:
+        shape = _shape(keys)
+        key = (FrozenData, shape, *map(id, children))
+        found = memo.get(key)
+        if found is None:
+            found = memo[key] = FrozenData(shape, tuple(children))
+        return found
+    if kind is list:
+        packed = _packed(children)
+        if packed is None:
+            key = (FrozenList, *map(id, children))
+        else:
+            key = (FrozenList, packed.typecode, packed.tobytes())
+        found = memo.get(key)
+        if found is None:
+            found = memo[key] = FrozenList(tuple(children) if packed is None else packed)
+        return found
+    if kind is tuple:
+        return memo.setdefault((tuple, *map(id, children)), tuple(children))
+    return kind(children)
+
+
+def _packed(values):
+    """
+    :return: array OF values IF THEY ARE ALL int (THAT FIT 64 BITS), OR ALL float, OTHERWISE None
+    """
+    if not values:
+        return None
+    classes = set(map(type, values))
+    if classes == {float}:
+        return array("d", values)
+    if classes == {int} and _MIN_INT <= min(values) and max(values) < _MAX_INT:
+        return array("q", values)
+    return None
+
+
+def thaw(value):
+    """
+    :return: PLAIN dict, list AND tuple COPY OF A FROZEN value (SETS ARE LEFT AS THEY ARE)
+    """
+    results = []
+    thawed = {}  # id() OF FROZEN STRUCTURES -> COPY, SO SHARED STRUCTURES ARE COPIED ONCE
+    todo = [(value, None)]
+    while todo:
+        value, done = todo.pop()
+        if done is not None:
+            kind, keys, size = done
+            children = results[len(results) - size :]
+            del results[len(results) - size :]
+            result = thawed[id(value)] = dict(zip(keys, children)) if kind is dict else kind(children)
+            results.append(result)
+            continue
+        result = thawed.get(id(value))
+        if result is not None:
+            results.append(result)
+            continue
+        _class = value.__class__
+        if _class is FrozenData:
+            kind, keys, children = dict, value.shape.keys, value.values
+        elif _class is FrozenList:
+            kind, keys, children = list, None, value.values
+        elif _class is tuple:
+            kind, keys, children = tuple, None, value
+        else:
+            results.append(value)
+            continue
+        todo.append((value, (kind, keys, len(children))))
+        todo.extend((c, None) for c in reversed(children))
+    return results[0]
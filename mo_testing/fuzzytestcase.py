@@ -9,34 +9,54 @@
 #
 
 
-import datetime
+import inspect
 import os
-import types
+import re
+from decimal import Decimal
 from unittest import SkipTest, TestCase
 
-import mo_math
-from mo_dots import (
-    coalesce,
-    is_list,
-    literal_field,
-    from_data,
-    to_data,
-    is_data,
-    is_many,
-    get_attr,
-    is_missing,
-    Null,
-    is_null,
-    is_finite,
+from mo_dots import coalesce
+from mo_future import first, get_function_name, is_text, none_type
+from mo_logs import Except, Log
+from mo_logs.exceptions import ERROR
+from mo_logs.utils import raise_from_none
+from mo_logs.strings import expand_template
+
+from mo_testing import diff
+from mo_testing.dispatch import TYPES, refresh_types
+from mo_testing.frozen import FrozenData, FrozenList
+from mo_testing.matcher import (
+    Matcher,
+    Mismatch,
+    Plan,
+    Context,
+    get_tolerance,
+    compile_expected,
+    is_null_op,
+    _compare,
+    _compare_value,
 )
-from mo_future import is_text, zip_longest, first, get_function_name, generator_types
-from mo_logs import Except, Log, suppress_exception
-from mo_logs.strings import expand_template, quote
-from mo_math import is_number, log10, COUNT
-from mo_times import dates
 
 
 os.environ.setdefault("TESTING", "1")
+MAX_FAILURES = 1000  # assert_all_almost_equal STOPS AFTER THIS MANY MISMATCHED PAIRS
+MAX_EXAMPLES = 10  # MISMATCHED PAIRS SHOWN BY assert_all_almost_equal
+PROFILE = os.environ.get("MO_TESTING_PROFILE")  # N TO REPORT THE N HOT PATHS OF ALL COMPARISONS WHEN THE PROCESS EXITS
+if PROFILE:
+    from mo_testing.profiler import profile_at_exit, DEFAULT_TOP
+
+    profile_at_exit(int(PROFILE) if PROFILE.isdigit() else DEFAULT_TOP)
+
+TIMINGS = None  # Timings OF THE TESTS WRAPPED BY add_error_reporting, IF ANY
+TIMING = os.environ.get("MO_TESTING_TIMING")  # N TO REPORT THE N SLOWEST TESTS WHEN THE PROCESS EXITS
+if TIMING:
+    from mo_testing import timing
+
+    TIMINGS = timing.timing_at_exit(
+        int(TIMING) if TIMING.isdigit() else timing.DEFAULT_TOP,
+        filename=os.environ.get("MO_TESTING_TIMING_FILE"),
+        memory=int(os.environ.get("MO_TESTING_TIMING_MEMORY") or 0),  # TRACE THE PEAK MEMORY OF ONE IN N TESTS
+    )
 
 
 class FuzzyTestCase(TestCase):
@@ -50,18 +70,59 @@ class FuzzyTestCase(TestCase):
         """
         self.default_places = places
 
-    def assertAlmostEqual(self, test_value, expected, msg=None, *, digits=None, places=None, delta=None):
-        if delta or digits:
-            assertAlmostEqual(test_value, expected, msg=msg, digits=digits, places=places, delta=delta)
-        else:
-            assertAlmostEqual(
-                test_value, expected, msg=msg, digits=digits, places=coalesce(places, self.default_places), delta=delta
-            )
+    def assertAlmostEqual(
+        self, test_value, expected, msg=None, *, digits=None, places=None, delta=None, workers=None, exact=None
+    ):
+        if not (delta or digits):
+            places = coalesce(places, self.default_places)
+        assertAlmostEqual(
+            test_value, expected, msg=msg, digits=digits, places=places, delta=delta, workers=workers, exact=exact
+        )
 
-    def assertEqual(self, test_value, expected, msg=None, *, digits=None, places=None, delta=None):
+    def assertEqual(
+        self, test_value, expected, msg=None, *, digits=None, places=None, delta=None, workers=None, exact=None
+    ):
         if expected == None:
             expected = []
-        self.assertAlmostEqual(test_value, expected, msg=msg, digits=digits, places=places, delta=delta)
+        self.assertAlmostEqual(
+            test_value, expected, msg=msg, digits=digits, places=places, delta=delta, workers=workers, exact=exact
+        )
+
+    def assertEachEqual(
+        self, pairs, msg=None, *, digits=None, places=None, delta=None, limit=MAX_FAILURES, examples=MAX_EXAMPLES
+    ):
+        """
+        ASSERT EVERY (test, expected) PAIR MATCHES, REPORTING ALL THE MISMATCHES AT ONCE; SEE assert_all_almost_equal()
+        """
+        if not (delta or digits):
+            places = coalesce(places, self.default_places)
+        assert_all_almost_equal(
+            ((t, [] if e == None else e) for t, e in pairs),
+            msg=msg,
+            digits=digits,
+            places=places,
+            delta=delta,
+            limit=limit,
+            examples=examples,
+        )
+
+    def assertMatchesSnapshot(self, value, name, msg=None, *, digits=None, places=None, delta=None, update=None):
+        """
+        ASSERT value MATCHES THE SNAPSHOT CALLED name, STORED IN snapshot_directory()
+        SET MO_TESTING_UPDATE_SNAPSHOTS=1 (OR update=True) TO WRITE THE SNAPSHOT
+        """
+        from mo_testing.snapshots import match_snapshot, EXTENSION
+
+        if not (delta or digits):
+            places = coalesce(places, self.default_places)
+        filename = os.path.join(self.snapshot_directory(), name + EXTENSION)
+        match_snapshot(value, filename, update=update, digits=digits, places=places, delta=delta, msg=msg)
+
+    def snapshot_directory(self):
+        """
+        WHERE THE SNAPSHOTS OF THIS TEST CASE ARE KEPT: snapshots/ BESIDE THE TEST MODULE
+        """
+        return os.path.join(os.path.dirname(os.path.abspath(inspect.getfile(self.__class__))), "snapshots")
 
     def assertRaises(self, problem=None, function=None, *args, **kwargs):
         if function is None:
@@ -82,21 +143,26 @@ class RaiseContext:
     def __exit__(self, exc_type, exc_val, exc_tb):
         if not exc_val:
             Log.error("Expecting an error")
-        f = Except.wrap(exc_val)
 
         if isinstance(self.problem, (list, tuple)):
             problems = self.problem
         else:
             problems = [self.problem]
 
+        # THE CHEAP CHECKS FIRST; Except.wrap() PARSES THE STACK, SO IT IS ONLY NEEDED TO EXPLAIN A FAILURE
+        texts = []
+        for problem in problems:
+            if isinstance(problem, object.__class__) and issubclass(problem, BaseException):
+                if isinstance(exc_val, problem):
+                    return True
+            elif is_text(problem):
+                texts.append(problem)
+        if texts and _mentions(exc_val, texts):
+            return True
+
+        f = Except.wrap(exc_val)
         causes = []
         for problem in problems:
-            if (
-                isinstance(problem, object.__class__)
-                and issubclass(problem, BaseException)
-                and isinstance(exc_val, problem)
-            ):
-                return True
             try:
                 self.testcase.assertIn(problem, f)
                 return True
@@ -105,7 +171,54 @@ class RaiseContext:
         Log.error("problem is not raised", cause=first(causes))
 
 
-def assertAlmostEqual(test, expected, *, digits=None, places=None, msg=None, delta=None):
+_patterns = {}  # TUPLE OF TEXTS -> ONE REGEX THAT FINDS ANY OF THEM
+MAX_PATTERNS = 100  # MOST REGEX KEPT IN _patterns
+
+
+def _mentions(exc, texts):
+    """
+    :return: True IF ANY OF texts IS IN exc, AS Except.wrap(exc).__contains__() WOULD FIND IT
+    THE TEMPLATES OF THE WHOLE CAUSAL CHAIN ARE SEARCHED FIRST; THE MESSAGES, WHICH MAY EXPAND BIG PARAMETERS,
+    ARE ONLY BUILT IF NO TEMPLATE MATCHES
+    """
+    key = tuple(texts)
+    regex = _patterns.get(key)
+    if regex is None:
+        if len(_patterns) >= MAX_PATTERNS:
+            _patterns.clear()
+        regex = _patterns[key] = re.compile("|".join(map(re.escape, key)))
+    search = regex.search
+
+    expanded = []  # Except WITH A MESSAGE THAT IS NOT ITS TEMPLATE
+    todo = [exc]
+    while todo:
+        e = todo.pop()
+        if isinstance(e, Except):
+            if e.severity in texts or search(e.template):
+                return True
+            if e.params:
+                expanded.append(e)
+            cause = e.cause
+            if isinstance(cause, list):
+                todo.extend(reversed(cause))
+            else:
+                todo.append(cause)
+        elif isinstance(e, BaseException):
+            # SAME TEXT, AND SEVERITY, AS Except.wrap()
+            if ERROR in texts or search(f"{e.__class__.__name__}: {getattr(e, 'message', None) or e}"):
+                return True
+            todo.append(e.__cause__)
+
+    for e in expanded:
+        try:
+            if search(e.message):
+                return True
+        except Exception:
+            continue
+    return False
+
+
+def assertAlmostEqual(test, expected, *, digits=None, places=None, msg=None, delta=None, workers=None, exact=None):
     """
     COMPARE STRUCTURE AND NUMBERS
 
@@ -121,202 +234,112 @@ def assertAlmostEqual(test, expected, *, digits=None, places=None, msg=None, del
     * places (UP TO GIVEN SIGNIFICANT DIGITS)
     * digits (UP TO GIVEN DECIMAL PLACES, WITH NEGATIVE MEANING LEFT-OF-UNITS)
     * delta (MAXIMUM ABSOLUTE DIFFERENCE FROM expected)
+
+    USE compile_expected() WHEN THE SAME expected IS MATCHED MANY TIMES
+    USE workers=N TO COMPARE THE ELEMENTS OF A LARGE TOP-LEVEL list (OR dict) ON N PROCESSES
+    USE exact=True TO ACCEPT STRUCTURES THAT ARE == TO expected WITHOUT WALKING THEM (DEFAULT MO_TESTING_EXACT)
     """
-    test = from_data(test)
-    if isinstance(test, generator_types):
-        Log.error("can not accept generators as test value")
-    expected = from_data(expected)
-    try:
-        if test is expected:
-            return
-        elif is_null(expected):
-            return
-        elif is_missing(expected) and is_missing(test):
-            return
-        elif is_text(expected):
-            assertAlmostEqualValue(test, expected, msg=msg, digits=digits, places=places, delta=delta)
-        elif is_null_op(expected) or is_list(expected) and len(expected) == 0:
-            if is_missing(test):
-                return
-            Log.error(
-                "{test|json|limit(10000)} is expected to not exist", test=test, expected=expected,
-            )
-        elif is_list(expected) and len(expected) == 1:
-            return assertAlmostEqual(test, expected[0], msg=msg, digits=digits, places=places, delta=delta)
-    except Exception as cause:
-        Log.error(
-            "{test|json|limit(10000)} does not match expected {expected|json|limit(10000)}",
-            test=test,
-            expected=expected,
-            cause=cause,
-        )
+    return Matcher(expected, digits=digits, places=places, delta=delta, exact=exact)(test, msg, workers=workers)
 
-    first_cause = None
-    if is_list(test) and len(test) == 1 and is_many(test[0]) and is_many(expected):
-        try:
-            return assertAlmostEqual(test[0], expected, msg=msg, digits=digits, places=places, delta=delta)
-        except Exception as cause:
-            first_cause = cause
-
-    if is_many(test) and isinstance(expected, set):
-        test = set(to_data(t) for t in test)
-        if len(test) != len(expected):
-            Log.error(
-                "Sets do not match, element count different:\n{test|json|indent}\nexpecting{expectedtest|json|indent}",
-                test=test,
-                expected=expected,
-            )
 
-        try:
-            if len(test | expected) != len(test):
-                raise Exception()
-        except:
-            for e in expected:
-                for t in test:
-                    try:
-                        assertAlmostEqual(t, e, msg=msg, digits=digits, places=places, delta=delta)
-                        break
-                    except Exception as _:
-                        pass
-                else:
-                    Log.error("Sets do not match. {value|json} not found in {test|json}", value=e, test=test)
-        return  # ok
-
-    if is_data(expected) and is_data(test):
-        try:
-            for k, e in from_data(expected).items():
-                if is_missing(k):
-                    k = Null
-                t = test.get(k)
-                try:
-                    assertAlmostEqual(
-                        t,
-                        e,
-                        msg=coalesce(msg, "") + "key " + quote(k) + ": ",
-                        digits=digits,
-                        places=places,
-                        delta=delta,
-                    )
-                except Exception as cause:
-                    Log.error("key {k}={t} does not match expected {k}={e}", k=k, t=t, e=e, cause=cause)
-            return
-        except Exception as cause:
-            first_cause = first_cause or cause
-
-    if is_data(expected):
-        try:
-            if is_many(test):
-                test = list(test)
-                if len(test) != 1:
-                    Log.error("Expecting data, not a list")
-                test = test[0]
-            for k, e in expected.items():
-                t = get_attr(test, literal_field(k))
-                try:
-                    assertAlmostEqual(t, e, msg=msg, digits=digits, places=places, delta=delta)
-                except Exception as cause:
-                    Log.error("key {k}={t} does not match expected {k}={e}", k=k, t=t, e=e, cause=cause)
-            return
-        except Exception as cause:
-            first_cause = first_cause or cause
-
-    if isinstance(expected, types.FunctionType):
-        try:
-            return expected(test)
-        except Exception as cause:
-            first_cause = first_cause or cause
+_unchanging = {Matcher, FrozenData, FrozenList, str, int, float, bool, Decimal, none_type}  # THE PLAN CAN BE KEPT
 
-    if is_many(test) and is_many(expected):
+
+def assert_all_almost_equal(
+    pairs, *, digits=None, places=None, delta=None, msg=None, limit=MAX_FAILURES, examples=MAX_EXAMPLES
+):
+    """
+    ASSERT EVERY (test, expected) PAIR MATCHES, WITH THE assertAlmostEqual RULES
+    ALL PAIRS ARE CHECKED (UP TO limit MISMATCHES), THEN ONE ERROR REPORTS THE NUMBER OF MISMATCHES FOR EACH
+    REASON, AND THE FIRST examples MISMATCHES
+    expected CAN BE FROM compile_expected(), AND IS THEN CHECKED WITH ITS OWN TOLERANCE; THE SAME expected IN
+    CONSECUTIVE PAIRS IS PLANNED ONCE, IF IT CAN NOT CHANGE (COMPILED, FROZEN, OR A SCALAR)
+    """
+    refresh_types()
+    default = context = Context(get_tolerance(digits, places, delta))
+    contexts = {}  # (tolerance, exact) OF A COMPILED expected -> ITS Context
+    last, plan, kept = None, None, False
+    total = 0
+    failures = []  # (INDEX, Mismatch) OF THE FIRST examples MISMATCHES
+    reasons = {}  # diff.kind() -> COUNT
+    count = 0
+    for total, (test, expected) in enumerate(pairs, 1):
+        if not (kept and expected is last):
+            # A MUTABLE expected MAY HAVE CHANGED SINCE THE LAST PAIR, SO IT IS PLANNED AGAIN
+            last, kept = expected, expected.__class__ in _unchanging
+            if expected.__class__ is Matcher:
+                plan = expected.plan
+                key = (expected.tolerance, expected.exact)
+                context = contexts.get(key)
+                if context is None:
+                    context = contexts[key] = Context(*key)
+            else:
+                plan, context = Plan(expected), default
         try:
-            if test.__class__.__name__ == "ndarray":  # numpy
-                test = test.tolist()
-            elif test.__class__.__name__ == "DataFrame":  # pandas
-                test = test[test.columns[0]].values.tolist()
-            elif test.__class__.__name__ == "Series":  # pandas
-                test = test.values.tolist()
-
-            if not expected and test == None:
-                return
-            if expected == None:
-                expected = []  # REPRESENT NOTHING
-            for t, e in zip_longest(test, expected):
-                assertAlmostEqual(t, e, msg=msg, digits=digits, places=places, delta=delta)
-            return
-        except Exception as cause:
-            first_cause = first_cause or cause
-    try:
-        return assertAlmostEqualValue(test, expected, msg=msg, digits=digits, places=places, delta=delta)
-    except Exception as cause:
-        first_cause = first_cause or cause
+            _compare(test, plan, None, context)
+        except Mismatch as problem:
+            count += 1
+            reason = diff.kind(problem)
+            reasons[reason] = reasons.get(reason, 0) + 1
+            if len(failures) < examples:
+                failures.append((total - 1, problem))
+            if count >= limit:
+                break
+        finally:
+            if context.memo:
+                context.memo.clear()
+    if not count:
+        return
 
+    lines = [f"{count} of {total} pairs do not match" + (f" (stopped after {limit})" if count >= limit else "")]
+    if msg:
+        lines.insert(0, msg)
+    for reason, num in sorted(reasons.items(), key=lambda p: -p[1]):
+        lines.append(f"{num:>8}  {reason}")
+    shown = []
+    for index, problem in failures:
+        entry = diff.first_difference(problem)
+        entry["index"] = index
+        shown.append(entry)
+        lines.append(f"  pair {index} {entry['path'] or '/'}: expected {entry['expected']}, actual {entry['actual']}")
     Log.error(
-        "{test|json|limit(10000)} does not match expected {expected|json|limit(10000)}",
-        test=test,
-        expected=expected,
-        cause=first_cause,
+        "{text}",
+        text="\n".join(lines),
+        failures=count,
+        total=total,
+        reasons=reasons,
+        examples=shown,
+        static_template=False,
     )
 
 
+_numeric_types = {int, float, Decimal}  # NOT bool, WHICH IS NEVER A NUMBER
+
+
 def assertAlmostEqualValue(test, expected, digits=None, places=None, msg=None, delta=None):
     """
     Snagged from unittest/case.py, then modified (Aug2014)
     """
     if test == expected:
         return
-    if isinstance(expected, (dates.Date, datetime.datetime, datetime.date)):
-        return assertAlmostEqualValue(
-            dates.Date(test).unix, dates.Date(expected).unix, msg=msg, digits=digits, places=places, delta=delta
-        )
-    if is_finite(test) and len(test) == 1:
-        return assertAlmostEqual(first(test), expected, msg=msg, digits=digits, places=places, delta=delta)
-    if not is_number(expected):
-        raise AssertionError(expand_template("{test|json} != {expected|json}", locals()))
-
-    expected = float(expected)
-    if not is_number(test):
+    tolerance = get_tolerance(digits, places, delta)
+    if test.__class__ in _numeric_types and expected.__class__ in _numeric_types and expected == expected:
+        # NUMBERS, THE MOST COMMON CASE; THE SLOW PATH BELOW ONLY EXPLAINS A MISMATCH
         try:
-            # ASSUME IT IS A UTC DATE
-            test = dates.parse(test).unix
-        except Exception as e:
-            raise AssertionError(expand_template("{test|json} != {expected}", locals()))
-
-    # WE NOW ASSUME test IS A NUMBER
-    test = float(test)
-    if test == expected:
-        return
-
-    if COUNT([digits, places, delta]) > 1:
-        raise TypeError("specify only one of digits, places or delta")
-
-    if digits is not None:
-        with suppress_exception:
-            diff = round(abs(test - expected) * pow(10, digits))
-            if diff == 0:
+            value, number = float(test), float(expected)
+            if value == number or tolerance.close(value, number):
                 return
+        except OverflowError:
+            pass
 
-        standardMsg = expand_template("{test|json} != {expected|json} within {digits} decimal places", locals())
-    elif delta is not None:
-        if abs(test - expected) <= delta:
-            return
-
-        standardMsg = expand_template("{test|json} != {expected|json} within {delta} delta", locals())
-    else:
-        if places is None:
-            places = 15
-
-        with suppress_exception:
-            factor = mo_math.ceiling(log10(abs(test)))
-            diff = log10(abs(test - expected)) - factor + places
-            if diff < -0.3:
-                return
-
-        standardMsg = expand_template("{test|json} != {expected|json} within {places} places", locals())
-
-    raise AssertionError(coalesce(msg, "") + ": (" + standardMsg + ")")
-
-
-def is_null_op(v):
-    return v.__class__.__name__ == "NullOp"
+    refresh_types()
+    if expected.__class__ is float and expected != expected and not (TYPES[test.__class__].finite and len(test) == 1):
+        # NaN MATCHES NOTHING HERE, BUT Plan() WOULD TREAT IT AS null, WHICH MATCHES ANYTHING
+        raise AssertionError(expand_template("{test|json} != {expected|json}", {"test": test, "expected": expected}))
+    try:
+        return _compare_value(test, Plan(expected), None, Context(tolerance))
+    except Mismatch as problem:
+        raise_from_none(problem.render(msg))
 
 
 def add_error_reporting(suite):
@@ -324,15 +347,19 @@ def add_error_reporting(suite):
     Both unittest and pytest have become sophisticated enough to hide
     the problems cause by a test failure. Making debugging difficult.
     This method ensures a detailed error message is logged
+    While a mo_testing.timing.Timings is active, the time of each test is recorded too
     :param suite: The TestCase class (as @decorator)
     """
 
     def add_handler(function):
         test_name = get_function_name(function)
+        full_name = f"{suite.__module__}.{suite.__name__}.{test_name}"
 
         def error_hanlder(*args, **kwargs):
             try:
-                return function(*args, **kwargs)
+                if TIMINGS is None:
+                    return function(*args, **kwargs)
+                return TIMINGS.run(full_name, function, args, kwargs)
             except SkipTest as cause:
                 raise cause
             except Exception as cause:
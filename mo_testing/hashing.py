@@ -0,0 +1,217 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from decimal import Decimal
+from hashlib import blake2b
+from itertools import combinations
+from math import floor, frexp, isinf, isnan, log, log2
+
+from mo_dots import from_data
+from mo_logs import Log
+from mo_math import is_number
+from mo_times import dates
+
+from mo_testing.dispatch import TYPES, refresh_types
+
+MAX_NEIGHBORS = 8  # MOST HASHES RETURNED BY neighbors()
+
+
+def fuzzy_hash(value, *, digits=None, places=None, delta=None):
+    """
+    :return: int HASH OF value, THE SAME FOR VALUES THAT VERY LIKELY MATCH UNDER THE assertAlmostEqual RULES
+    """
+    return FuzzyHasher(digits=digits, places=places, delta=delta).hash(value)
+
+
+class FuzzyHasher:
+    """
+    HASH VALUES UNDER THE assertAlmostEqual RULES
+    * mo_dots WRAPPERS ARE UNWRAPPED, dict KEYS ARE SORTED, AND MISSING PROPERTIES ARE IGNORED
+    * A SINGLETON LIST IS ITS ELEMENT, AN EMPTY LIST IS null, AND SETS IGNORE ORDER
+    * DATES ARE THEIR UNIX TIMESTAMP, LIKE assertAlmostEqualValue
+    * bool, AND NUMERIC TEXT, ARE NUMBERS, LIKE THE Plan OF A VALUE
+    * NUMBERS ARE ROUNDED DOWN TO A GRID TWICE AS WIDE AS THE TOLERANCE, SO TWO CLOSE-ENOUGH NUMBERS ARE IN THE
+      SAME, OR NEIGHBORING, CELL; neighbors() GIVES THE HASHES OF THE NEIGHBORING CELLS TOO
+    * FOR places, THE TOLERANCE IS RELATIVE, SO THE GRID IS OF log2(abs(number)), ONE GRID FOR EACH SIGN
+    THE HASH IS STABLE ACROSS PROCESSES
+    null, AND expected FUNCTIONS, MATCH ANYTHING, WHICH A HASH CAN NOT SHOW; THEY ARE HASHED AS VALUES
+    """
+
+    __slots__ = ["digits", "places", "delta", "_scale", "_octave"]
+
+    def __init__(self, *, digits=None, places=None, delta=None):
+        if (digits is not None) + (places is not None) + (delta is not None) > 1:
+            Log.error("Expecting only one of digits, places or delta")
+        self.digits = digits
+        self.places = places
+        self.delta = delta
+        if digits is not None:
+            self._scale = pow(10, -digits)
+        elif delta is not None:
+            self._scale = 2 * delta
+        else:
+            self._scale = None
+        # CELLS PER DOUBLING, FOR places: Tolerance ACCEPTS abs(test - expected) < abs(test) * 10 ** (0.7 - places),
+        # WHICH IS A log2 DISTANCE OF ABOUT 10 ** (0.7 - places) / log(2); THE CELLS ARE TWICE THAT WIDE
+        places = 15 if places is None else places
+        self._octave = max(1, floor(log(2) / (2 * pow(10, 0.7 - places))))
+
+    def hash(self, value):
+        return self._hash(value, ())
+
+    def neighbors(self, value, limit=MAX_NEIGHBORS):
+        """
+        :return: UP TO limit HASHES, value's OWN FIRST, THAT A CLOSE-ENOUGH VALUE MAY HAVE
+        ONLY THE NUMBERS CLOSEST TO THE EDGE OF THEIR CELL ARE MOVED TO THE NEIGHBORING CELL
+        """
+        edges = []  # (DISTANCE TO EDGE, NUMBER INDEX)
+        own = self._hash(value, edges)
+        edges.sort()
+        nearest = [i for _, i in edges[: max(0, limit.bit_length() - 1)]]
+        output = [own]
+        for size in range(1, len(nearest) + 1):
+            for moved in combinations(nearest, size):
+                if len(output) >= limit:
+                    return output
+                output.append(self._hash(value, frozenset(moved)))
+        return output
+
+    def _cell(self, number):
+        """
+        :return: (GRID, CELL, FRACTION) OF number
+        """
+        scale = self._scale
+        if scale is not None:
+            position = number / scale
+            cell = floor(position)
+            return "", cell, position - cell
+        # frexp() IS EXACT, SO THE POSITION IS AS PRECISE FOR 1e300 AS FOR 1; IT DOES NOT JUMP AT A POWER OF TEN
+        mantissa, exponent = frexp(abs(number))
+        octave = self._octave
+        position = log2(mantissa) * octave
+        cell = floor(position)
+        return ("-" if number < 0 else ""), exponent * octave + cell, position - cell
+
+    def _hash(self, value, moved):
+        """
+        :param moved: INDEXES OF NUMBERS TO PUT IN THEIR NEIGHBORING CELL, OR A list TO FILL WITH
+                      (DISTANCE TO EDGE, INDEX) OF EVERY NUMBER
+        """
+        refresh_types()
+        numbers = [0]  # COUNT OF NUMBERS SEEN, IN WALK ORDER
+
+        def number(n):
+            if isnan(n):
+                return "nan"
+            if isinf(n):
+                return "inf" if n > 0 else "-inf"
+            if n == 0:
+                return "n0"
+            index = numbers[0]
+            numbers[0] += 1
+            grid, cell, fraction = self._cell(n)
+            if moved.__class__ is list:
+                moved.append((min(fraction, 1 - fraction), index))
+            elif index in moved:
+                cell += -1 if fraction < 0.5 else 1
+            return "n" + grid + str(cell)
+
+        def leaf(v):
+            # TEXT OF A VALUE THAT IS NOT A STRUCTURE, OR None IF IT IS
+            info = TYPES[v.__class__]
+            if not info.plain:
+                v = from_data(v)
+                info = TYPES[v.__class__]
+            if _is_null(v):
+                return "null"
+            _class = v.__class__
+            if _class is int or _class is float or _class is bool or _class is Decimal:
+                return number(float(v))
+            if info.text:
+                if is_number(v):
+                    return number(float(v))
+                return "s" + v
+            if info.date:
+                return number(float(dates.Date(v).unix))
+            if _class is dict or info.many:
+                return None
+            return "o" + _class.__name__ + ":" + str(v)
+
+        # ITERATIVE, SO DEEP STRUCTURES DO NOT EXHAUST THE STACK; EACH STRUCTURE IS THE DIGEST OF ITS PARTS
+        result = []
+        todo = [(value, result, None)]
+        while todo:
+            v, parts, done = todo.pop()
+            if done is not None:
+                # ALL CHILDREN OF THIS STRUCTURE ARE DONE
+                kind, children = done
+                if kind == "set":
+                    children.sort()
+                parts.append(_digest(kind + "(" + ",".join(children) + ")"))
+                continue
+            text = leaf(v)
+            if text is not None:
+                parts.append(text)
+                continue
+            v = from_data(v)
+            if v.__class__ is dict:
+                children = []
+                todo.append((None, parts, ("dict", children)))
+                items = sorted(((str(k), c) for k, c in v.items()), key=lambda p: p[0], reverse=True)
+                for k, c in items:
+                    if _is_null(c):
+                        # A MISSING PROPERTY IS THE SAME AS NO PROPERTY
+                        continue
+                    # ONE PART PER PROPERTY, SO ITS KEY AND VALUE STAY TOGETHER
+                    key_parts = []
+                    todo.append((None, children, ("key:" + k, key_parts)))
+                    todo.append((c, key_parts, None))
+                continue
+            elements = list(v)
+            if len(elements) == 1 and not TYPES[v.__class__].set:
+                todo.append((elements[0], parts, None))
+                continue
+            children = []
+            todo.append((None, parts, ("set" if TYPES[v.__class__].set else "list", children)))
+            todo.extend((e, children, None) for e in reversed(elements))
+
+        return int(_digest(result[0]), 16)
+
+
+def _is_null(value):
+    info = TYPES[value.__class__]
+    return info.null or (info.missable and not value)
+
+
+def _digest(text):
+    return blake2b(text.encode("utf8"), digest_size=8).hexdigest()
+
+
+class FuzzyIndex:
+    """
+    FIND THE VALUES THAT MAY MATCH A GIVEN VALUE, WITHOUT LOOKING AT ALL OF THEM
+    """
+
+    __slots__ = ["hasher", "buckets"]
+
+    def __init__(self, *, digits=None, places=None, delta=None):
+        self.hasher = FuzzyHasher(digits=digits, places=places, delta=delta)
+        self.buckets = {}  # HASH -> LIST OF (value, item)
+
+    def add(self, value, item=None):
+        self.buckets.setdefault(self.hasher.hash(value), []).append((value, value if item is None else item))
+
+    def candidates(self, value, limit=MAX_NEIGHBORS):
+        """
+        :return: ITEMS WHOSE VALUE HASHES LIKE value, OR LIKE value WITH SOME NUMBERS IN A NEIGHBORING CELL
+        """
+        output = []
+        for h in self.hasher.neighbors(value, limit):
+            output.extend(item for _, item in self.buckets.get(h, ()))
+        return output
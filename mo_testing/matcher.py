@@ -0,0 +1,1000 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import os
+from itertools import chain
+from math import floor, log
+
+from mo_dots import coalesce, literal_field, from_data, to_data, get_attr, is_missing, Null
+from mo_future import zip_longest, first, generator_types
+from mo_logs import Except
+from mo_logs.exceptions import get_stacktrace
+from mo_logs.utils import raise_from_none
+from mo_logs.strings import expand_template, quote
+from mo_math import is_number
+
+from mo_testing import diff
+from mo_testing import columns
+from mo_testing.arrays import compare_array, is_array_class, to_list
+from mo_testing.dispatch import TYPES, refresh_types
+from mo_testing.sets import ExpectedSet, match_set, match_stream
+
+# PLAN KINDS, DECIDED BY THE FIRST MATCHING RULE OF assertAlmostEqual
+NOTHING = "nothing"  # expected IS NULL, ANYTHING MATCHES
+TEXT = "text"  # expected IS TEXT, COMPARE AS VALUE
+ABSENT = "absent"  # test MUST BE MISSING
+SINGLETON = "singleton"  # expected IS A LIST OF ONE, COMPARE WITH THE ONE ELEMENT
+STRUCTURE = "structure"  # EVERYTHING ELSE: TRY SET, DATA, FUNCTION, LIST AND VALUE RULES, IN THAT ORDER
+
+
+def compile_expected(expected, *, digits=None, places=None, delta=None, exact=None):
+    """
+    BUILD THE COMPARISON PLAN FOR expected ONCE, SO IT CAN BE MATCHED AGAINST MANY test VALUES
+    THE PLAN IS A SNAPSHOT: CHANGES TO expected AFTER COMPILING ARE NOT SEEN
+    :param exact: ACCEPT test == expected WITHOUT WALKING IT (DEFAULT MO_TESTING_EXACT); SEE Plan.exact
+    :return: Matcher - CALL WITH test TO ASSERT IT MATCHES expected, WITH THE SAME RULES AS assertAlmostEqual
+    """
+    matcher = Matcher(expected, digits=digits, places=places, delta=delta, exact=exact)
+    if matcher.exact:
+        matcher.plan.exact  # DECIDE FOR THE WHOLE expected BEFORE THE CHILD PLANS ARE BUILT, SO THEY INHERIT IT
+    matcher.plan.compile()
+    return matcher
+
+
+class Matcher:
+    """
+    ASSERT test MATCHES expected
+    """
+
+    __slots__ = ["plan", "tolerance", "exact"]
+
+    def __init__(self, expected, *, digits=None, places=None, delta=None, exact=None):
+        refresh_types()
+        self.plan = Plan(expected)
+        self.tolerance = get_tolerance(digits, places, delta)
+        self.exact = EXACT_FIRST if exact is None else exact
+
+    def __call__(self, test, msg=None, *, workers=None):
+        """
+        :param workers: NUMBER OF PROCESSES TO SHARE A LARGE TOP-LEVEL list (OR dict) COMPARISON
+        """
+        try:
+            refresh_types()
+            context = Context(self.tolerance, self.exact)
+            if workers and workers > 1:
+                from mo_testing.parallel import compare_sharded
+
+                if compare_sharded(test, self.plan, context, workers):
+                    return
+            return _compare(test, self.plan, None, context)
+        except Mismatch as problem:
+            raise_from_none(problem.render(msg))
+
+
+class Mismatch(Exception):
+    """
+    A FAILED MATCH AT path, CHEAP TO RAISE AND CATCH WHILE TRYING ALTERNATIVES
+    THE MESSAGE IS RENDERED ONLY WHEN IT ESCAPES THE TOP-LEVEL CALL
+    """
+
+    __slots__ = ["template", "params", "path", "cause", "assertion"]
+
+    def __init__(self, template, params, path=None, cause=None, assertion=False):
+        Exception.__init__(self)
+        self.template = template
+        self.params = params
+        self.path = path
+        self.cause = cause
+        self.assertion = assertion  # RENDER AS AssertionError, LIKE unittest
+
+    def render(self, msg=None, trace=None):
+        """
+        :param msg: THE CALLER'S msg, WHICH PREFIXES NUMERIC MISMATCHES
+        :param trace: STACK TRACE SHARED BY THE WHOLE CAUSAL CHAIN
+        :return: THE Except (OR AssertionError) THAT DESCRIBES THIS MISMATCH, AND ITS CAUSES
+        """
+        chain = []  # OUTERMOST FIRST
+        cause = self
+        while isinstance(cause, Mismatch):
+            chain.append(cause)
+            cause = cause.cause
+        if len(chain) == 1 and chain[0].assertion:
+            complex = any(_is_complex(v) for v in self.params.values())
+            return chain[0]._render(msg, trace, complex, cause)
+
+        if trace is None:
+            trace = get_stacktrace(1)
+        if DIFF_REPORT:
+            difference = diff.first_difference(self)
+            text = diff.render(difference)
+            if msg:
+                text = msg + "\n" + text
+            return Except(template="{text}", params={"text": text, "difference": difference}, trace=trace)
+
+        skipped = len(chain) - MAX_CAUSES
+        if skipped > 0:
+            # A DEEP MISMATCH; SHOW WHERE IT STARTED AND WHERE IT ENDED
+            chain = chain[: MAX_CAUSES // 2] + chain[-MAX_CAUSES // 2 :]
+
+        # THE PARAMETERS OF THE CAUSES ARE PARTS OF THESE, SO CHECK ONLY ONCE
+        complex = any(_is_complex(v) for v in self.params.values())
+        for i, problem in reversed(list(enumerate(chain))):
+            if skipped > 0 and i == MAX_CAUSES // 2:
+                cause = Except(template="({count} more levels)", params={"count": skipped}, cause=cause, trace=trace)
+            cause = problem._render(msg, trace, complex, cause)
+        return cause
+
+    def _render(self, msg, trace, complex, cause):
+        params = self.params
+        if complex:
+            params = {k: _showable(v, 0, set(), {}) for k, v in params.items()}
+
+        if self.assertion:
+            message = expand_template(self.template, params)
+            if self.assertion is PREFIXED:
+                message = coalesce(msg, "") + path_text(self.path) + ": (" + message + ")"
+            if trace is None:
+                return AssertionError(message)
+            return Except(template=f"AssertionError: {message}", trace=trace)
+        return Except(template=self.template, params=to_data(params), cause=cause, trace=trace)
+
+    def __str__(self):
+        return str(self.render())
+
+
+DIFF_REPORT = bool(os.environ.get("MO_TESTING_DIFF"))  # REPORT THE FIRST DIFFERENCE, NOT THE WHOLE CHAIN OF CAUSES
+# SHORTEST LIST OF RECORDS COMPARED ONE COLUMN AT A TIME; MO_TESTING_COLUMNAR=0 FOR NEVER, =1 FOR ALWAYS
+COLUMNAR_ROWS = {"0": None, "1": 2}.get(os.environ.get("MO_TESTING_COLUMNAR"), columns.MIN_ROWS)
+EXACT_FIRST = bool(os.environ.get("MO_TESTING_EXACT"))  # TRY test == expected BEFORE WALKING A STRUCTURE
+EXACT_DEPTH = 100  # DEEPER STRUCTURES ARE NOT COMPARED WITH ==, WHICH RECURSES, AND WHICH WOULD BE REPEATED AT EACH LEVEL
+PREFIXED = "prefixed"  # Mismatch.assertion: THE MESSAGE STARTS WITH msg AND THE PATH
+MAX_CAUSES = 20  # LONGEST CHAIN OF CAUSES SHOWN FOR ONE MISMATCH
+MAX_DEPTH = 20  # DEEPEST STRUCTURE SHOWN IN A MESSAGE
+CYCLE = "<cycle>"  # SHOWN IN PLACE OF A REFERENCE BACK TO AN ENCLOSING STRUCTURE
+DEEPER = "..."  # SHOWN IN PLACE OF STRUCTURES DEEPER THAN MAX_DEPTH
+
+
+def _is_complex(value):
+    """
+    :return: True IF value (OF dict AND list) REFERS BACK TO ITSELF, IS DEEPER THAN MAX_DEPTH, OR HOLDS AN ARRAY,
+             WHICH CAN NOT BE SHOWN AS JSON
+    """
+    active = set()  # id() OF STRUCTURES ENCLOSING THE CURRENT ONE
+    done = set()  # id() OF STRUCTURES WITH NOTHING COMPLEX BELOW
+    todo = [(value, 0, False)]
+    while todo:
+        value, depth, leaving = todo.pop()
+        if leaving:
+            active.discard(id(value))
+            done.add(id(value))
+            continue
+        _class = value.__class__
+        if _class is dict:
+            children = value.values()
+        elif _class is list:
+            children = value
+        elif is_array_class(_class):
+            return True
+        else:
+            continue
+        key = id(value)
+        if key in active or depth == MAX_DEPTH:
+            return True
+        if key in done:
+            continue
+        active.add(key)
+        todo.append((value, depth, True))
+        todo.extend((c, depth + 1, False) for c in children)
+    return False
+
+
+def _showable(value, depth, active, copies):
+    """
+    :return: COPY OF value WITH REFERENCES BACK TO AN ENCLOSING STRUCTURE REPLACED WITH CYCLE,
+             STRUCTURES DEEPER THAN MAX_DEPTH REPLACED WITH DEEPER, AND ARRAYS REPLACED WITH THEIR list
+    """
+    _class = value.__class__
+    if _class is not dict and _class is not list:
+        if is_array_class(_class):
+            return _showable(to_list(value), depth, active, copies)
+        return value
+    key = id(value)
+    if key in active:
+        return CYCLE
+    if depth == MAX_DEPTH:
+        return DEEPER
+    if key in copies:
+        return copies[key]
+    active.add(key)
+    if _class is dict:
+        output = {k: _showable(v, depth + 1, active, copies) for k, v in value.items()}
+    else:
+        output = [_showable(v, depth + 1, active, copies) for v in value]
+    active.discard(key)
+    copies[key] = output
+    return output
+
+
+def path_text(path):
+    """
+    :param path: LINKED (parent, step, is_index) TUPLES, ENDING IN None
+    :return: HUMAN READABLE PATH, LIKE THE msg PREFIX OF OLDER VERSIONS
+    """
+    steps = []
+    while path:
+        path, step, is_index = path
+        steps.append(("index " + str(step) if is_index else "key " + quote(step)) + ": ")
+    return "".join(reversed(steps))
+
+
+class Tolerance:
+    """
+    HOW CLOSE TWO NUMBERS MUST BE, RESOLVED ONCE FROM digits, places OR delta
+    """
+
+    __slots__ = ["digits", "places", "delta", "ambiguous", "close"]
+
+    def __init__(self, *, digits=None, places=None, delta=None):
+        self.digits = digits
+        self.places = places
+        self.delta = delta
+        self.ambiguous = (digits is not None) + (places is not None) + (delta is not None) > 1
+        if self.ambiguous:
+            self.close = _ambiguous
+        elif digits is not None:
+            self.close = _within_digits(pow(10, digits))
+        elif delta is not None:
+            self.close = _within_delta(delta)
+        else:
+            self.close = _within_places(15 if places is None else places)
+
+    def compare(self, test, expected, path):
+        """
+        RAISE Mismatch IF FLOATS test AND expected ARE NOT CLOSE ENOUGH
+        """
+        if self.close(test, expected):
+            return
+
+        digits, places, delta = self.digits, self.places, self.delta
+        if digits is not None:
+            template = "{test|json} != {expected|json} within {digits} decimal places"
+        elif delta is not None:
+            template = "{test|json} != {expected|json} within {delta} delta"
+        else:
+            if places is None:
+                places = 15
+            template = "{test|json} != {expected|json} within {places} places"
+
+        raise Mismatch(
+            template,
+            {"test": test, "expected": expected, "digits": digits, "places": places, "delta": delta},
+            path,
+            assertion=PREFIXED,
+        )
+
+
+_tolerances = {}
+
+
+def get_tolerance(digits=None, places=None, delta=None):
+    """
+    :return: THE (SHARED) Tolerance FOR THESE PARAMETERS
+    """
+    key = (digits, places, delta)
+    tolerance = _tolerances.get(key)
+    if tolerance is None:
+        tolerance = _tolerances[key] = Tolerance(digits=digits, places=places, delta=delta)
+    return tolerance
+
+
+# FUNCTION(test, expected) RETURNS True IF FLOATS test AND expected ARE CLOSE ENOUGH
+
+
+def _ambiguous(test, expected):
+    raise TypeError("specify only one of digits, places or delta")
+
+
+def _within_digits(scale):
+    def close(test, expected):
+        try:
+            return round(abs(test - expected) * scale) == 0
+        except Exception:
+            return False
+
+    return close
+
+
+def _within_delta(delta):
+    def close(test, expected):
+        return abs(test - expected) <= delta
+
+    return close
+
+
+def _within_places(places):
+    def close(test, expected):
+        # SAME AS mo_math.ceiling(log10(abs(test))), WITHOUT THE Null HANDLING
+        try:
+            factor = int(floor(log(abs(test), 10) + 1))
+            return log(abs(test - expected), 10) - factor + places < -0.3
+        except Exception:
+            return False
+
+    return close
+
+
+class Context:
+    """
+    THE STATE OF ONE COMPARISON
+    memo - (id(test), id(expected)) -> (test, expected, result) FOR EACH PAIR OF STRUCTURES ALREADY SEEN
+           result IS None WHILE THE PAIR IS BEING COMPARED, True IF IT MATCHED, OR THE EXCEPTION IT RAISED
+           test AND expected ARE KEPT SO THEIR id() IS NOT REUSED
+    hits - NUMBER OF TIMES A PAIR WAS FOUND IN memo, SO A SUBTREE WITHOUT HITS CAN BE FORGOTTEN WHEN IT IS DONE
+    """
+
+    __slots__ = ["tolerance", "memo", "hits", "exact"]
+
+    def __init__(self, tolerance, exact=None):
+        self.tolerance = tolerance
+        self.memo = {}
+        self.hits = 0
+        self.exact = EXACT_FIRST if exact is None else exact  # ACCEPT test == expected, WHERE Plan.exact
+
+
+class Plan:
+    """
+    WHAT expected LOOKS LIKE, SO IT IS NOT INSPECTED AGAIN ON EVERY COMPARISON
+    CHILD PLANS ARE BUILT ON FIRST USE, OR ALL AT ONCE WITH compile()
+    """
+
+    __slots__ = [
+        "expected",
+        "kind",
+        "missing",
+        "is_set",
+        "is_data",
+        "is_function",
+        "is_many",
+        "empty",
+        "number",
+        "unix",
+        "_child",
+        "_items",
+        "_elements",
+        "_set_index",
+        "_arrays",
+        "_records",
+        "_exact",
+    ]
+
+    def __init__(self, expected):
+        info = TYPES[expected.__class__]
+        if not info.plain:
+            expected = from_data(expected)
+            info = TYPES[expected.__class__]
+        self.expected = expected
+        self.missing = info.missable and not expected
+        self.is_set = False
+        self.is_data = False
+        self.is_function = False
+        self.is_many = False
+        self.empty = False
+        self.number = None
+        self.unix = None
+        self._child = None
+        self._items = None
+        self._elements = None
+        self._set_index = None
+        self._arrays = None
+        self._records = None
+        self._exact = None
+
+        if info.null:
+            self.kind = NOTHING
+            return
+        elif info.text:
+            self.kind = TEXT
+        elif info.null_op or info.list and len(expected) == 0:
+            self.kind = ABSENT
+            return
+        elif info.list and len(expected) == 1:
+            self.kind = SINGLETON
+            return
+        else:
+            self.kind = STRUCTURE
+            self.is_set = info.set
+            self.is_data = info.data
+            self.is_function = info.function
+            self.is_many = info.many
+
+        if self.is_many:
+            self.empty = not expected
+        elif not (self.is_data or self.is_function):
+            if info.date:
+                from mo_times import dates
+
+                self.unix = dates.Date(expected).unix
+            elif info.number or is_number(expected):
+                try:
+                    self.number = float(expected)
+                except OverflowError:
+                    # AN int TOO BIG FOR A float IS COMPARED WITH == ONLY
+                    pass
+
+    def __reduce__(self):
+        # SENT TO ANOTHER PROCESS AS expected, WITH WHAT IS ALREADY BUILT, SO IT IS NOT BUILT AGAIN
+        state = {}
+        for k in _BUILT:
+            v = getattr(self, k)
+            if v is not None:
+                state[k] = v
+        return Plan, (self.expected,), state
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+
+    @property
+    def child(self):
+        # THE PLAN FOR THE SINGLETON ELEMENT
+        child = self._child
+        if child is None:
+            child = self._child = self._plan(self.expected[0])
+        return child
+
+    @property
+    def items(self):
+        # (key, key for get(), plan) FOR EACH PROPERTY
+        items = self._items
+        if items is None:
+            items = self._items = [(k, Null if is_missing(k) else k, self._plan(e)) for k, e in self.expected.items()]
+        return items
+
+    @property
+    def has_items(self):
+        return self._items is not None
+
+    @property
+    def elements(self):
+        # PLANS FOR EACH ELEMENT, IN ORDER
+        elements = self._elements
+        if elements is None:
+            expected = self.expected
+            if expected == None:
+                expected = []  # REPRESENT NOTHING
+            elements = self._elements = [self._plan(e) for e in expected]
+        return elements
+
+    def stream(self):
+        """
+        PLANS FOR EACH ELEMENT, IN ORDER
+        AN expected GENERATOR IS CONSUMED ONE ELEMENT AT A TIME, AND ITS PLANS ARE NOT KEPT
+        """
+        if self._elements is None and isinstance(self.expected, generator_types):
+            return (self._plan(e) for e in self.expected)
+        return self.elements
+
+    @property
+    def has_elements(self):
+        return self._elements is not None
+
+    def element(self, i):
+        """
+        THE PLAN OF ELEMENT i, WITHOUT BUILDING THE PLANS OF THE OTHERS
+        """
+        elements = self._elements
+        if elements is None:
+            return self._plan(self.expected[i])
+        return elements[i]
+
+    @property
+    def set_index(self):
+        # HOW TO FIND CANDIDATES FOR EACH ELEMENT OF AN expected SET
+        index = self._set_index
+        if index is None:
+            index = self._set_index = ExpectedSet(self.elements)
+        return index
+
+    @property
+    def arrays(self):
+        # VECTORS OF expected VALUES, BUILT AND KEPT BY mo_testing.arrays
+        arrays = self._arrays
+        if arrays is None:
+            arrays = self._arrays = {}
+        return arrays
+
+    @property
+    def records(self):
+        # THE expected LIST OF RECORDS, BY COLUMN, OR None IF IT IS NOT ONE
+        records = self._records
+        if records is None:
+            records = self._records = columns.Records.of_plan(self) or False
+        return records or None
+
+    @property
+    def exact(self):
+        # True IF test == expected PROVES test MATCHES, SO THE STRUCTURE NEED NOT BE WALKED
+        exact = self._exact
+        if exact is None:
+            exact = self._exact = _exact_safe(self.expected)
+        return exact
+
+    def _plan(self, expected):
+        # THE PLAN OF A CHILD; THE CHILDREN OF AN exact PLAN ARE exact TOO
+        plan = Plan(expected)
+        if self._exact:
+            plan._exact = True
+        return plan
+
+    def compile(self):
+        """
+        BUILD ALL THE CHILD PLANS NOW
+        """
+        todo = [self]
+        seen = set()  # id() OF EXPECTED STRUCTURES, SO SHARED (AND CYCLIC) STRUCTURES ARE COMPILED ONCE
+        while todo:
+            plan = todo.pop()
+            if plan.kind == STRUCTURE and (plan.is_data or plan.is_many):
+                if id(plan.expected) in seen:
+                    continue
+                seen.add(id(plan.expected))
+            if plan.kind == SINGLETON:
+                todo.append(plan.child)
+            elif plan.kind == STRUCTURE:
+                if plan.is_data:
+                    todo.extend(p for _, _, p in plan.items)
+                if plan.is_many:
+                    todo.extend(plan.elements)
+                if plan.is_set:
+                    plan.set_index
+        return self
+
+
+_NOTHING = Plan(None)
+_BUILT = ["_child", "_items", "_elements", "_set_index", "_arrays", "_records", "_exact"]  # WHAT A PLAN CACHES
+
+# THE ONLY CLASSES WHERE test == expected MEANS test MATCHES expected
+_exact_values = {str, int, bool, float, type(None)}
+
+
+def _exact_safe(expected):
+    """
+    :return: True IF expected IS A TREE OF ONLY dict (WITH NON-EMPTY str KEYS), list, tuple, str, int, bool,
+             float (NOT NaN) AND None, NO DEEPER THAN EXACT_DEPTH
+    THE FUZZY RULES ACCEPT EVERY test THAT IS == TO SUCH AN expected; OTHER CLASSES (FUNCTIONS, SETS, Data, DATES,
+    SUBCLASSES) MAY MATCH BY RULES THAT DO NOT AGREE WITH ==
+    SHARED STRUCTURES ARE NOT SAFE: == COMPARES THEM ONCE FOR EVERY PATH TO THEM, NOT ONCE LIKE THE ENGINE DOES
+    """
+    seen = set()  # id() OF STRUCTURES ALREADY FOUND
+    values = _exact_values
+    todo = [(expected, 0)]
+    while todo:
+        value, depth = todo.pop()
+        _class = value.__class__
+        if _class is dict:
+            for k in value:
+                if k.__class__ is not str or not k:
+                    return False
+            children = value.values()
+        elif _class is list or _class is tuple:
+            children = value
+        elif _class in values:
+            if _class is float and value != value:
+                return False
+            continue
+        else:
+            return False
+        key = id(value)
+        if key in seen or depth == EXACT_DEPTH:
+            return False
+        seen.add(key)
+        depth += 1
+        for c in children:
+            _class = c.__class__
+            if _class in values:
+                if _class is float and c != c:
+                    return False
+            else:
+                todo.append((c, depth))
+    return True
+
+
+def _equal(test, expected):
+    """
+    :return: True IF test == expected, False IF NOT, OR IF == IS NOT A SIMPLE ANSWER (LIKE AN ARRAY OF bool)
+    """
+    try:
+        return (test == expected) is True
+    except Exception:
+        return False
+
+
+def _compare(test, plan, path, context):
+    """
+    RAISE Mismatch (OR ANY OTHER EXCEPTION) IF test DOES NOT MATCH plan
+    THE WALK USES AN EXPLICIT STACK OF GENERATORS, SO NESTING DEPTH IS LIMITED ONLY BY MEMORY
+    A GENERATOR YIELDS THE GENERATOR OF A CHILD COMPARISON, AND GETS THE CHILD'S MISMATCH THROWN BACK IN
+    """
+    task = _start(test, plan, path, context)
+    if task is None:
+        return
+    stack = []
+    problem = None
+    while True:
+        try:
+            if problem is None:
+                child = task.send(None)
+            else:
+                thrown, problem = problem, None
+                child = task.throw(thrown)
+        except StopIteration:
+            if not stack:
+                return
+            task = stack.pop()
+            continue
+        except Exception as cause:
+            if not stack:
+                raise
+            task = stack.pop()
+            problem = cause
+            continue
+        stack.append(task)
+        task = child
+
+
+def _start(test, plan, path, context):
+    """
+    COMPARE test WITH plan, AS FAR AS POSSIBLE WITHOUT LOOKING AT CHILDREN
+    :return: None IF test MATCHES, OR A GENERATOR FOR _compare() TO RUN
+    """
+    info = TYPES[test.__class__]
+    if not info.plain:
+        test = from_data(test)
+        info = TYPES[test.__class__]
+        if info.generator:
+            return _compare_stream(test, plan, path, context)
+    expected = plan.expected
+    kind = plan.kind
+    if info.array and kind is not STRUCTURE:
+        # ONLY A STRUCTURE IS COMPARED AS AN ARRAY; THE OTHER RULES (LIKE not test) NEED A PLAIN list
+        test = to_list(test)
+        info = TYPES[test.__class__]
+    try:
+        if test is expected:
+            return
+        elif kind is NOTHING:
+            return
+        elif context.exact and kind is STRUCTURE and plan.exact and _equal(test, expected):
+            # ONLY A STRUCTURE: ITS VALUE RULE ACCEPTS test == expected ANYWAY, THE ABSENT AND SINGLETON RULES DO NOT
+            return
+        elif plan.missing and info.missable and not test:
+            return
+        elif kind is TEXT:
+            _compare_value(test, plan, path, context)
+        elif kind is ABSENT:
+            if info.missable and not test:
+                return
+            raise Mismatch("{test|json|limit(10000)} is expected to not exist", {"test": test}, path)
+        elif kind is SINGLETON:
+            return _walk_singleton(test, plan, path, context)
+    except Exception as cause:
+        raise Mismatch(NOT_MATCHED, {"test": test, "expected": expected}, path, cause)
+    if kind is not STRUCTURE:
+        return
+    if info.value:
+        if plan.is_data or plan.is_many or plan.is_function:
+            return _walk_structure(test, plan, path, context)
+        # ONLY THE VALUE RULE CAN APPLY
+        try:
+            _compare_value(test, plan, path, context)
+            return
+        except Exception as cause:
+            raise Mismatch(NOT_MATCHED, {"test": test, "expected": expected}, path, cause)
+
+    # SHARED (AND CYCLIC) STRUCTURES ARE COMPARED ONCE
+    key = (id(test), id(expected))
+    seen = context.memo.get(key)
+    if seen is not None:
+        context.hits += 1
+        result = seen[2]
+        if result is None or result is True:
+            # None - ALREADY BEING COMPARED, SO THIS IS A CYCLE, WHICH MATCHES IF THE REST OF IT DOES
+            return
+        raise result
+    return _walk_memo(test, plan, path, context, key)
+
+
+def _walk_singleton(test, plan, path, context):
+    try:
+        child = _start(test, plan.child, path, context)
+        if child is not None:
+            yield child
+    except Exception as cause:
+        raise Mismatch(NOT_MATCHED, {"test": test, "expected": plan.expected}, path, cause)
+
+
+def _walk_memo(test, plan, path, context, key):
+    """
+    _walk_structure(), REMEMBERING THE RESULT FOR THIS PAIR
+    THE PAIRS BELOW IT ARE FORGOTTEN WHEN IT IS DONE, UNLESS ONE WAS SEEN AGAIN, SO A TREE KEEPS ONLY ONE LEVEL
+    """
+    memo = context.memo
+    expected = plan.expected
+    size = len(memo)
+    hits = context.hits
+    memo[key] = (test, expected, None)
+    try:
+        yield from _walk_structure(test, plan, path, context)
+    except Exception as cause:
+        memo[key] = (test, expected, cause)
+        raise
+    else:
+        memo[key] = (test, expected, True)
+    finally:
+        if context.hits == hits:
+            # NOTHING BELOW WAS SHARED; KEEP THIS PAIR IN CASE IT IS
+            _forget(memo, size + 1)
+
+
+def _walk_structure(test, plan, path, context):
+    """
+    COMPARE test WITH plan OF KIND STRUCTURE, YIELDING THE GENERATORS OF CHILD COMPARISONS; RAISE Mismatch IF IT DOES NOT MATCH
+    """
+    expected = plan.expected
+    info = TYPES[test.__class__]
+    if info.array and not plan.is_function:
+        compare_array(test, plan, path, context, _compare, Mismatch)
+        return
+
+    first_cause = None
+    if info.list and len(test) == 1 and TYPES[test[0].__class__].many and plan.is_many:
+        try:
+            child = _start(test[0], plan, path, context)
+            if child is not None:
+                yield child
+            return
+        except Exception as cause:
+            first_cause = cause
+
+    if plan.is_set and info.many:
+        test = set(to_data(t) for t in test)
+        if len(test) != len(expected):
+            raise Mismatch(
+                "Sets do not match, element count different:\n{test|json|indent}\nexpecting{expected|json|indent}",
+                {"test": test, "expected": expected},
+                path,
+            )
+
+        try:
+            if len(test | expected) != len(test):
+                raise Exception()
+        except:
+            missing = match_set(list(test), plan.set_index, lambda t, e: _matches(t, e, path, context))
+            if missing is not None:
+                raise Mismatch(
+                    "Sets do not match. {value|json} not found in {test|json}",
+                    {"value": missing.expected, "test": test},
+                    path,
+                )
+        return  # ok
+
+    if plan.is_data and info.data:
+        try:
+            for _, k, e in plan.items:
+                t = test.get(k)
+                try:
+                    child = _start(t, e, (path, k, False), context)
+                    if child is not None:
+                        yield child
+                except Exception as cause:
+                    raise Mismatch(KEY_NOT_MATCHED, {"k": k, "t": t, "e": e.expected}, path, cause)
+            return
+        except Exception as cause:
+            first_cause = first_cause or cause
+
+    if plan.is_data:
+        try:
+            if info.many:
+                test = list(test)
+                if len(test) != 1:
+                    raise Mismatch("Expecting data, not a list", {}, path)
+                test = test[0]
+            for k, _, e in plan.items:
+                t = get_attr(test, literal_field(k))
+                try:
+                    child = _start(t, e, (path, k, False), context)
+                    if child is not None:
+                        yield child
+                except Exception as cause:
+                    raise Mismatch(KEY_NOT_MATCHED, {"k": k, "t": t, "e": e.expected}, path, cause)
+            return
+        except Exception as cause:
+            first_cause = first_cause or cause
+
+    if plan.is_function:
+        try:
+            expected(test)
+            return
+        except Exception as cause:
+            first_cause = first_cause or cause
+
+    if plan.is_many and TYPES[test.__class__].many:
+        try:
+            if plan.empty and test == None:
+                return
+            if _columnar(test, plan):
+                yield from columns.walk_records(test, plan, plan.records, path, context, _start, _matches, plan._plan)
+                return
+            for i, (t, e) in enumerate(zip_longest(test, plan.elements)):
+                child = _start(t, e or _NOTHING, (path, i, True), context)
+                if child is not None:
+                    yield child
+            return
+        except Exception as cause:
+            first_cause = first_cause or cause
+    try:
+        _compare_value(test, plan, path, context)
+        return
+    except Exception as cause:
+        first_cause = first_cause or cause
+
+    raise Mismatch(NOT_MATCHED, {"test": test, "expected": expected}, path, first_cause)
+
+
+def _columnar(test, plan):
+    """
+    :return: True IF test, AND plan, ARE LISTS OF RECORDS LONG ENOUGH TO COMPARE ONE COLUMN AT A TIME
+    """
+    if COLUMNAR_ROWS is None or plan.is_set or test.__class__ not in (list, tuple):
+        return False
+    size = len(test)
+    if size < COLUMNAR_ROWS or len(plan.expected) < COLUMNAR_ROWS or plan.records is None:
+        return False
+    return all(row.__class__ is dict for row in test)
+
+
+def _compare_stream(test, plan, path, context):
+    """
+    COMPARE GENERATOR test ONE ELEMENT AT A TIME, SO IT IS NEVER HELD IN MEMORY
+    STOPS AT THE FIRST ELEMENT THAT DOES NOT MATCH
+    """
+    kind = plan.kind
+    if kind is NOTHING:
+        return
+    if kind is STRUCTURE and plan.is_many:
+        # A STREAM OF ONE list (OR set) MAY MATCH AS THAT list, LIKE A list OF ONE DOES IN _walk_structure()
+        head = next(test, _NOTHING)
+        if head is _NOTHING:
+            test = iter(())
+        else:
+            second = next(test, _NOTHING)
+            if second is not _NOTHING:
+                test = chain((head, second), test)
+            else:
+                info = TYPES[head.__class__]
+                if info.many and not info.generator:
+                    try:
+                        _compare(head, plan, path, context)
+                        return
+                    except Exception:
+                        pass
+                test = iter((head,))
+
+    if kind is ABSENT:
+        elements = ()
+        if next(test, _NOTHING) is not _NOTHING:
+            raise Mismatch("stream is expected to be empty", {}, path)
+    elif kind is SINGLETON:
+        # THE SINGLETON RULE COMPARES THE WHOLE test WITH THE ONE ELEMENT, AS IT DOES FOR A list
+        child = plan.child
+        if child.kind in (TEXT, STRUCTURE) and not (child.is_many and not child.is_data):
+            # ONLY A list, OR set, IS COMPARED ONE ELEMENT AT A TIME
+            return _compare(list(test), plan, path, context)
+        return _compare_stream(test, child, path, context)
+    elif plan.is_set:
+        missing = match_stream(test, plan.set_index, lambda t, e: _matches_row(t, e, path, context), path, Mismatch)
+        if missing is not None:
+            raise Mismatch("Sets do not match. {value|json} not found in stream", {"value": missing.expected}, path)
+        return
+    elif plan.is_many and not plan.is_data:
+        elements = plan.stream()
+    else:
+        raise Mismatch("can not accept generators as test value, unless a list or set is expected", {}, path)
+
+    memo = context.memo
+    for row, e in enumerate(elements):
+        t = next(test, None)
+        size = len(memo)
+        try:
+            _compare(t, e, (path, row, True), context)
+        except Exception as cause:
+            raise Mismatch("stream does not match at row {row}", {"row": row}, path, cause)
+        finally:
+            _forget(memo, size)
+    # ANY MORE test ELEMENTS ARE EXPECTED TO BE NOTHING, WHICH ALWAYS MATCHES, SO THEY ARE NOT READ
+
+
+def _matches(test, plan, path, context):
+    try:
+        _compare(test, plan, path, context)
+        return True
+    except Exception:
+        return False
+
+
+def _matches_row(test, plan, path, context):
+    # _matches(), WITHOUT KEEPING THE STREAMED ROW IN THE MEMO
+    memo = context.memo
+    size = len(memo)
+    try:
+        return _matches(test, plan, path, context)
+    finally:
+        _forget(memo, size)
+
+
+def _forget(memo, size):
+    """
+    DROP THE PAIRS ADDED TO memo SINCE IT HAD size ENTRIES, SO A PAIR IS NOT KEPT AFTER IT CAN NO LONGER BE SEEN AGAIN
+    (PAIRS ARE ONLY ADDED, OR UPDATED IN PLACE, SO THE NEWEST ENTRIES ARE THE LAST)
+    """
+    while len(memo) > size:
+        memo.popitem()
+
+
+NOT_MATCHED = "{test|json|limit(10000)} does not match expected {expected|json|limit(10000)}"
+KEY_NOT_MATCHED = "key {k}={t} does not match expected {k}={e}"
+
+
+def _compare_value(test, plan, path, context):
+    """
+    RAISE Mismatch IF VALUE test DOES NOT MATCH plan
+    """
+    expected = plan.expected
+    if test == expected:
+        return
+    number = plan.number
+    if number is not None and TYPES[test.__class__].number:
+        try:
+            value = float(test)
+            if value == number or context.tolerance.close(value, number):
+                return
+        except OverflowError:
+            pass
+    if plan.unix is not None:
+        from mo_testing.timestamps import unix
+
+        return _compare_number(unix(test), plan.unix, path, context)
+    if TYPES[test.__class__].finite and len(test) == 1:
+        return _compare(first(test), plan, path, context)
+    if plan.number is None:
+        raise Mismatch("{test|json} != {expected|json}", {"test": test, "expected": expected}, path, assertion=True)
+    return _compare_number(test, plan.number, path, context)
+
+
+def _compare_number(test, expected, path, context):
+    if test == expected:
+        return
+    if not is_number(test):
+        # ASSUME IT IS A UTC DATE
+        from mo_testing.timestamps import parse_unix
+
+        unix = parse_unix(test)
+        if unix is None:
+            raise Mismatch("{test|json} != {expected}", {"test": test, "expected": expected}, path, assertion=True)
+        test = unix
+
+    # WE NOW ASSUME test IS A NUMBER
+    test = float(test)
+    if test == expected:
+        return
+    context.tolerance.compare(test, expected, path)
+
+
+def is_null_op(v):
+    return v.__class__.__name__ == "NullOp"
@@ -1,15 +1,38 @@
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from itertools import count
+from threading import Lock
+from timeit import default_timer
+
 from mo_logs import logger
 from mo_future import Mockable, mockable
 
 
-def mock(mockable, *, value=None, function=None):
+DEFAULT_CAPACITY = 1000  # MOST CALLS KEPT BY A RECORDING MOCK
+
+
+def mock(mockable, *, value=None, function=None, record=False, capacity=DEFAULT_CAPACITY, sample=1):
     """
     FUNCTION DECORATOR TO ALLOW REPLACEMENT WITH ANOTHER function (OR value)
+    THE REPLACEMENT IS SEEN ONLY BY THE THREAD, OR asyncio TASK, THAT ENTERED IT (AND THE TASKS IT STARTS)
+    :param record: KEEP THE CALLS IN Mocking.calls; WITH NO function OR value, THE ORIGINAL IS CALLED
+    :param capacity: MOST CALLS KEPT; THE OLDEST ARE FORGOTTEN
+    :param sample: KEEP ONE OF EVERY sample CALLS (ALL CALLS ARE COUNTED, AND TIMED)
     """
+    asynchronous = iscoroutinefunction(_original(mockable))
     if function is None:
-        function = _constant(value)
+        if record and value is None:
+            function = _original(mockable)
+        else:
+            function = _constant(value, asynchronous=asynchronous)
 
-    return Mocking(mockable, function)
+    if not record:
+        return Mocking(mockable, function)
+    calls = Calls(capacity, sample)
+    output = Mocking(mockable, calls.wrap(function, asynchronous or iscoroutinefunction(function)))
+    output.calls = calls
+    return output
 
 
 class Mocking:
@@ -22,24 +45,272 @@ class Mocking:
             logger.error("expecting Mockable, not {mockable}", mockable=mockable, stack_depth=1)
         self.mockable = mockable
         self.mock = mock
-        self.func = None
+        self.tokens = []  # ONE PER __enter__, SO THE SAME Mocking CAN BE ENTERED AGAIN
+        self.calls = None  # Calls, IF RECORDING
 
     def __enter__(self):
-        self.func, self.mockable.func = self.mockable.func, self.mock
+        self.tokens.append(_push(self.mockable, self.mock))
+        return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.func, self.mockable.func = None, self.func
+        _pop(self.mockable, self.mock, self.tokens.pop())
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.__exit__(exc_type, exc_val, exc_tb)
 
     def __call__(self, func):
-        def wrapped(*args, **kwargs):
-            with self:
-                return func(*args, **kwargs)
+        mockable, mock = self.mockable, self.mock
+
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapped(*args, **kwargs):
+                token = _push(mockable, mock)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _pop(mockable, mock, token)
+
+        else:
+
+            @wraps(func)
+            def wrapped(*args, **kwargs):
+                token = _push(mockable, mock)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    _pop(mockable, mock, token)
 
         return wrapped
 
 
-def _constant(value):
-    def f(*args, **kwargs):
-        return value
+class Call:
+    """
+    ONE RECORDED CALL
+    """
+
+    __slots__ = ["args", "kwargs", "result", "error", "seconds"]
+
+    def __init__(self, args, kwargs, result, error, seconds):
+        self.args = args
+        self.kwargs = kwargs
+        self.result = result
+        self.error = error
+        self.seconds = seconds
+
+    def __data__(self):
+        return {
+            "args": list(self.args),
+            "kwargs": self.kwargs or {},
+            "result": self.result,
+            "error": self.error,
+            "seconds": self.seconds,
+        }
+
+    def __repr__(self):
+        return f"Call({self.__data__()!r})"
+
+
+class Calls:
+    """
+    RING BUFFER OF THE LATEST CALLS TO A MOCK, WITH ASSERTIONS THAT USE THE assertAlmostEqual RULES
+    """
+
+    __slots__ = ["capacity", "sample", "buffer", "counter", "count", "seconds"]
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, sample=1):
+        if capacity < 1 or sample < 1:
+            logger.error("expecting positive capacity and sample")
+        self.capacity = capacity
+        self.sample = sample
+        self.buffer = [None] * capacity
+        self.counter = count()
+        self.count = 0  # ALL CALLS, RECORDED OR NOT
+        self.seconds = 0  # TIME SPENT IN ALL CALLS
+
+    def wrap(self, function, asynchronous):
+        """
+        :return: function, RECORDING ITS CALLS HERE
+        """
+        if asynchronous:
+
+            async def recorded(*args, **kwargs):
+                start = default_timer()
+                try:
+                    result = await function(*args, **kwargs)
+                except BaseException as cause:
+                    self._add(args, kwargs, None, cause, start)
+                    raise
+                self._add(args, kwargs, result, None, start)
+                return result
+
+        else:
+
+            def recorded(*args, **kwargs):
+                start = default_timer()
+                try:
+                    result = function(*args, **kwargs)
+                except BaseException as cause:
+                    self._add(args, kwargs, None, cause, start)
+                    raise
+                self._add(args, kwargs, result, None, start)
+                return result
+
+        return recorded
+
+    def _add(self, args, kwargs, result, error, start):
+        seconds = default_timer() - start
+        i = next(self.counter)  # ATOMIC, SO CONCURRENT CALLS GET DIFFERENT SLOTS
+        self.count = i + 1
+        self.seconds += seconds
+        if i % self.sample:
+            return
+        j = i // self.sample
+        self.buffer[j % self.capacity] = Call(args, kwargs or None, result, error, seconds)
+
+    @property
+    def calls(self):
+        """
+        :return: LIST OF THE RECORDED Call, OLDEST FIRST
+        """
+        recorded = (self.count + self.sample - 1) // self.sample
+        if recorded <= self.capacity:
+            output = self.buffer[:recorded]
+        else:
+            start = recorded % self.capacity
+            output = self.buffer[start:] + self.buffer[:start]
+        return [c for c in output if c is not None]
+
+    def __len__(self):
+        return self.count
+
+    def assert_called(self, *args, **kwargs):
+        """
+        ASSERT SOME RECORDED CALL MATCHES THESE PARAMETERS
+        """
+        self.assert_call({"args": list(args), "kwargs": kwargs})
+
+    def assert_called_with(self, *args, **kwargs):
+        """
+        ASSERT THE LATEST CALL MATCHES THESE PARAMETERS
+        """
+        calls = self.calls
+        if not calls:
+            logger.error("expecting a call")
+        try:
+            _matcher({"args": list(args), "kwargs": kwargs})(calls[-1].__data__())
+        except Exception as cause:
+            logger.error("latest call does not match", cause=cause)
+
+    def assert_call(self, expected):
+        """
+        ASSERT SOME RECORDED CALL MATCHES expected, A {args, kwargs, result, error, seconds} STRUCTURE
+        """
+        matcher = _matcher(expected)
+        problem = None
+        for call in reversed(self.calls):
+            try:
+                matcher(call.__data__())
+                return
+            except Exception as cause:
+                problem = problem or cause
+        logger.error(
+            "none of {num} recorded calls match {expected}", num=len(self.calls), expected=expected, cause=problem
+        )
+
+    def assert_calls(self, expected):
+        """
+        ASSERT THE RECORDED CALLS, OLDEST FIRST, MATCH THE LIST OF expected
+        """
+        try:
+            _matcher(expected)([c.__data__() for c in self.calls])
+        except Exception as cause:
+            logger.error("recorded calls do not match", cause=cause)
+
+    def assert_not_called(self):
+        if self.count:
+            logger.error("expecting no calls, not {num}", num=self.count)
+
+
+def _matcher(expected):
+    # THE COMPARISON ENGINE IS LOADED ONLY WHEN CALLS ARE CHECKED
+    from mo_testing.matcher import Matcher
+
+    return Matcher(expected)
+
+
+class _Mocked:
+    """
+    STATE OF A Mockable WITH AT LEAST ONE ACTIVE Mocking, IN ANY CONTEXT
+    """
+
+    __slots__ = ["original", "stack", "active"]
+
+    def __init__(self, original):
+        self.original = original
+        self.stack = ContextVar(f"mock of {getattr(original, '__name__', 'function')}", default=())  # TUPLE OF MOCKS
+        self.active = 0  # NUMBER OF Mocking ENTERED, IN ALL CONTEXTS
+
+
+_lock = Lock()
+_mocked = {}  # Mockable -> _Mocked
+
+
+def _original(mockable):
+    state = _mocked.get(mockable)
+    return getattr(mockable, "func", None) if state is None else state.original
+
+
+def _push(mockable, mock):
+    with _lock:
+        state = _mocked.get(mockable)
+        if state is None:
+            state = _mocked[mockable] = _Mocked(mockable.func)
+            mockable.func = _dispatcher(state)
+        state.active += 1
+    return state.stack.set(state.stack.get() + (mock,))
+
+
+def _pop(mockable, mock, token):
+    state = _mocked[mockable]
+    try:
+        state.stack.reset(token)
+    except ValueError:
+        # EXITED IN ANOTHER CONTEXT THAN IT WAS ENTERED; REMOVE THE INNERMOST USE OF THIS mock
+        stack = state.stack.get()
+        i = max((i for i, m in enumerate(stack) if m is mock), default=None)
+        if i is not None:
+            state.stack.set(stack[:i] + stack[i + 1 :])
+    with _lock:
+        state.active -= 1
+        if not state.active:
+            # NO MOCK IS ACTIVE, SO CALLS GO STRAIGHT TO THE ORIGINAL AGAIN
+            mockable.func = state.original
+            del _mocked[mockable]
+
+
+def _dispatcher(state):
+    original, stack = state.original, state.stack
+
+    def dispatch(*args, **kwargs):
+        mocks = stack.get()
+        return (mocks[-1] if mocks else original)(*args, **kwargs)
+
+    return dispatch
+
+
+def _constant(value, asynchronous=False):
+    if asynchronous:
+
+        async def f(*args, **kwargs):
+            return value
+
+    else:
+
+        def f(*args, **kwargs):
+            return value
 
     return f
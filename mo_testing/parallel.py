@@ -0,0 +1,124 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import atexit
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from mo_dots import is_missing, Null
+from mo_future import zip_longest
+
+from mo_testing.matcher import (
+    STRUCTURE,
+    NOT_MATCHED,
+    Context,
+    Mismatch,
+    Plan,
+    get_tolerance,
+    _compare,
+    _matches,
+    _NOTHING,
+)
+
+MIN_SHARD = 10_000  # SMALLER CHUNKS ARE NOT WORTH SENDING TO ANOTHER PROCESS
+SHARDS_PER_WORKER = 4  # SO A SLOW CHUNK DOES NOT LEAVE THE OTHER WORKERS IDLE
+_pools = {}  # workers -> ProcessPoolExecutor, KEPT FOR THE NEXT CALL, AND SHUT DOWN AT EXIT
+
+
+def compare_sharded(test, plan, context, workers):
+    """
+    COMPARE THE ELEMENTS OF A LARGE TOP-LEVEL list (OR THE PROPERTIES OF A LARGE dict) ON A POOL OF PROCESSES
+    A COMPILED plan SENDS ITS CHILD PLANS, SO THE WORKERS DO NOT BUILD THEM AGAIN; OTHERWISE expected IS SENT
+    CHUNKS THAT CAN NOT BE PICKLED (LIKE lambda EXPECTATIONS) ARE COMPARED IN THIS PROCESS
+    :return: True IF test WAS COMPARED AND MATCHES, False IF IT IS NOT WORTH SPLITTING
+    RAISE Mismatch, THE SAME AS A SERIAL COMPARISON, IF IT DOES NOT MATCH
+    """
+    expected = plan.expected
+    if plan.kind is not STRUCTURE:
+        return False
+    if plan.is_data and test.__class__ is dict and expected.__class__ is dict:
+        # THE SAME LOOKUP AS THE FIRST data RULE OF _walk_structure()
+        keys = [Null if is_missing(k) else k for k in expected.keys()]
+        tests = [test.get(k) for k in keys]
+        expects = [p for _, _, p in plan.items] if plan.has_items else list(expected.values())
+    elif plan.is_many and not plan.is_set and test.__class__ is list and expected.__class__ in (list, tuple):
+        keys = None
+        tests, expects = test, plan.elements if plan.has_elements else expected
+    else:
+        return False
+
+    size = max(len(tests), len(expects))
+    if size < MIN_SHARD * 2:
+        return False
+
+    first = _first_failure(tests, expects, context, workers, size)
+    if first is None:
+        return True
+
+    if keys is None and test != expected:
+        # THE SERIAL COMPARISON STOPS AT THE FIRST ELEMENT THAT DOES NOT MATCH; EXPLAIN ONLY THAT ONE
+        t = test[first] if first < len(test) else None
+        e = plan.element(first) if first < len(expected) else _NOTHING
+        try:
+            _compare(t, e, (None, first, True), context)
+        except Exception as cause:
+            raise Mismatch(NOT_MATCHED, {"test": test, "expected": expected}, None, cause)
+
+    # A PROPERTY THAT DOES NOT MATCH MAY STILL MATCH BY ANOTHER RULE; LET THE SERIAL COMPARISON DECIDE, AND EXPLAIN
+    _compare(test, plan, None, context)
+    return True
+
+
+def _first_failure(tests, expects, context, workers, size):
+    """
+    :return: INDEX OF THE FIRST ELEMENT THAT DOES NOT MATCH, OR None
+    """
+    chunk = max(MIN_SHARD, -(-size // (workers * SHARDS_PER_WORKER)))
+    tolerance = context.tolerance
+    params = (tolerance.digits, tolerance.places, tolerance.delta, context.exact)
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+
+    futures = []
+    local = []
+    for start in range(0, size, chunk):
+        job = (start, tests[start : start + chunk], expects[start : start + chunk], params)
+        try:
+            payload = pickle.dumps(job, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            local.append(job)
+            continue
+        futures.append(pool.submit(_compare_chunk, payload))
+
+    # COMPARE WHAT COULD NOT BE SENT WHILE THE POOL IS BUSY
+    failures = [_compare_job(job) for job in local]
+    failures.extend(f.result() for f in futures)
+    failures = [f for f in failures if f is not None]
+    return min(failures) if failures else None
+
+
+def _compare_chunk(payload):
+    return _compare_job(pickle.loads(payload))
+
+
+def _compare_job(job):
+    start, tests, expects, (digits, places, delta, exact) = job
+    context = Context(get_tolerance(digits, places, delta), exact)
+    for i, (t, e) in enumerate(zip_longest(tests, expects)):
+        if not _matches(t, e if e.__class__ is Plan else Plan(e), None, context):
+            return start + i
+    return None
+
+
+@atexit.register
+def _shutdown():
+    for pool in _pools.values():
+        pool.shutdown(cancel_futures=True)
+    _pools.clear()
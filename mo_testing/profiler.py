@@ -0,0 +1,268 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import atexit
+import re
+import sys
+import threading
+from timeit import default_timer
+
+from mo_testing import matcher
+from mo_testing.matcher import STRUCTURE
+
+DEFAULT_TOP = 20  # HOT PATHS SHOWN IN THE REPORT
+MAX_STEPS = 8  # LONGEST PATH SHOWN IN THE REPORT; LONGER ONES SHOW ONLY THEIR FIRST AND LAST STEPS
+
+_active = []  # STACK OF Profile, THE LAST ONE RECORDS
+_original = {}  # NAME -> FUNCTION OF matcher, WHILE IT IS REPLACED
+
+
+class PathStats:
+    """
+    WHAT HAPPENED AT ONE PATH (ALL ELEMENTS OF A LIST SHARE A PATH)
+    nodes - NUMBER OF COMPARISONS STARTED
+    set_matches - NUMBER OF ATTEMPTS TO MATCH AN ELEMENT OF AN expected SET
+    calls - NUMBER OF CALLS TO AN expected FUNCTION
+    raised - NUMBER OF MISMATCHES RAISED; MOST ARE SWALLOWED WHEN ANOTHER RULE (OR SET ELEMENT) MATCHES
+    seconds - TIME SPENT, INCLUDING THE CHILDREN
+    children - TIME SPENT IN THE CHILDREN
+    """
+
+    __slots__ = ["path", "nodes", "set_matches", "calls", "raised", "seconds", "children"]
+
+    def __init__(self, path):
+        self.path = path
+        self.nodes = 0
+        self.set_matches = 0
+        self.calls = 0
+        self.raised = 0
+        self.seconds = 0.0
+        self.children = 0.0
+
+    @property
+    def own_seconds(self):
+        return self.seconds - self.children
+
+    def __data__(self):
+        return {
+            "path": self.path,
+            "nodes": self.nodes,
+            "set_matches": self.set_matches,
+            "calls": self.calls,
+            "raised": self.raised,
+            "seconds": self.seconds,
+            "own_seconds": self.own_seconds,
+        }
+
+
+class Profile:
+    """
+    COUNT, AND TIME, THE COMPARISONS MADE AT EACH PATH WHILE ACTIVE
+
+        with Profile() as profile:
+            assertAlmostEqual(test, expected)
+        print(profile.report())
+
+    THE ENGINE IS INSTRUMENTED ONLY WHILE A Profile IS ACTIVE, SO IT COSTS NOTHING OTHERWISE
+    WHILE ACTIVE, LISTS OF RECORDS ARE COMPARED ROW BY ROW, NOT BY COLUMN, SO EVERY PATH IS SEEN
+    IT COUNTS THE COMPARISONS OF ALL THREADS OF THE PROCESS; EACH THREAD TIMES ITS OWN
+    """
+
+    def __init__(self):
+        self.stats = {}  # PATH PATTERN -> PathStats
+        self._local = threading.local()
+
+    @property
+    def _running(self):
+        # PathStats OF THIS THREAD'S COMPARISONS IN PROGRESS, INNERMOST LAST
+        running = getattr(self._local, "running", None)
+        if running is None:
+            running = self._local.running = []
+        return running
+
+    @property
+    def _branch(self):
+        # PATTERNS OF THE PATHS THIS THREAD IS COMPARING
+        branch = getattr(self._local, "branch", None)
+        if branch is None:
+            branch = self._local.branch = _Branch()
+        return branch
+
+    def __enter__(self):
+        if not _active:
+            _instrument()
+        _active.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _active.remove(self)
+        if not _active:
+            _restore()
+
+    def hot(self, top=DEFAULT_TOP):
+        """
+        :return: THE top PathStats, BY TIME SPENT AT THE PATH ITSELF
+        """
+        return sorted(self.stats.values(), key=lambda s: -s.own_seconds)[:top]
+
+    def report(self, top=DEFAULT_TOP):
+        """
+        :return: TEXT TABLE OF THE top HOT PATHS
+        """
+        lines = [
+            f"{'own ms':>10} {'total ms':>10} {'nodes':>10} {'set matches':>12} {'calls':>8} {'raised':>8}  path"
+        ]
+        for s in self.hot(top):
+            lines.append(
+                f"{s.own_seconds * 1000:>10.1f} {s.seconds * 1000:>10.1f} {s.nodes:>10} {s.set_matches:>12}"
+                f" {s.calls:>8} {s.raised:>8}  {_short(s.path) or '.'}"
+            )
+        return "\n".join(lines)
+
+    def _stats(self, path):
+        pattern = self._branch.pattern(path)
+        stats = self.stats.get(pattern)
+        if stats is None:
+            # setdefault(), SO TWO THREADS FINDING A NEW PATH AT ONCE SHARE ONE PathStats
+            stats = self.stats.setdefault(pattern, PathStats(pattern))
+        return stats
+
+
+def profile_at_exit(top=DEFAULT_TOP, file=None):
+    """
+    PROFILE THE REST OF THE PROCESS, AND WRITE THE REPORT WHEN IT EXITS
+    """
+    profile = Profile().__enter__()
+
+    def write():
+        (file or sys.stderr).write("mo-testing profile\n" + profile.report(top) + "\n")
+
+    atexit.register(write)
+    return profile
+
+
+class _Branch:
+    """
+    THE PATTERN OF EACH PATH FROM THE ROOT TO THE LAST PATH SEEN, SO A CHILD'S PATTERN IS ITS PARENT'S PLUS ONE STEP
+    THE COMPARISON IS DEPTH-FIRST, SO ONLY THE PATHS OF THE COMPARISONS IN PROGRESS ARE KEPT
+    paths - (path, pattern) FOR EACH STEP OF THE BRANCH, ROOT FIRST
+    where - id(path) -> INDEX INTO paths
+    """
+
+    __slots__ = ["paths", "where"]
+
+    def __init__(self):
+        self.paths = []
+        self.where = {}
+
+    def pattern(self, path):
+        """
+        :return: JSON-PATH-LIKE TEXT FOR path, WITH [] FOR ANY LIST INDEX
+        """
+        paths, where = self.paths, self.where
+        steps = []
+        pattern = ""
+        keep = 0
+        while path is not None:
+            i = where.get(id(path))
+            if i is not None and paths[i][0] is path:
+                pattern = paths[i][1]
+                keep = i + 1
+                break
+            steps.append(path)
+            path = path[0]
+        for p, _ in paths[keep:]:
+            del where[id(p)]
+        del paths[keep:]
+        for p in reversed(steps):
+            _, step, is_index = p
+            pattern = pattern + "[]" if is_index else pattern + "." + str(step)
+            where[id(p)] = len(paths)
+            paths.append((p, pattern))
+        return pattern
+
+
+_steps = re.compile(r"\[\]|\.[^.\[]*")  # THE STEPS OF A PATH PATTERN
+
+
+def _short(pattern):
+    """
+    :return: pattern, WITH THE MIDDLE STEPS LEFT OUT IF IT HAS MORE THAN MAX_STEPS
+    """
+    steps = _steps.findall(pattern)
+    if len(steps) <= MAX_STEPS:
+        return pattern
+    half = MAX_STEPS // 2
+    return "".join(steps[:half]) + f" ...({len(steps) - MAX_STEPS} steps)... " + "".join(steps[-half:])
+
+
+def _instrument():
+    _original["_start"] = matcher._start
+    _original["_matches"] = matcher._matches
+    _original["COLUMNAR_ROWS"] = matcher.COLUMNAR_ROWS
+    _original["EXACT_FIRST"] = matcher.EXACT_FIRST
+    matcher._start = _start
+    matcher._matches = _matches
+    # RECORDS ARE COMPARED ROW BY ROW, AND EQUAL STRUCTURES ARE WALKED, SO EVERY PATH IS SEEN
+    matcher.COLUMNAR_ROWS = None
+    matcher.EXACT_FIRST = False
+
+
+def _restore():
+    matcher._start = _original.pop("_start")
+    matcher._matches = _original.pop("_matches")
+    matcher.COLUMNAR_ROWS = _original.pop("COLUMNAR_ROWS")
+    matcher.EXACT_FIRST = _original.pop("EXACT_FIRST")
+
+
+def _start(test, plan, path, context):
+    profile = _active[-1]
+    stats = profile._stats(path)
+    stats.nodes += 1
+    if plan.kind is STRUCTURE and plan.is_function:
+        stats.calls += 1
+    running = profile._running
+    running.append(stats)
+    begin = default_timer()
+    try:
+        task = _original["_start"](test, plan, path, context)
+    except Exception:
+        stats.raised += 1
+        _done(running, begin)
+        raise
+    if task is None:
+        _done(running, begin)
+        return None
+    running.pop()
+    return _timed(task, stats, running, begin)
+
+
+def _timed(task, stats, running, begin):
+    # THE CHILDREN OF task RUN WHILE IT IS SUSPENDED; THEIR TIME IS INCLUDED
+    running.append(stats)
+    try:
+        yield from task
+    except Exception:
+        stats.raised += 1
+        raise
+    finally:
+        _done(running, begin)
+
+
+def _done(running, begin):
+    duration = default_timer() - begin
+    stats = running.pop()
+    stats.seconds += duration
+    if running:
+        running[-1].children += duration
+
+
+def _matches(test, plan, path, context):
+    _active[-1]._stats(path).set_matches += 1
+    return _original["_matches"](test, plan, path, context)
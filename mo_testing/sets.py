@@ -0,0 +1,311 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from mo_dots import from_data, is_finite, is_missing
+from mo_future import first, none_type
+from mo_math import is_number
+
+from mo_testing.frozen import FrozenData, FrozenList
+
+UNKNOWN = object()  # NOT A VALUE WE CAN HASH WITH CONFIDENCE
+MAX_UNMATCHED = 10_000  # STREAMED test ELEMENTS KEPT BECAUSE THEY ARE NOT EQUAL TO AN UNUSED expected ELEMENT
+_simple_types = (str, int, float, bool, none_type)
+
+
+class ExpectedSet:
+    """
+    WHAT IS KNOWN ABOUT THE ELEMENTS OF AN expected SET, SO CANDIDATE test ELEMENTS ARE FOUND WITHOUT A FULL SCAN
+    * exact - HASHABLE FORM OF EACH ELEMENT; AN EQUAL test ELEMENT IS A MATCH
+    * field - THE PROPERTY (OR TUPLE POSITION) THAT SPLITS THE ELEMENTS INTO THE MOST BUCKETS
+    * values - THE VALUE EACH ELEMENT REQUIRES AT field, OR UNKNOWN IF IT IS NOT AN EXACT VALUE
+    """
+
+    __slots__ = ["plans", "exact", "field", "values"]
+
+    def __init__(self, plans):
+        self.plans = plans
+        self.exact = [exact_key(p.expected) for p in plans]
+        self.field, self.values = _choose_field(plans)
+
+
+def match_set(tests, expected, matches):
+    """
+    ASSIGN EACH expected ELEMENT ITS OWN test ELEMENT (A BIPARTITE MATCHING)
+    :param tests: list OF test ELEMENTS
+    :param expected: ExpectedSet
+    :param matches: FUNCTION(test, plan) RETURNS True IF THEY MATCH
+    :return: THE FIRST plan WITHOUT A test ELEMENT, OR None IF ALL ARE MATCHED
+    """
+    return _Assignment(tests, expected, matches).solve()
+
+
+def match_stream(tests, expected, matches, path, mismatch):
+    """
+    MATCH EACH test ELEMENT, AS IT ARRIVES, WITH AN UNUSED expected ELEMENT (A MULTISET MATCH)
+    A test ELEMENT EQUAL TO AN UNUSED expected ELEMENT (BY exact_key) TAKES IT, AND IS DROPPED; THE OTHERS ARE KEPT,
+    UP TO MAX_UNMATCHED OF THEM, AND ASSIGNED TO WHAT REMAINS AT THE END, LIKE match_set(), SO ORDER DOES NOT MATTER
+    :param tests: ITERABLE OF test ELEMENTS, CONSUMED ONCE
+    :param expected: ExpectedSet
+    :param matches: FUNCTION(test, plan) RETURNS True IF THEY MATCH
+    :param mismatch: FUNCTION(template, params, path) TO MAKE THE EXCEPTION TO RAISE
+    :return: THE FIRST plan WITHOUT A test ELEMENT, OR None IF ALL ARE MATCHED
+    """
+    plans = expected.plans
+    unused = set(range(len(plans)))
+
+    exact = {}
+    for pi, key in enumerate(expected.exact):
+        if key is not UNKNOWN:
+            try:
+                exact.setdefault(key, []).append(pi)
+            except TypeError:
+                pass
+
+    def claim(test):
+        key = exact_key(from_data(test))
+        if key is UNKNOWN:
+            return False
+        try:
+            found = exact.get(key)
+        except TypeError:
+            return False
+        while found:
+            pi = found.pop()
+            if pi in unused:
+                unused.discard(pi)
+                return True
+        return False
+
+    kept = []
+    first_kept = None
+    rows = 0
+    for test in tests:
+        if rows == len(plans):
+            raise mismatch(
+                "Sets do not match, stream has more than the {count} expected elements", {"count": len(plans)}, path,
+            )
+        if not claim(test):
+            if not kept:
+                first_kept = rows
+            kept.append(test)
+            if len(kept) > MAX_UNMATCHED:
+                raise mismatch(
+                    "Sets do not match, more than {limit} elements of the stream are not equal to an expected element,"
+                    " first at row {row}",
+                    {"limit": MAX_UNMATCHED, "row": first_kept},
+                    path,
+                )
+        rows += 1
+
+    if rows != len(plans):
+        raise mismatch(
+            "Sets do not match, stream has {rows} elements, expecting {count}", {"rows": rows, "count": len(plans)}, path,
+        )
+    if not kept:
+        return None
+    return match_set(kept, ExpectedSet([plans[pi] for pi in sorted(unused)]), matches)
+
+
+class _Assignment:
+    __slots__ = ["tests", "expected", "matches", "edges", "owner", "exact", "buckets", "wildcards"]
+
+    def __init__(self, tests, expected, matches):
+        self.tests = tests
+        self.expected = expected
+        self.matches = matches
+        self.edges = {}  # (plan index, test index) -> bool
+        self.owner = [None] * len(tests)  # test index -> plan index
+
+        self.exact = {}
+        for ti, t in enumerate(tests):
+            key = exact_key(from_data(t))
+            if key is not UNKNOWN:
+                try:
+                    self.exact.setdefault(key, ti)
+                except TypeError:
+                    pass
+
+        self.buckets = {}
+        self.wildcards = []
+        field = expected.field
+        if field is not None:
+            for ti, t in enumerate(tests):
+                value = _test_value(t, field)
+                if value is UNKNOWN:
+                    self.wildcards.append(ti)
+                else:
+                    self.buckets.setdefault(value, []).append(ti)
+
+    def candidates(self, pi):
+        """
+        TEST INDEXES THAT COULD MATCH PLAN pi, MOST LIKELY FIRST
+        """
+        expected = self.expected
+        exact = self.exact.get(expected.exact[pi]) if expected.exact[pi] is not UNKNOWN else None
+        if exact is not None:
+            self.edges[(pi, exact)] = True
+            yield exact
+
+        if expected.field is None or expected.values[pi] is UNKNOWN:
+            yield from range(len(self.tests))
+            return
+
+        bucket = self.buckets.get(expected.values[pi], ())
+        if not self.wildcards:
+            yield from bucket
+        elif not bucket:
+            yield from self.wildcards
+        else:
+            # MERGE, KEEPING THE ORIGINAL ORDER OF tests
+            yield from sorted(bucket + self.wildcards)
+
+    def edge(self, pi, ti):
+        key = (pi, ti)
+        found = self.edges.get(key)
+        if found is None:
+            found = self.edges[key] = self.matches(self.tests[ti], self.expected.plans[pi])
+        return found
+
+    def solve(self):
+        owner = self.owner
+        for pi, plan in enumerate(self.expected.plans):
+            # GREEDY: FIRST FREE test THAT MATCHES
+            for ti in self.candidates(pi):
+                if owner[ti] is None and self.edge(pi, ti):
+                    owner[ti] = pi
+                    break
+            else:
+                if not self.augment(pi):
+                    return plan
+        return None
+
+    def augment(self, root):
+        """
+        FIND A test FOR root BY MOVING OTHER PLANS TO OTHER test ELEMENTS (KUHN'S ALGORITHM, WITHOUT RECURSION)
+        """
+        owner = self.owner
+        visited = set()
+        frames = [[root, self.candidates(root), None]]
+        while frames:
+            frame = frames[-1]
+            pi, todo, _ = frame
+            for ti in todo:
+                if ti in visited or not self.edge(pi, ti):
+                    continue
+                visited.add(ti)
+                frame[2] = ti
+                other = owner[ti]
+                if other is None:
+                    # FLIP THE ALTERNATING PATH
+                    for pi, _, ti in frames:
+                        owner[ti] = pi
+                    return True
+                frames.append([other, self.candidates(other), None])
+                break
+            else:
+                frames.pop()
+        return False
+
+
+def exact_key(value):
+    """
+    :return: HASHABLE FORM OF A PLAIN JSON-LIKE value, OR UNKNOWN
+    TWO VALUES WITH EQUAL KEYS ALWAYS MATCH
+    """
+    _type = value.__class__
+    if _type in _simple_types:
+        return value
+    elif _type is list or _type is tuple or _type is FrozenList:
+        output = []
+        for v in value:
+            k = exact_key(v)
+            if k is UNKNOWN:
+                return UNKNOWN
+            output.append(k)
+        return list, tuple(output)
+    elif _type is dict or _type is FrozenData:
+        output = []
+        for k, v in value.items():
+            if is_missing(k) or _type_of(k) not in _simple_types:
+                return UNKNOWN
+            v = exact_key(v)
+            if v is UNKNOWN:
+                return UNKNOWN
+            output.append((k, v))
+        return dict, frozenset(output)
+    return UNKNOWN
+
+
+def _type_of(value):
+    return value.__class__
+
+
+def _exact_value(value):
+    # True IF A test VALUE MUST EQUAL value TO MATCH IT
+    _type = value.__class__
+    if _type is bool:
+        return True
+    return _type is str and value and not is_number(value)
+
+
+def _is_field_name(k):
+    if _type_of(k) is not str or is_missing(k):
+        return False
+    try:
+        int(k)
+        return False  # get_attr() WOULD ALSO TRY IT AS AN INDEX
+    except ValueError:
+        return True
+
+
+def _choose_field(plans):
+    """
+    :return: (field, values) WHERE field IS (is_index, key) WITH THE MOST DISTINCT EXACT VALUES
+    """
+    columns = {}
+    for pi, plan in enumerate(plans):
+        expected = plan.expected
+        _type = expected.__class__
+        if _type is dict or _type is FrozenData:
+            for k, v in expected.items():
+                if _is_field_name(k) and _exact_value(v):
+                    columns.setdefault((False, k), {})[pi] = v
+        elif (_type is tuple or _type is list or _type is FrozenList) and len(expected) > 1:
+            for i, v in enumerate(expected):
+                if _exact_value(v):
+                    columns.setdefault((True, i), {})[pi] = v
+
+    if not columns:
+        return None, None
+    field, values = max(columns.items(), key=lambda c: len(set(c[1].values())))
+    return field, [values.get(pi, UNKNOWN) for pi in range(len(plans))]
+
+
+def _test_value(test, field):
+    """
+    :return: THE VALUE OF test AT field, IF IT CAN ONLY MATCH AN EQUAL VALUE, OTHERWISE UNKNOWN
+    """
+    is_index, key = field
+    test = from_data(test)
+    _type = test.__class__
+    if is_index:
+        if _type is not list or len(test) < 2:
+            return UNKNOWN
+        value = test[key] if key < len(test) else None
+    else:
+        if _type is not dict:
+            return UNKNOWN
+        value = test.get(key)
+
+    value = from_data(value)
+    while is_finite(value) and len(value) == 1:
+        value = from_data(first(value))
+    if value.__class__ in _simple_types:
+        return value
+    return UNKNOWN
@@ -0,0 +1,101 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import hashlib
+import json
+import mmap
+import os
+from decimal import Decimal
+
+from mo_dots import from_data
+from mo_logs import Log
+from mo_times import dates
+
+from mo_testing.dispatch import TYPES
+from mo_testing.matcher import Matcher
+
+UPDATE = bool(os.environ.get("MO_TESTING_UPDATE_SNAPSHOTS"))  # REWRITE SNAPSHOTS THAT DO NOT MATCH
+EXTENSION = ".snapshot"
+_HASH_SIZE = 64  # HEX DIGITS OF sha256, THE FIRST LINE OF THE FILE
+
+
+def canonical(value):
+    """
+    :return: CANONICAL JSON (bytes) OF value: SORTED KEYS, NO SPACES, SETS SORTED, DATES AS UNIX TIMESTAMPS
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=_default, ensure_ascii=False).encode("utf8")
+
+
+def _default(value):
+    _class = value.__class__
+    info = TYPES[_class]
+    if info.null:
+        return None
+    if info.date:
+        return dates.Date(value).unix
+    if info.set:
+        return sorted(value, key=canonical)
+    if _class is Decimal:
+        return float(value)
+    if info.generator or info.many:
+        return list(value)
+    if not info.plain:
+        return from_data(value)
+    if info.array:
+        return value.tolist()
+    raise TypeError(f"can not snapshot {_class.__name__}")
+
+
+def match_snapshot(value, filename, *, update=None, digits=None, places=None, delta=None, msg=None):
+    """
+    ASSERT value MATCHES THE SNAPSHOT IN filename, USING THE assertAlmostEqual RULES
+    WHEN THE CANONICAL HASH OF value IS THE SAME AS THE SNAPSHOT'S, THE SNAPSHOT IS NOT READ
+    :param update: WRITE value AS THE NEW SNAPSHOT IF IT IS MISSING OR DIFFERENT (DEFAULT MO_TESTING_UPDATE_SNAPSHOTS)
+    """
+    if update is None:
+        update = UPDATE
+    content = canonical(value)
+    digest = hashlib.sha256(content).hexdigest()
+
+    try:
+        with open(filename, "rb") as file:
+            stored = file.read(_HASH_SIZE).decode("ascii")
+    except FileNotFoundError:
+        if not update:
+            Log.error(
+                "snapshot {filename} not found; set MO_TESTING_UPDATE_SNAPSHOTS=1 to write it", filename=filename
+            )
+        stored = None
+
+    if stored == digest:
+        return
+    if update:
+        _write(filename, digest, content)
+        return
+    # COMPARE THE CANONICAL FORM, NOT value: SETS ARE STORED AS SORTED LISTS, AND DATES AS NUMBERS
+    Matcher(_read(filename), digits=digits, places=places, delta=delta)(json.loads(content), msg)
+
+
+def _read(filename):
+    # MAP THE FILE, RATHER THAN READ IT, AND DECODE THE JSON FROM A VIEW OF THE MAP, WITHOUT A COPY OF ITS BYTES
+    with open(filename, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            with memoryview(data)[_HASH_SIZE + 1 :] as view:
+                return json.loads(str(view, "utf8"))
+
+
+def _write(filename, digest, content):
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp = filename + ".tmp"
+    with open(temp, "wb") as file:
+        file.write(digest.encode("ascii") + b"\n")
+        file.write(content)
+    os.replace(temp, filename)
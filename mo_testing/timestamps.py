@@ -0,0 +1,102 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from mo_math import is_integer
+from mo_times import dates
+
+from mo_testing.dispatch import TYPES
+
+MAX_CACHED = 10_000  # MOST TEXTS KEPT, WITH THEIR UNIX TIMESTAMP
+FAST_PATH = True  # PARSE ISO-8601 AND EPOCH TEXT DIRECTLY, NOT BY TRYING EVERY FORMAT mo_times KNOWS
+
+# TEXT WITH THESE WORDS IS RELATIVE TO NOW, SO NEVER CACHED
+_relative = ("now", "today", "eod", "tomorrow", *dates.MILLI_VALUES.keys())
+# A FULL YEAR; WITHOUT ONE, mo_times MAY GUESS THE YEAR, OR THE CENTURY, SO THE TEXT IS NEVER CACHED
+_full_year = re.compile(r"\d{4}")
+_digit = re.compile(r"\d")
+_iso = re.compile(r"\d{4}-\d{2}-\d{2}(?:(T)|[ ])\d{2}:\d{2}:\d{2}(\.\d{1,6})?(Z|[+-]\d{2}:?\d{2})?")
+
+
+def unix(value):
+    """
+    :return: dates.Date(value).unix, WITH TEXT CACHED AND (WHEN FAST_PATH) ISO-8601 AND EPOCH PARSED DIRECTLY
+    RAISE THE SAME AS dates.Date(value) IF value IS NOT A DATE
+    """
+    _class = value.__class__
+    if _class is float or _class is int:
+        return _epoch(float(value))
+    if _class is str and _cacheable(value):
+        result = _text_unix(value)
+        if result is not None:
+            return result
+    return dates.Date(value).unix
+
+
+def parse_unix(value):
+    """
+    :return: dates.parse(value).unix, OR None IF value IS NOT A DATE
+    VALUES THAT CAN NOT BE DATES ARE REJECTED WITHOUT TRYING TO PARSE THEM
+    """
+    _class = value.__class__
+    if _class is str:
+        if not _digit.search(value):
+            lower = value.lower()
+            if not any(r in lower for r in _relative):
+                return None
+        elif _cacheable(value):
+            return _text_unix(value)
+    else:
+        info = TYPES[_class]
+        if info.null or info.data or info.many or info.function:
+            return None
+    try:
+        return dates.parse(value).unix
+    except Exception:
+        return None
+
+
+def _cacheable(text):
+    if not _full_year.search(text):
+        return False
+    lower = text.lower()
+    return not any(r in lower for r in _relative)
+
+
+@lru_cache(maxsize=MAX_CACHED)
+def _text_unix(text):
+    """
+    :return: UNIX TIMESTAMP OF ABSOLUTE text, OR None IF IT IS NOT A DATE
+    """
+    if FAST_PATH:
+        # THE SAME STEPS AS dates.parse(), FOR THE SHAPES THAT HAVE ONLY ONE READING
+        if len(text) in (9, 10, 12, 13) and is_integer(text):
+            return _epoch(float(text))
+        value = text.strip()
+        found = _iso.fullmatch(value)
+        if found is not None:
+            has_t, fraction, zone = found.groups()
+            if has_t or not zone:
+                format = "%Y-%m-%d" + ("T" if has_t else " ") + "%H:%M:%S" + (".%f" if fraction else "")
+                try:
+                    return dates.datetime2unix(datetime.strptime(value, format + ("%z" if zone else "")))
+                except Exception:
+                    pass
+    try:
+        return dates.parse(text).unix
+    except Exception:
+        return None
+
+
+def _epoch(number):
+    # AS dates.parse(): A NUMBER TOO BIG TO BE SECONDS IS MILLISECONDS
+    return number / 1000 if number > 9999999999 else number
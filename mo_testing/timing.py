@@ -0,0 +1,183 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://www.mozilla.org/en-US/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+import atexit
+import json
+import sys
+import tracemalloc
+from time import process_time
+from timeit import default_timer
+from unittest import SkipTest
+
+DEFAULT_TOP = 20  # SLOWEST TESTS SHOWN IN THE REPORT
+FORMAT_VERSION = 1
+
+
+class TestTime:
+    """
+    WHAT ONE RUN OF A TEST COST
+    wall - SECONDS ON THE CLOCK
+    cpu - SECONDS OF CPU USED BY THE PROCESS
+    peak_bytes - MOST MEMORY ALLOCATED AT ONCE, OR None IF THE TEST WAS NOT TRACED
+    outcome - "pass", "fail" OR "skip"
+    """
+
+    __slots__ = ["name", "wall", "cpu", "peak_bytes", "outcome"]
+
+    def __init__(self, name, wall, cpu, peak_bytes, outcome):
+        self.name = name
+        self.wall = wall
+        self.cpu = cpu
+        self.peak_bytes = peak_bytes
+        self.outcome = outcome
+
+    def __data__(self):
+        return {"wall": self.wall, "cpu": self.cpu, "peak_bytes": self.peak_bytes, "outcome": self.outcome}
+
+
+class Timings:
+    """
+    TIME EVERY TEST WRAPPED BY add_error_reporting WHILE ACTIVE
+
+        with Timings(memory=10) as timings:
+            unittest.main(exit=False)
+        print(timings.report())
+        timings.save("timings.json")
+
+    :param memory: TRACE THE PEAK MEMORY OF ONE IN memory TESTS (tracemalloc SLOWS THEM); None FOR NO TRACING
+    """
+
+    def __init__(self, memory=None):
+        self.memory = memory
+        self.tests = {}  # NAME -> TestTime, OF THE LATEST RUN
+        self._count = 0
+        self._previous = None
+
+    def __enter__(self):
+        from mo_testing import fuzzytestcase
+
+        self._previous, fuzzytestcase.TIMINGS = fuzzytestcase.TIMINGS, self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        from mo_testing import fuzzytestcase
+
+        fuzzytestcase.TIMINGS, self._previous = self._previous, None
+
+    def run(self, name, function, args, kwargs):
+        """
+        CALL function, AND RECORD WHAT IT COST AS TEST name
+        """
+        self._count += 1
+        traced = bool(self.memory) and self._count % self.memory == 0
+        started = False
+        before = None  # PEAK BEFORE THE TEST, WHEN tracemalloc.reset_peak() IS MISSING (PYTHON 3.8)
+        if traced:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started = True
+            elif hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+            else:
+                before = tracemalloc.get_traced_memory()[1]
+        outcome = "fail"
+        cpu = process_time()
+        wall = default_timer()
+        try:
+            result = function(*args, **kwargs)
+            outcome = "pass"
+            return result
+        except SkipTest:
+            outcome = "skip"
+            raise
+        finally:
+            wall = default_timer() - wall
+            cpu = process_time() - cpu
+            peak = None
+            if traced:
+                peak = tracemalloc.get_traced_memory()[1]
+                if before is not None and peak <= before:
+                    peak = None  # THE PEAK OF THE TEST IS HIDDEN BY AN EARLIER, HIGHER, ONE
+                if started:
+                    tracemalloc.stop()
+            self.tests[name] = TestTime(name, wall, cpu, peak, outcome)
+
+    def slowest(self, top=DEFAULT_TOP):
+        """
+        :return: LIST OF THE top SLOWEST TestTime
+        """
+        return sorted(self.tests.values(), key=lambda t: t.wall, reverse=True)[:top]
+
+    def report(self, top=DEFAULT_TOP):
+        """
+        :return: TEXT TABLE OF THE top SLOWEST TESTS
+        """
+        total = sum(t.wall for t in self.tests.values())
+        lines = [f"{len(self.tests)} tests in {total:.3f} seconds; the slowest {min(top, len(self.tests))}:"]
+        lines.append(f"{'wall':>10} {'cpu':>10} {'peak MB':>10}  test")
+        for t in self.slowest(top):
+            peak = "" if t.peak_bytes is None else f"{t.peak_bytes / 1e6:.1f}"
+            outcome = "" if t.outcome == "pass" else f" ({t.outcome})"
+            lines.append(f"{t.wall:>10.3f} {t.cpu:>10.3f} {peak:>10}  {t.name}{outcome}")
+        return "\n".join(lines)
+
+    def __data__(self):
+        return {
+            "version": FORMAT_VERSION,
+            "tests": {name: t.__data__() for name, t in sorted(self.tests.items())},
+        }
+
+    def save(self, filename):
+        """
+        WRITE THE TIMINGS AS JSON, FOR shard() IN A LATER RUN
+        """
+        with open(filename, "w") as file:
+            json.dump(self.__data__(), file, indent=2)
+
+
+def load(filename):
+    """
+    :return: dict FROM TEST NAME TO ITS wall SECONDS, FROM A FILE WRITTEN BY Timings.save()
+    """
+    with open(filename) as file:
+        data = json.load(file)
+    return {name: t["wall"] for name, t in data["tests"].items()}
+
+
+def shard(names, count, seconds):
+    """
+    SPLIT THE TESTS INTO count SHARDS THAT TAKE ABOUT THE SAME TIME (LONGEST FIRST, TO THE LEAST BUSY SHARD)
+    :param names: NAMES OF THE TESTS TO RUN
+    :param seconds: dict FROM TEST NAME TO ITS TIME, FROM load(); UNKNOWN TESTS ARE GIVEN THE AVERAGE TIME
+    :return: LIST OF count LISTS OF NAMES
+    """
+    known = [seconds[n] for n in names if n in seconds]
+    default = sum(known) / len(known) if known else 1.0
+    shards = [[] for _ in range(count)]
+    totals = [0.0] * count
+    for name in sorted(names, key=lambda n: (-seconds.get(n, default), n)):
+        i = totals.index(min(totals))
+        shards[i].append(name)
+        totals[i] += seconds.get(name, default)
+    return shards
+
+
+def timing_at_exit(top=DEFAULT_TOP, filename=None, memory=None, file=None):
+    """
+    TIME THE TESTS OF THE REST OF THE PROCESS, AND WRITE THE REPORT (AND filename) WHEN IT EXITS
+    """
+    timings = Timings(memory=memory).__enter__()
+
+    def write():
+        (file or sys.stderr).write("mo-testing timing\n" + timings.report(top) + "\n")
+        if filename:
+            timings.save(filename)
+
+    atexit.register(write)
+    return timings
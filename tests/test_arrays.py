@@ -0,0 +1,86 @@
+from unittest import SkipTest
+
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+from mo_testing.matcher import compile_expected
+
+try:
+    import numpy
+    import pandas
+except ImportError:
+    numpy = pandas = None
+
+
+@add_error_reporting
+class TestArrays(FuzzyTestCase):
+
+    def setUp(self):
+        if numpy is None:
+            raise SkipTest("requires numpy and pandas")
+
+    def test_vector(self):
+        test = (numpy.arange(1000) + 1) * 1.1
+        expected = [(i + 1) * 1.1 + 1e-10 for i in range(1000)]
+        matcher = compile_expected(expected, places=6)
+        matcher(test)
+        matcher(test)
+
+    def test_vector_mismatch(self):
+        test = numpy.arange(1000) * 1.1
+        test[[5, 77, 900]] += 1
+        with self.assertRaises("3 of 1000 elements do not match, starting at index [5, 77, 900]"):
+            assertAlmostEqual(test, [i * 1.1 for i in range(1000)], places=6)
+
+    def test_tolerance(self):
+        test = numpy.array([1.0, 2.0, 3.0])
+        assertAlmostEqual(test, [1.04, 2, 2.96], delta=0.05)
+        assertAlmostEqual(test, [1.004, 2, 2.996], digits=2)
+        with self.assertRaises("index [0]"):
+            assertAlmostEqual(test, [1.1, 2, 3], delta=0.05)
+
+    def test_null_matches_anything(self):
+        assertAlmostEqual(numpy.array([1.5, 2]), [1.5, None])
+        assertAlmostEqual(numpy.array([1.5, 2]), [1.5, float("nan")])
+
+    def test_mixed_expected(self):
+        assertAlmostEqual(numpy.array([1, 2, 3]), [1, lambda v: v == 2, "3"])
+
+    def test_matrix(self):
+        assertAlmostEqual(numpy.array([[1, 2], [3, 4]]), [[1, 2], [3, 4]])
+        with self.assertRaises(Exception):
+            assertAlmostEqual(numpy.array([[1, 2], [3, 4]]), [[1, 2], [3, 5]])
+
+    def test_series(self):
+        assertAlmostEqual(pandas.Series([1.5, None]), [1.5, None])
+        assertAlmostEqual(pandas.Series({"a": 1, "b": 2}), {"a": 1})
+
+    def test_frame_records(self):
+        frame = pandas.DataFrame({"x": [1.0, 2.0, 3.0], "y": ["a", "b", "c"]})
+        assertAlmostEqual(frame, [{"x": 1, "y": "a"}, {"x": 2.0000000001, "y": "b"}, {"y": "c"}], places=6)
+        with self.assertRaises('"b" does not match expected "q"'):
+            assertAlmostEqual(frame, [{"x": 1, "y": "a"}, {"x": 2, "y": "q"}])
+        with self.assertRaises('2 of 6 cells do not match, starting at ["/1/y", "/2/x"]'):
+            assertAlmostEqual(frame, [{"x": 1, "y": "a"}, {"x": 2, "y": "q"}, {"x": 4, "y": "c"}])
+
+    def test_empty_is_missing(self):
+        assertAlmostEqual(numpy.array([]), [])
+        assertAlmostEqual(pandas.DataFrame(), [])
+        with self.assertRaises("[1, 2] is expected to not exist"):
+            assertAlmostEqual(numpy.array([1, 2]), [])
+
+    def test_singleton(self):
+        assertAlmostEqual(pandas.Series([7.0]), [7])
+        assertAlmostEqual(numpy.array([7.0]), [7])
+        with self.assertRaises("[7] does not match expected [8]"):
+            assertAlmostEqual(pandas.Series([7.0]), [8])
+
+    def test_shown_as_list(self):
+        with self.assertRaises('{"a": [1, 3]} does not match expected {"a": [1, 2]}'):
+            assertAlmostEqual({"a": numpy.array([1, 3])}, {"a": [1, 2]})
+        with self.assertRaises("[1, 2] does not match expected 5"):
+            assertAlmostEqual(pandas.Series([1.0, 2.0]), 5)
+
+    def test_frame_columns(self):
+        frame = pandas.DataFrame({"x": [1.0, 2.0, 3.0], "y": ["a", "b", "c"]})
+        assertAlmostEqual(frame, {"x": [1, 2, 3], "y": ["a", "b", "c"]})
+        with self.assertRaises(Exception):
+            assertAlmostEqual(frame, {"z": [1]})
@@ -0,0 +1,92 @@
+from mo_testing.frozen import freeze
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assert_all_almost_equal
+from mo_testing.matcher import compile_expected
+
+
+@add_error_reporting
+class TestBatch(FuzzyTestCase):
+
+    def test_all_match(self):
+        pairs = (({"a": i + 1, "b": i * 1.1}, {"a": i + 1}) for i in range(10_000))
+        assert_all_almost_equal(pairs)
+
+    def test_aggregated(self):
+        pairs = [
+            ({"a": i + 1, "b": "x"}, {"a": i + 1 + (i % 100 == 7), "b": "y" if i == 50 else "x"}) for i in range(1000)
+        ]
+        try:
+            assert_all_almost_equal(pairs, examples=3)
+        except Exception as cause:
+            params = cause.params
+            self.assertEqual(params["failures"], 11)
+            self.assertEqual(params["total"], 1000)
+            self.assertEqual(len(params["examples"]), 3)
+            self.assertEqual(params["examples"][0], {"index": 7, "path": "/a", "expected": "9", "actual": "8"})
+            self.assertTrue(sorted(params["reasons"].values()) == [1, 10])
+            self.assertIn("11 of 1000 pairs do not match", str(cause))
+            self.assertIn("pair 50 /b", str(cause))
+        else:
+            self.fail("expecting an error")
+
+    def test_limit(self):
+        consumed = []
+
+        def pairs():
+            for i in range(1000):
+                consumed.append(i)
+                yield i + 1, -1
+
+        with self.assertRaises("5 of 5 pairs do not match (stopped after 5)"):
+            assert_all_almost_equal(pairs(), limit=5)
+        self.assertEqual(len(consumed), 5)
+
+    def test_compiled(self):
+        expected = compile_expected({"a": 1})
+        assert_all_almost_equal([({"a": 1, "b": i}, expected) for i in range(100)])
+        with self.assertRaises("1 of 2 pairs do not match"):
+            assert_all_almost_equal([({"a": 1}, expected), ({"a": 2}, expected)])
+
+    def test_mutated_expected(self):
+        # THE SAME expected, CHANGED BETWEEN PAIRS, IS PLANNED AGAIN
+        expected = {"a": 1}
+
+        def pairs():
+            for i in range(1, 4):
+                expected["a"] = i
+                yield {"a": i, "b": 0}, expected
+
+        assert_all_almost_equal(pairs())
+
+    def test_frozen_expected(self):
+        expected = freeze({"a": [1, 2]})
+        assert_all_almost_equal([({"a": [1, 2], "b": i}, expected) for i in range(100)])
+
+    def test_compiled_tolerance(self):
+        expected = compile_expected(1.0, digits=1)
+        expected(1.04)
+        assert_all_almost_equal([(1.04, expected), (1.0000001, 1.0)], places=6)
+        with self.assertRaises("1 of 2 pairs"):
+            assert_all_almost_equal([(1.04, expected), (1.04, 1.0)], places=6)
+
+    def test_reasons_are_expanded(self):
+        try:
+            assert_all_almost_equal([({"a": 1.1}, {"a": 1.0}), ({"a": 2.2}, {"a": 2.0})], places=3)
+        except Exception as cause:
+            self.assertEqual(cause.params["reasons"], {"/a: <test> != <expected> within 3 places": 2})
+            self.assertNotIn("{", str(cause))
+        else:
+            self.fail("expecting an error")
+
+    def test_tolerance(self):
+        assert_all_almost_equal([(1.001, 1.0), (2.0, 2.001)], places=2)
+        with self.assertRaises("1 of 2 pairs"):
+            assert_all_almost_equal([(1.001, 1.0), (2.0, 2.1)], places=2)
+
+    def test_msg(self):
+        with self.assertRaises("checking rows"):
+            assert_all_almost_equal([(1, 2)], msg="checking rows")
+
+    def test_each_equal(self):
+        self.assertEachEqual([(1, 1), ({"a": 1}, {"a": 1}), (None, None)])
+        with self.assertRaises("1 of 2 pairs"):
+            self.assertEachEqual([(1, 1), (3, None)])
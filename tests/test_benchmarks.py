@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+
+from mo_testing.benchmarks import WORKLOADS, compare_results, run_benchmarks
+from mo_testing.benchmarks.imports import MODULES, import_time
+from mo_testing.benchmarks.runner import main
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting
+
+
+@add_error_reporting
+class TestBenchmarks(FuzzyTestCase):
+
+    def test_all_workloads_pass(self):
+        results = run_benchmarks(scale=0.01, repeat=1)
+        self.assertEqual(
+            set(results["results"].keys()), {w.name for w in WORKLOADS} | {"import:" + m for m in MODULES}
+        )
+        for result in results["results"].values():
+            self.assertGreater(result["count"], 0)
+            self.assertGreater(result["per_second"], 0)
+            if result["unit"] != "imports":
+                self.assertGreater(result["peak_bytes"], 0)
+        json.dumps(results)
+
+    def test_import_is_lazy(self):
+        # THE COMPARISON ENGINE IS NOT LOADED UNTIL IT IS USED
+        self.assertLess(import_time("mo_testing"), import_time("mo_testing.fuzzytestcase"))
+
+    def test_unknown_workload(self):
+        with self.assertRaises("unknown workloads: nope"):
+            run_benchmarks(["nope"])
+
+    def test_compare(self):
+        baseline = {"scale": 1, "results": {"a": {"seconds": 1.0, "peak_bytes": 100}, "b": {"seconds": 1.0}}}
+        current = {"scale": 1, "results": {"a": {"seconds": 1.1, "peak_bytes": 200}, "b": {"seconds": 2.0}, "c": {}}}
+        self.assertEqual(
+            compare_results(baseline, current, threshold=0.2),
+            [
+                {"name": "a", "measure": "peak_bytes", "baseline": 100, "current": 200, "ratio": 2.0},
+                {"name": "b", "measure": "seconds", "ratio": 2.0},
+            ],
+        )
+        self.assertEqual(len(compare_results(baseline, current, threshold=1.5)), 0)
+        with self.assertRaises("different scale"):
+            compare_results(baseline, {"scale": 2, "results": {}})
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "results.json")
+            self.assertEqual(main(["deep_json", "--scale", "0.01", "--repeat", "1", "--output", output]), 0)
+            with open(output) as file:
+                results = json.load(file)
+            self.assertEqual(results["results"]["deep_json"]["unit"], "nodes")
+
+            # A BASELINE THAT IS IMPOSSIBLY FAST IS A REGRESSION
+            results["results"]["deep_json"]["seconds"] = 1e-12
+            baseline = os.path.join(tmp, "baseline.json")
+            with open(baseline, "w") as file:
+                json.dump(results, file)
+            self.assertEqual(main(["deep_json", "--scale", "0.01", "--repeat", "1", "--baseline", baseline]), 1)
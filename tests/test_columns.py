@@ -0,0 +1,107 @@
+import datetime
+from decimal import Decimal
+
+from mo_dots import Null
+
+from mo_testing import matcher
+from mo_testing.columns import GENERIC, NUMBER, TEXT, VALUE, Records
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+from mo_testing.matcher import Plan
+
+
+def _outcome(test, expected, columnar, **kwargs):
+    previous = matcher.COLUMNAR_ROWS
+    matcher.COLUMNAR_ROWS = 2 if columnar else None
+    try:
+        assertAlmostEqual(test, expected, **kwargs)
+        return None
+    except Exception as cause:
+        return "\n".join(line for line in str(cause).split("\n") if not line.strip().startswith("File"))
+    finally:
+        matcher.COLUMNAR_ROWS = previous
+
+
+def _rows(size=100, changes=None):
+    rows = [
+        {"id": i, "name": "n" + str(i), "value": i * 1.5 + 1, "ok": i % 2 == 0, "tags": ["a", str(i)]}
+        for i in range(size)
+    ]
+    for (i, k), v in (changes or {}).items():
+        rows[i][k] = v
+    return rows
+
+
+@add_error_reporting
+class TestColumns(FuzzyTestCase):
+
+    def same(self, test, expected, **kwargs):
+        row_by_row = _outcome(test, expected, False, **kwargs)
+        columnar = _outcome(test, expected, True, **kwargs)
+        self.assertTrue(row_by_row == columnar, f"{row_by_row}\n!=\n{columnar}")
+        return columnar
+
+    def test_kinds(self):
+        records = Records.of_plan(Plan(_rows(3) + [{"when": datetime.date(2024, 1, 1), "d": Decimal(1)}]))
+        kinds = {c.key: c.kind for c in records.columns}
+        self.assertEqual(kinds, {"id": NUMBER, "name": TEXT, "value": NUMBER, "ok": VALUE, "tags": GENERIC})
+        self.assertTrue(kinds["when"] == VALUE and kinds["d"] == VALUE)
+
+    def test_not_records(self):
+        self.assertIsNone(Records.of_plan(Plan([{"a": 1}, 2])))
+        self.assertIsNone(Records.of_plan(Plan([{"a": 1}, {}])))
+        self.assertIsNone(Records.of_plan(Plan([{"a": 1}, {1: 2}])))
+        self.assertIsNone(Records.of_plan(Plan({1, 2})))
+
+    def test_match(self):
+        expected = _rows()
+        test = [dict(r, extra=1) for r in expected]
+        self.assertIsNone(self.same(test, expected))
+
+    def test_tolerance(self):
+        expected = _rows()
+        test = [dict(r, value=r["value"] * (1 + 1e-9)) for r in expected]
+        self.assertIsNone(self.same(test, expected, places=6))
+        self.assertIn("value", self.same(test, expected, places=12))
+
+    def test_mismatch_is_the_same(self):
+        expected = _rows()
+        changes = [{(40, "name"): "x"}, {(7, "value"): 3}, {(99, "ok"): 1}, {(50, "tags"): ["b"]}, {(3, "id"): None}]
+        for change in changes:
+            test = _rows(changes=change)
+            self.assertIsNotNone(self.same(test, expected))
+
+    def test_first_row_reported(self):
+        test = _rows(changes={(60, "name"): "x", (20, "value"): -1})
+        self.assertIn("-1 != 31", self.same(test, _rows(), places=6))
+
+    def test_free_cells(self):
+        expected = [{"a": None, "b": float("nan"), "c": Null, "d": i + 1} for i in range(10)]
+        test = [{"a": "anything", "b": "x", "c": [1], "d": i + 1.0} for i in range(10)]
+        self.assertIsNone(self.same(test, expected))
+
+    def test_missing_properties(self):
+        expected = [{"a": 1}, {"b": "x"}] * 10
+        test = [{"a": 1, "b": "y"}, {"a": 2, "b": "x"}] * 10
+        self.assertIsNone(self.same(test, expected))
+        self.assertIsNotNone(self.same([{}, {"b": "x"}] * 10, expected))
+
+    def test_lengths(self):
+        expected = _rows(10)
+        self.assertIsNone(self.same(_rows(12), expected))
+        self.assertIsNotNone(self.same(_rows(8), expected))
+
+    def test_loose_matches(self):
+        # CELLS THE COLUMN CAN NOT PROVE ARE LEFT TO THE ENGINE
+        expected = [{"n": 1, "s": "2", "t": 3.0} for _ in range(10)]
+        test = [{"n": "1", "s": 2, "t": True} for _ in range(10)]
+        self.same(test, expected)
+        self.same([{"n": 10 ** 400, "s": "2", "t": 3} for _ in range(10)], expected)
+
+    def test_functions(self):
+        calls = []
+
+        def check(v):
+            calls.append(v)
+
+        self.assertIsNone(self.same([{"a": i} for i in range(10)], [{"a": check} for _ in range(10)]))
+        self.assertEqual(len(calls), 20)
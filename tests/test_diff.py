@@ -0,0 +1,72 @@
+from mo_logs import Except
+
+from mo_testing import matcher
+from mo_testing.diff import pointer, snippet, MAX_SNIPPET
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+
+
+def _difference(test, expected, **kwargs):
+    try:
+        assertAlmostEqual(test, expected, **kwargs)
+    except Exception as cause:
+        return Except.wrap(cause)
+    raise AssertionError("expecting a failure")
+
+
+@add_error_reporting
+class TestDiff(FuzzyTestCase):
+
+    def setUp(self):
+        matcher.DIFF_REPORT = True
+
+    def tearDown(self):
+        matcher.DIFF_REPORT = False
+
+    def test_nested(self):
+        cause = _difference({"a": {"b/c": [1, 2]}, "z": 1}, {"a": {"b/c": [1, 3]}})
+        self.assertEqual(
+            cause.params["difference"],
+            {"path": "/a/b~1c/1", "expected": "3", "actual": "2", "reason": "2 != 3 within 15 places"},
+        )
+        self.assertIn("/a/b~1c/1: expected 3, actual 2", str(cause))
+        self.assertIsNone(cause.cause)
+
+    def test_first_only(self):
+        cause = _difference({"a": 1, "b": 2}, {"a": 0, "b": 0})
+        self.assertEqual(cause.params["difference"]["path"], "/a")
+        self.assertNotIn("/b", str(cause))
+
+    def test_msg(self):
+        cause = _difference([1, 2], [1, 3], msg="rows")
+        self.assertTrue(str(cause).startswith("ERROR: rows\nfirst difference\n  /1:"))
+
+    def test_large_is_bounded(self):
+        test = [{"id": i, "text": "x" * 1000} for i in range(1000)]
+        expected = [{"id": i, "text": "x" * 1000} for i in range(1000)]
+        expected[900]["text"] = "y"
+        cause = _difference(test, expected)
+        d = cause.params["difference"]
+        self.assertEqual(d["path"], "/900/text")
+        self.assertEqual(d["expected"], '"y"')
+        self.assertEqual(len(d["actual"]), MAX_SNIPPET + 3)
+        self.assertLess(len(str(cause).split("\n\tFile")[0]), 1000)
+
+    def test_function(self):
+        cause = _difference({"a": 1}, {"a": lambda v: 1 / 0})
+        self.assertEqual(cause.params["difference"]["reason"], "division by zero")
+
+    def test_set(self):
+        cause = _difference([1, 2], {1, 3})
+        self.assertEqual(cause.params["difference"]["path"], "")
+        self.assertIn("not found", cause.params["difference"]["reason"])
+
+    def test_pointer(self):
+        self.assertEqual(pointer(None), "")
+        self.assertEqual(pointer(((None, "a~b", False), 3, True)), "/a~0b/3")
+
+    def test_snippet(self):
+        self.assertEqual(snippet({"a": [1, None, "b"]}), '{"a": [1, null, "b"]}')
+        cycle = [1]
+        cycle.append(cycle)
+        self.assertEqual(snippet(cycle), "[1, <cycle>]")
+        self.assertEqual(snippet(list(range(1000)), limit=10), "[0, 1, 2, ...")
@@ -0,0 +1,55 @@
+from mo_dots import register_list, register_data, Data, FlatList
+
+from mo_testing.dispatch import TYPES, refresh_types
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+
+
+@add_error_reporting
+class TestDispatch(FuzzyTestCase):
+
+    def test_common_types(self):
+        refresh_types()
+        self.assertTrue(TYPES[dict].data)
+        self.assertTrue(TYPES[list].list)
+        self.assertTrue(TYPES[str].text)
+        self.assertTrue(TYPES[int].number)
+        self.assertFalse(TYPES[bool].number)
+        self.assertFalse(TYPES[Data].plain)
+        self.assertFalse(TYPES[FlatList].plain)
+        self.assertFalse(TYPES[float].plain)
+        self.assertTrue(TYPES[type(None)].null)
+
+    def test_register_list_later(self):
+        class Bag:
+            def __init__(self, *values):
+                self.values = list(values)
+
+            def __iter__(self):
+                return iter(self.values)
+
+            def __len__(self):
+                return len(self.values)
+
+            def __getitem__(self, i):
+                return self.values[i]
+
+        with self.assertRaises(Exception):
+            assertAlmostEqual(Bag(1, 2), [1, 2])
+        register_list(Bag)
+        assertAlmostEqual(Bag(1, 2), [1, 2])
+
+    def test_register_data_later(self):
+        class Record:
+            def __init__(self, **props):
+                self.props = props
+
+            def get(self, key):
+                return self.props.get(key)
+
+            def items(self):
+                return self.props.items()
+
+        self.assertFalse(TYPES[Record].data)
+        register_data(Record)
+        assertAlmostEqual({"a": 1, "b": 2}, Record(a=1))
+        self.assertTrue(TYPES[Record].data)
@@ -0,0 +1,125 @@
+import json
+
+from mo_dots import to_data
+
+from mo_testing import matcher
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+from mo_testing.matcher import Context, Plan, compile_expected, get_tolerance
+
+
+def _outcome(test, expected, exact, **kwargs):
+    try:
+        assertAlmostEqual(test, expected, exact=exact, **kwargs)
+        return None
+    except Exception as cause:
+        return "\n".join(line for line in str(cause).split("\n") if not line.strip().startswith("File"))
+
+
+def _walked(test, expected, exact):
+    # NUMBER OF STRUCTURES THE ENGINE LOOKED INSIDE
+    walked = []
+    original = matcher._walk_memo
+
+    def walk(test, plan, path, context, key):
+        walked.append(plan.expected)
+        return original(test, plan, path, context, key)
+
+    matcher._walk_memo = walk
+    try:
+        (expected if isinstance(expected, matcher.Matcher) else compile_expected(expected, exact=exact))(test)
+    finally:
+        matcher._walk_memo = original
+    return len(walked)
+
+
+class _Unequal:
+    def __eq__(self, other):
+        raise Exception("can not compare")
+
+    __hash__ = object.__hash__
+
+
+@add_error_reporting
+class TestExact(FuzzyTestCase):
+
+    def test_safe(self):
+        self.assertTrue(Plan({"a": [1, "b", None, True, 2.5, (3, 4)], "c": {"d": []}}).exact)
+        self.assertTrue(Plan([]).exact)
+
+    def test_not_safe(self):
+        cyclic = {"a": 1}
+        cyclic["self"] = cyclic
+        for expected in [
+            {"a": lambda v: True},
+            {"a": {1, 2}},
+            {"a": float("nan")},
+            {"": 1},
+            {1: "a"},
+            {"a": to_data({"b": 1})},
+            {"a": [json.JSONDecoder]},
+            cyclic,
+        ]:
+            self.assertFalse(Plan(expected).exact, repr(expected))
+
+    def test_shared_and_deep(self):
+        # == WOULD COMPARE A SHARED STRUCTURE ONCE PER PATH, AND RECURSE AS DEEP AS THE STRUCTURE
+        shared = {"x": [1, 2]}
+        self.assertFalse(Plan({"a": shared, "b": [shared, shared]}).exact)
+        self.assertTrue(Plan(shared).exact)
+        deep = 1
+        for _ in range(matcher.EXACT_DEPTH + 1):
+            deep = [deep, 2]
+        self.assertFalse(Plan(deep).exact)
+        self.assertTrue(Plan(deep[0][0]).exact)
+
+    def test_equal_is_not_walked(self):
+        expected = {"a": 1, "b": [1, 2], "c": {"d": [3, 4]}}
+        test = json.loads(json.dumps(expected))
+        self.assertEqual(_walked(test, expected, True), 0)
+        self.assertEqual(_walked(test, expected, False), 4)
+
+    def test_equal_child_is_not_walked(self):
+        # THE TOP IS NOT EQUAL, BUT ITS CHILDREN ARE
+        expected = {"a": {"x": [1, 2]}, "b": [3, 4]}
+        self.assertEqual(_walked(dict(expected, extra=2), expected, True), 1)
+
+    def test_unsafe_is_walked(self):
+        expected = {"a": {"b": 1}, "c": lambda v: True}
+        self.assertEqual(_walked({"a": {"b": 1}, "c": 2}, expected, True), 1)
+        self.assertEqual(_walked({"a": {"b": 1}, "c": 2}, expected, False), 2)
+
+    def test_fuzzy_rules_still_apply(self):
+        self.assertIsNone(_outcome({"a": 1.0000001, "b": 2, "extra": 3}, {"a": 1, "b": 2}, True, places=6))
+        self.assertIsNone(_outcome({"a": [5]}, {"a": 5}, True))
+        self.assertIsNone(_outcome({"a": None}, {"a": []}, True))
+
+    def test_singleton_of_nothing(self):
+        # [[]] IS A SINGLETON OF AN ABSENT VALUE, WHICH NOTHING EQUAL TO IT MATCHES
+        for expected in [[[]], [[[]]]]:
+            test = json.loads(json.dumps(expected))
+            self.assertIsNotNone(_outcome(test, expected, True))
+            self.assertEqual(_outcome(test, expected, True), _outcome(test, expected, False))
+
+    def test_mismatch_is_the_same(self):
+        expected = {"a": [1, 2, {"b": "c"}], "d": 4}
+        for test in [{"a": [1, 2, {"b": "x"}], "d": 4}, {"a": [1, 2], "d": 4}, {"d": 5}]:
+            walked = _outcome(test, expected, False)
+            exact = _outcome(test, expected, True)
+            self.assertIsNotNone(exact)
+            self.assertTrue(walked == exact, f"{walked}\n!=\n{exact}")
+
+    def test_equality_that_raises(self):
+        value = _Unequal()
+        assertAlmostEqual({"a": value, "b": 1}, {"a": None, "b": 1}, exact=True)
+        with self.assertRaises("can not compare"):
+            assertAlmostEqual({"a": value}, {"a": "b"}, exact=True)
+
+    def test_compiled(self):
+        expected = {"a": [{"b": 1}, {"b": 2}], "c": "d"}
+        match = compile_expected(expected, exact=True)
+        self.assertTrue(all(p.exact for _, _, p in match.plan.items))
+        self.assertEqual(_walked(json.loads(json.dumps(expected)), match, True), 0)
+
+    def test_default(self):
+        self.assertEqual(Context(get_tolerance()).exact, matcher.EXACT_FIRST)
+        self.assertEqual(Context(get_tolerance(), True).exact, True)
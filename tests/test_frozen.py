@@ -0,0 +1,124 @@
+import json
+import pickle
+from array import array
+
+from mo_dots import to_data
+
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+from mo_testing.frozen import FrozenData, FrozenList, freeze, thaw
+from mo_testing.matcher import Plan, compile_expected
+
+
+def _outcome(test, expected, **kwargs):
+    try:
+        assertAlmostEqual(test, expected, **kwargs)
+        return None
+    except Exception as cause:
+        return "\n".join(line for line in str(cause).split("\n") if not line.strip().startswith("File"))
+
+
+def _records(size):
+    return [
+        {"id": i, "name": "n" + str(i % 10), "value": i * 1.5, "tags": ["a", "b"], "series": [i + 0.5, i + 1.5]}
+        for i in range(size)
+    ]
+
+
+EXPECTED = {
+    "a": [1, 2, 3],
+    "b": [1.5, None, "x"],
+    "c": {"d": [], "e": [5], "f": ""},
+    "g": (1, [2.5, 3.5]),
+    "h": {1, 2},
+    "i": None,
+}
+
+
+@add_error_reporting
+class TestFrozen(FuzzyTestCase):
+
+    def test_round_trip(self):
+        frozen = freeze(EXPECTED)
+        self.assertIs(frozen.__class__, FrozenData)
+        self.assertTrue(thaw(frozen) == EXPECTED)
+        self.assertTrue(frozen == EXPECTED)
+
+    def test_packed(self):
+        frozen = freeze({"ints": [1, 2, 3], "floats": [1.5, 2.5], "mixed": [1, 2.5], "bools": [True, False]})
+        self.assertEqual(frozen["ints"].values, array("q", [1, 2, 3]))
+        self.assertEqual(frozen["floats"].values, array("d", [1.5, 2.5]))
+        self.assertIs(frozen["mixed"].values.__class__, tuple)
+        self.assertIs(frozen["bools"].values.__class__, tuple)
+        self.assertIs(freeze([2 ** 70]).values.__class__, tuple)
+
+    def test_shared(self):
+        frozen = freeze(_records(100))
+        self.assertIs(frozen[3]["tags"], frozen[7]["tags"])
+        self.assertIs(frozen[3].shape, frozen[7].shape)
+        self.assertIs(frozen[3]["name"], frozen[13]["name"])
+
+    def test_shared_between_fixtures(self):
+        memo = {}
+        first = freeze(json.loads(json.dumps(_records(10))), memo)
+        second = freeze(json.loads(json.dumps(_records(20))), memo)
+        self.assertIs(first[5], second[5])
+
+    def test_unwraps_data(self):
+        frozen = freeze(to_data({"a": [{"b": 1}], "c": to_data([1, 2])}))
+        self.assertEqual(thaw(frozen), {"a": [{"b": 1}], "c": [1, 2]})
+
+    def test_can_not_freeze(self):
+        cyclic = {"a": 1}
+        cyclic["self"] = cyclic
+        with self.assertRaises("refers back to itself"):
+            freeze(cyclic)
+        with self.assertRaises("generator"):
+            freeze({"a": (i for i in range(3))})
+
+    def test_deep(self):
+        value = 1
+        for i in range(10_000):
+            value = {"v": [value, i]}
+        frozen = freeze(value)
+        assertAlmostEqual(value, frozen)
+        assertAlmostEqual(thaw(frozen), value)
+
+    def test_same_rules(self):
+        frozen = freeze(EXPECTED)
+        for test in [
+            {"a": [1, 2, 3], "b": [1.5, 7, "x"], "c": {"e": 5}, "g": (1, [2.5, 3.5]), "h": [2, 1], "extra": 1},
+            {"a": [1, 2, 4]},
+            {"a": [1, 2, 3], "b": [1.5, None, "y"]},
+            {"a": [1, 2, 3], "b": [1.5000001, None, "x"], "c": {"d": [1]}},
+            {"a": [1, 2, 3], "b": [1.5, None, "x"], "c": {"e": [5], "f": None}, "g": [1, [2.5, 3.5]], "h": {1, 3}},
+        ]:
+            self.assertEqual(_outcome(test, frozen, places=6), _outcome(test, EXPECTED, places=6))
+
+    def test_records(self):
+        expected = _records(100)
+        frozen = freeze(expected)
+        self.assertIsNotNone(Plan(frozen).records)
+        test = [dict(r, extra=1) for r in expected]
+        assertAlmostEqual(test, frozen)
+        test[50]["series"] = [50.5, 0]
+        self.assertEqual(_outcome(test, frozen), _outcome(test, expected))
+
+    def test_compiled(self):
+        matcher = compile_expected(freeze(_records(10)))
+        matcher(_records(10))
+        with self.assertRaises(Exception):
+            matcher(_records(9))
+
+    def test_pickle(self):
+        frozen = freeze(_records(100))
+        copy = pickle.loads(pickle.dumps(frozen))
+        self.assertIs(copy.__class__, FrozenList)
+        self.assertTrue(copy == frozen)
+        self.assertIs(copy[3]["tags"], copy[7]["tags"])
+        self.assertIs(copy[3].shape, frozen[3].shape)
+        assertAlmostEqual(_records(100), copy)
+
+    def test_message(self):
+        problem = _outcome({"a": {"b": 2}}, freeze({"a": {"b": 1, "c": [1, 2]}}))
+        self.assertIn('"c": [1, 2]', problem)
+        self.assertNotIn("FrozenData", problem)
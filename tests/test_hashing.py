@@ -0,0 +1,83 @@
+import datetime
+import random
+
+from mo_dots import to_data
+
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+from mo_testing.hashing import FuzzyHasher, FuzzyIndex, fuzzy_hash
+
+
+@add_error_reporting
+class TestHashing(FuzzyTestCase):
+
+    def test_canonical(self):
+        self.assertEqual(fuzzy_hash({"a": 1, "b": [1, 2]}), fuzzy_hash(to_data({"b": (1, 2), "a": 1.0, "c": None})))
+        self.assertEqual(fuzzy_hash([5]), fuzzy_hash(5))
+        self.assertEqual(fuzzy_hash({1, 2, 3}), fuzzy_hash({3, 2, 1}))
+        self.assertEqual(fuzzy_hash(datetime.datetime(2024, 1, 1)), fuzzy_hash(1704067200))
+        self.assertNotEqual(fuzzy_hash([1, 2]), fuzzy_hash([2, 1]))
+        self.assertEqual(fuzzy_hash({"a": "1"}), fuzzy_hash({"a": 1}), "numeric text is a number")
+        self.assertEqual(fuzzy_hash([True, False]), fuzzy_hash([1, 0]))
+        self.assertNotEqual(fuzzy_hash({"a": "one"}), fuzzy_hash({"a": 1}))
+        self.assertNotEqual(fuzzy_hash(5), fuzzy_hash(500))
+        self.assertNotEqual(fuzzy_hash(5), fuzzy_hash(-5))
+
+    def test_stable(self):
+        # THE SAME IN EVERY PROCESS
+        self.assertEqual(fuzzy_hash({"a": [1, "b"]}), fuzzy_hash({"a": [1, "b"]}))
+        self.assertEqual(fuzzy_hash("text"), 0x7395024C22795EE6)
+
+    def test_close_numbers_are_neighbors(self):
+        rand = random.Random(42)
+        for hasher, spread in [
+            (FuzzyHasher(places=6), lambda x: x * (1 + rand.uniform(-4e-7, 4e-7))),
+            (FuzzyHasher(digits=2), lambda x: x + rand.uniform(-0.0049, 0.0049)),
+            (FuzzyHasher(delta=0.5), lambda x: x + rand.uniform(-0.5, 0.5)),
+        ]:
+            for _ in range(2000):
+                expected = rand.uniform(-1000, 1000)
+                test = spread(expected)
+                assertAlmostEqual(test, expected, places=hasher.places, digits=hasher.digits, delta=hasher.delta)
+                self.assertIn(hasher.hash(test), hasher.neighbors(expected))
+
+    def test_power_of_ten(self):
+        # THE GRID DOES NOT RESTART AT A POWER OF TEN
+        hasher = FuzzyHasher(places=3)
+        assertAlmostEqual(9.9999, 10.0001, places=3)
+        self.assertIn(hasher.hash(9.9999), hasher.neighbors(10.0001))
+        self.assertIn(hasher.hash(10.0001), hasher.neighbors(9.9999))
+
+        rand = random.Random(42)
+        for places in [3, 6, 15]:
+            hasher = FuzzyHasher(places=places)
+            for _ in range(2000):
+                expected = rand.choice([1, -1]) * pow(10, rand.randint(-300, 300))
+                test = expected * (1 + rand.uniform(-1, 1) * pow(10, -places))
+                try:
+                    assertAlmostEqual(test, expected, places=places)
+                except Exception:
+                    continue
+                self.assertIn(hasher.hash(test), hasher.neighbors(expected))
+
+    def test_neighbors_limit(self):
+        hasher = FuzzyHasher(places=3)
+        self.assertEqual(len(hasher.neighbors([1.0005, 2.0005, 3.0005, 4.0005], limit=8)), 8)
+        self.assertEqual(hasher.neighbors("no numbers"), [hasher.hash("no numbers")])
+
+    def test_index(self):
+        index = FuzzyIndex(places=6)
+        for i in range(1000):
+            index.add({"id": i, "v": i * 1.1}, i)
+        self.assertEqual(index.candidates({"id": 500, "v": 550.0000001}), [500])
+        self.assertEqual(index.candidates({"id": 500, "v": 551}), [])
+
+    def test_deep(self):
+        deep = value = []
+        for i in range(20000):
+            value.append([i, []])
+            value = value[-1][-1]
+        self.assertNotEqual(fuzzy_hash(deep), fuzzy_hash([]))
+
+    def test_ambiguous(self):
+        with self.assertRaises("only one of"):
+            FuzzyHasher(places=2, digits=2)
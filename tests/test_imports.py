@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting
+
+
+def _loaded(statement):
+    # MODULES LOADED BY statement, IN A NEW PROCESS
+    code = statement + "; import sys; print(' '.join(sorted(sys.modules)))"
+    return set(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split())
+
+
+@add_error_reporting
+class TestImports(FuzzyTestCase):
+
+    def test_package_is_light(self):
+        loaded = _loaded("import mo_testing")
+        self.assertNotIn("mo_testing.fuzzytestcase", loaded)
+        self.assertNotIn("mo_dots", loaded)
+
+    def test_mocks_without_engine(self):
+        loaded = _loaded("from mo_testing.mocks import mock")
+        self.assertNotIn("mo_testing.matcher", loaded)
+
+    def test_dates_loaded_on_use(self):
+        self.assertNotIn("mo_times", _loaded("from mo_testing import assertAlmostEqual; assertAlmostEqual([1], [1])"))
+        statement = "import datetime; from mo_testing import assertAlmostEqual; assertAlmostEqual('{date}', {expected})"
+        self.assertIn("mo_times", _loaded(statement.format(date="2024-01-01", expected="datetime.date(2024, 1, 1)")))
+
+    def test_lazy_names(self):
+        import mo_testing
+
+        self.assertIs(mo_testing.FuzzyTestCase, FuzzyTestCase)
+        self.assertIn("compile_expected", dir(mo_testing))
+        with self.assertRaises(AttributeError):
+            mo_testing.nothing
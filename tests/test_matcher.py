@@ -0,0 +1,168 @@
+import json
+from decimal import Decimal
+
+from mo_logs import Except
+
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual, assertAlmostEqualValue
+from mo_testing import matcher
+from mo_testing.matcher import Context, Mismatch, Plan, compile_expected, get_tolerance
+
+
+@add_error_reporting
+class TestMatcher(FuzzyTestCase):
+
+    def test_match_many(self):
+        matcher = compile_expected({"a": 1, "b": [1, 2, {"c": "x"}], "d": {3, 4}})
+        for i in range(10):
+            matcher({"a": 1, "b": [1, 2, {"c": "x", "e": i}], "d": [4, 3]})
+
+    def test_mismatch(self):
+        matcher = compile_expected({"a": 1, "b": [1, 2]})
+        matcher({"a": 1, "b": [1, 2]})
+        with self.assertRaises("b="):
+            matcher({"a": 1, "b": [1, 3]})
+        matcher({"a": 1, "b": [1, 2]})
+
+    def test_tolerance(self):
+        matcher = compile_expected(1.0000011, digits=6)
+        matcher(1.000001)
+        with self.assertRaises(Exception):
+            matcher(1.000002)
+
+    def test_ambiguous_tolerance(self):
+        matcher = compile_expected(5.1, places=0, delta=0.1)
+        matcher(5.1)
+        with self.assertRaises(Exception):
+            matcher(5)
+
+    def test_same_as_assert(self):
+        cases = [
+            ({}, {"a": 0}),
+            ([{"a": 1, "b": 3.14}], {"a": 1, "b": 3.14}),
+            ({"a": 1, "b": 3.14}, [{"a": 1, "b": 3.14}, {}]),
+            ([1, 2, 3], {3, 2, 1}),
+            ([1, 2, 3], {2, 1, 4}),
+            (None, []),
+            (0, []),
+            ("5", 5),
+            ("2024-04-19", {"2024-04-19"}),
+            ([[[2, 3]]], [2, 3]),
+            ({"a": [1, 2]}, {"a": lambda v: len(v) == 2 or 1 / 0}),
+            ({"a": [1]}, {"a": lambda v: 1 / 0}),
+        ]
+        for test, expected in cases:
+            self.assertEqual(_outcome(compile_expected(expected), test), _outcome(assertAlmostEqual, test, expected))
+
+    def test_mismatch_rendered_once(self):
+        try:
+            assertAlmostEqual({"a": {"b": [1, 2.5]}}, {"a": {"b": [1, 2.6]}}, msg="hello")
+            self.fail("expecting mismatch")
+        except Mismatch:
+            self.fail("expecting Mismatch to be rendered")
+        except Except as cause:
+            self.assertIn('hellokey "a": key "b": index 1: ', cause)
+            self.assertIn("2.5 != 2.6 within 15 places", cause)
+
+    def test_value_mismatch_is_assertion(self):
+        with self.assertRaises(AssertionError):
+            assertAlmostEqualValue(5.0, 5.1, digits=2)
+
+    def test_numeric_values(self):
+        assertAlmostEqualValue(1.0000000001, 1, places=6)
+        assertAlmostEqualValue(Decimal("1.25"), 1.25)
+        assertAlmostEqualValue(5, "5", places=2, delta=1)  # EQUAL, SO THE AMBIGUITY DOES NOT MATTER
+        assertAlmostEqualValue([3.0], 3)
+        with self.assertRaises(AssertionError):
+            assertAlmostEqualValue(True, 2)
+        with self.assertRaises(AssertionError):
+            assertAlmostEqualValue(None, float("nan"))
+        with self.assertRaises("within 2 decimal places"):
+            assertAlmostEqualValue(1.01, 1, digits=2)
+        with self.assertRaises(TypeError):
+            assertAlmostEqualValue(5.1, 5, places=2, delta=1)
+
+    def test_big_int(self):
+        # TOO BIG FOR A float, SO COMPARED WITH == ONLY
+        assertAlmostEqual(2 ** 1100, 2 ** 1100)
+        compile_expected([1, 2 ** 1100])([1, 2 ** 1100])
+        assertAlmostEqual({"a": 2 ** 1100, "b": 1.0}, {"a": 2 ** 1100, "b": 1})
+
+    def test_failed_alternatives_not_rendered(self):
+        expected = {(i, "x") for i in range(100)}
+        test = [[i, "x"] for i in reversed(range(100))]
+        assertAlmostEqual(test, expected)
+
+    def test_shared_subtrees(self):
+        # 2**40 PATHS, BUT ONLY 40 DISTINCT PAIRS
+        assertAlmostEqual(_dag(40, {"v": 1.0}), _dag(40, {"v": 1}))
+        compile_expected(_dag(40, {"v": 1}))(_dag(40, {"v": 1.0}))
+        with self.assertRaises(Exception):
+            assertAlmostEqual(_dag(40, {"v": 2}), _dag(40, {"v": 1}))
+
+    def test_cycles(self):
+        test = {"x": 1, "y": [1]}
+        test["self"] = test
+        test["y"].append(test)
+        expected = {"x": 1, "y": [1]}
+        expected["self"] = expected
+        expected["y"].append(expected)
+        assertAlmostEqual(test, expected)
+        compile_expected(expected)(test)
+
+    def test_cycle_mismatch(self):
+        test = {"x": 2}
+        test["self"] = test
+        expected = {"x": 1}
+        expected["self"] = expected
+        with self.assertRaises('"self": "<cycle>"'):
+            assertAlmostEqual(test, expected)
+
+    def test_tree_is_forgotten(self):
+        # PAIRS OF A TREE CAN NOT BE SEEN AGAIN, SO ONLY THE CHILDREN OF THE PAIRS BEING COMPARED ARE KEPT
+        expected = [{"a": {"b": {"c": [i, {"d": i}]}}} for i in range(1000)]
+        test = json.loads(json.dumps(expected))
+        context = Context(get_tolerance(), exact=False)
+        largest = []
+        original = matcher._walk_memo
+
+        def walk(test, plan, path, context, key):
+            largest.append(len(context.memo))
+            return original(test, plan, path, context, key)
+
+        matcher._walk_memo = walk
+        try:
+            matcher._compare(test, Plan(expected), None, context)
+        finally:
+            matcher._walk_memo = original
+        self.assertLess(max(largest), len(expected) + 10)
+        self.assertEqual(len(context.memo), 1)
+
+    def test_deep_nesting(self):
+        assertAlmostEqual(_nested(3000, 1.0), _nested(3000, 1))
+        compile_expected(_nested(3000, 1))(_nested(3000, 1.0))
+
+    def test_deep_mismatch(self):
+        with self.assertRaises("more levels"):
+            assertAlmostEqual(_nested(3000, 1), _nested(3000, 2))
+
+
+def _nested(depth, leaf):
+    value = leaf
+    for i in range(depth):
+        value = {"op": "and", "args": [value, {"x": i}]} if i % 2 else [value, i]
+    return value
+
+
+def _dag(depth, leaf):
+    node = leaf
+    for _ in range(depth):
+        node = {"a": node, "b": [node, node]}
+    return node
+
+
+def _outcome(func, *args):
+    try:
+        func(*args)
+        return True
+    except Exception:
+        return False
@@ -0,0 +1,167 @@
+import asyncio
+from threading import Barrier, Thread
+
+from mo_future import mockable
+
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting
+from mo_testing.mocks import Mocking, mock
+
+
+@mockable
+def greet(name):
+    return "hello " + name
+
+
+@mockable
+async def fetch(key):
+    return "real " + key
+
+
+@add_error_reporting
+class TestMocks(FuzzyTestCase):
+
+    def test_value(self):
+        with mock(greet, value="mocked"):
+            self.assertEqual(greet("kyle"), "mocked")
+        self.assertEqual(greet("kyle"), "hello kyle")
+
+    def test_original_restored(self):
+        original = greet.func
+        with mock(greet, value="a"):
+            self.assertNotEqual(greet.func, original)
+        self.assertIs(greet.func, original)
+
+    def test_nested(self):
+        with mock(greet, value="outer"):
+            with mock(greet, function=lambda name: "inner " + name):
+                self.assertEqual(greet("kyle"), "inner kyle")
+            self.assertEqual(greet("kyle"), "outer")
+        self.assertEqual(greet("kyle"), "hello kyle")
+
+    def test_reenter_same(self):
+        m = mock(greet, value="mocked")
+        with m:
+            with m:
+                self.assertEqual(greet("kyle"), "mocked")
+            self.assertEqual(greet("kyle"), "mocked")
+        self.assertEqual(greet("kyle"), "hello kyle")
+
+    def test_decorator(self):
+        @mock(greet, value="mocked")
+        def run(name):
+            return greet(name)
+
+        self.assertEqual(run("kyle"), "mocked")
+        self.assertEqual(run.__name__, "run")
+        self.assertEqual(greet("kyle"), "hello kyle")
+
+    def test_threads_do_not_share(self):
+        barrier = Barrier(2)
+        seen = {}
+
+        def run(name):
+            with mock(greet, value=name):
+                barrier.wait()
+                seen[name] = greet("x")
+                barrier.wait()
+
+        threads = [Thread(target=run, args=(n,)) for n in ("a", "b")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(seen, {"a": "a", "b": "b"})
+        self.assertEqual(greet("kyle"), "hello kyle")
+
+    def test_unmocked_thread(self):
+        seen = []
+        with mock(greet, value="mocked"):
+            t = Thread(target=lambda: seen.append(greet("kyle")))
+            t.start()
+            t.join()
+        self.assertEqual(seen, ["hello kyle"])
+
+    def test_tasks_do_not_share(self):
+        async def run(name):
+            async with mock(fetch, value=name):
+                await asyncio.sleep(0.01)
+                return await fetch("x")
+
+        async def main():
+            return await asyncio.gather(run("a"), run("b"), fetch("c"))
+
+        self.assertEqual(asyncio.run(main()), ["a", "b", "real c"])
+
+    def test_async_decorator(self):
+        async def fake(key):
+            return "fake " + key
+
+        @mock(fetch, function=fake)
+        async def run():
+            return await fetch("x")
+
+        self.assertEqual(asyncio.run(run()), "fake x")
+        self.assertEqual(asyncio.run(fetch("x")), "real x")
+
+    def test_expecting_mockable(self):
+        with self.assertRaises("expecting Mockable"):
+            Mocking(lambda: None, lambda: None)
+
+    def test_record_spy(self):
+        with mock(greet, record=True) as m:
+            self.assertEqual(greet("kyle"), "hello kyle")
+            greet(name="bob")
+        self.assertEqual(len(m.calls), 2)
+        m.calls.assert_called("kyle")
+        m.calls.assert_called(name="bob")
+        m.calls.assert_called_with(name="bob")
+        m.calls.assert_call({"args": ["kyle"], "result": "hello kyle"})
+        m.calls.assert_calls([{"result": "hello kyle"}, {"kwargs": {"name": "bob"}}])
+        with self.assertRaises("none of 2 recorded calls match"):
+            m.calls.assert_called("alice")
+        with self.assertRaises("latest call does not match"):
+            m.calls.assert_called_with(name="alice")
+
+    def test_record_value(self):
+        with mock(greet, value="mocked", record=True) as m:
+            greet("kyle")
+        m.calls.assert_call({"args": ["kyle"], "result": "mocked"})
+
+    def test_record_error(self):
+        def fail(name):
+            raise ValueError("bad " + name)
+
+        with mock(greet, function=fail, record=True) as m:
+            with self.assertRaises(ValueError):
+                greet("kyle")
+        self.assertIsInstance(m.calls.calls[0].error, ValueError)
+
+    def test_not_called(self):
+        m = mock(greet, value=1, record=True)
+        m.calls.assert_not_called()
+        with m:
+            greet("kyle")
+        with self.assertRaises("expecting no calls"):
+            m.calls.assert_not_called()
+
+    def test_ring_buffer(self):
+        with mock(greet, record=True, capacity=10) as m:
+            for i in range(1000):
+                greet(str(i))
+        self.assertEqual(len(m.calls), 1000)
+        self.assertEqual([c.args[0] for c in m.calls.calls], [str(i) for i in range(990, 1000)])
+        self.assertGreater(m.calls.seconds, 0)
+
+    def test_sample(self):
+        with mock(greet, record=True, capacity=5, sample=10) as m:
+            for i in range(95):
+                greet(str(i))
+        self.assertEqual(len(m.calls), 95)
+        self.assertEqual([c.args[0] for c in m.calls.calls], ["50", "60", "70", "80", "90"])
+
+    def test_record_async(self):
+        @mock(fetch, record=True)
+        async def run():
+            return await fetch("x")
+
+        self.assertEqual(asyncio.run(run()), "real x")
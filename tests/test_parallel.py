@@ -0,0 +1,84 @@
+from mo_logs import Except
+
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+from mo_testing.matcher import compile_expected
+from mo_testing import parallel
+from mo_testing.parallel import MIN_SHARD
+
+SIZE = MIN_SHARD * 5
+
+
+def _records(size):
+    return [{"id": i, "value": i * 1.1, "tags": ["a", str(i)]} for i in range(size)]
+
+
+def _failure(test, expected, **kwargs):
+    # THE FAILURE MESSAGE, WITHOUT THE STACK TRACE
+    try:
+        assertAlmostEqual(test, expected, **kwargs)
+    except Exception as cause:
+        return [line for line in str(Except.wrap(cause)).splitlines() if not line.strip().startswith("File ")]
+    raise AssertionError("expecting a failure")
+
+
+def _same(value, expected):
+    if value != expected:
+        raise AssertionError("expecting " + str(expected))
+
+
+@add_error_reporting
+class TestParallel(FuzzyTestCase):
+
+    def test_list(self):
+        assertAlmostEqual(_records(SIZE), _records(SIZE), workers=2)
+        self.assertAlmostEqual(_records(SIZE), _records(SIZE), workers=2)
+
+    def test_dict(self):
+        test = {str(i): {"v": i} for i in range(SIZE)}
+        assertAlmostEqual(test, {str(i): {"v": i} for i in range(0, SIZE, 2)}, workers=2)
+        with self.assertRaises("does not match expected"):
+            assertAlmostEqual(test, {**{str(i): {"v": i} for i in range(SIZE)}, "7": {"v": 8}}, workers=2)
+
+    def test_same_failure_as_serial(self):
+        test = _records(SIZE)
+        test[SIZE - 5]["value"] = 0
+        test[MIN_SHARD * 3 + 1]["tags"] = ["b"]
+        expected = _records(SIZE)
+        serial = _failure(test, expected)
+        self.assertIn(str(MIN_SHARD * 3 + 1), "\n".join(serial))
+        self.assertTrue(_failure(test, expected, workers=3) == serial)
+
+    def test_longer_expected(self):
+        test = _records(SIZE)
+        expected = _records(SIZE + 1)
+        self.assertTrue(_failure(test, expected, workers=2) == _failure(test, expected))
+
+    def test_unpicklable(self):
+        test = list(range(SIZE))
+        expected = [lambda v, i=i: _same(v, i) for i in range(SIZE)]
+        assertAlmostEqual(test, expected, workers=2)
+        expected[SIZE - 1] = lambda v: _same(v, 0)
+        self.assertTrue(_failure(test, expected, workers=2) == _failure(test, expected))
+
+    def test_compiled(self):
+        matcher = compile_expected(_records(SIZE), places=6)
+        matcher(_records(SIZE), workers=2)
+
+    def test_exact(self):
+        assertAlmostEqual(_records(SIZE), _records(SIZE), workers=2, exact=True)
+        test = _records(SIZE)
+        test[SIZE - 3]["id"] = 0
+        expected = _records(SIZE)
+        self.assertTrue(_failure(test, expected, workers=2, exact=True) == _failure(test, expected))
+
+    def test_shutdown(self):
+        assertAlmostEqual(_records(SIZE), _records(SIZE), workers=2)
+        self.assertTrue(parallel._pools)
+        parallel._shutdown()
+        self.assertFalse(parallel._pools)
+        assertAlmostEqual(_records(SIZE), _records(SIZE), workers=2)
+
+    def test_small_is_serial(self):
+        assertAlmostEqual([1, 2, 3], [1, 2, 3], workers=4)
+        with self.assertRaises("does not match expected"):
+            assertAlmostEqual([1, 2, 3], [1, 2, 4], workers=4)
@@ -0,0 +1,84 @@
+import json
+import threading
+
+from mo_testing import matcher
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+from mo_testing.profiler import Profile
+
+
+@add_error_reporting
+class TestProfiler(FuzzyTestCase):
+
+    def test_counts_by_path(self):
+        rows = [{"id": i, "tags": ["b", i + 1], "f": i} for i in range(100)]
+        expected = [{"id": i, "tags": {"b", i + 1.0000001}, "f": lambda v: None} for i in range(100)]
+        with Profile() as profile:
+            assertAlmostEqual(rows, expected, places=5)
+        stats = {s.path: s for s in profile.hot(100)}
+        self.assertEqual(stats[""].nodes, 1)
+        self.assertEqual(stats["[]"].nodes, 100)
+        self.assertEqual(stats["[].f"].calls, 100)
+        self.assertGreater(stats["[].tags"].set_matches, 0)
+        self.assertGreaterEqual(stats[""].seconds, stats["[]"].seconds)
+        self.assertIn("[].tags", profile.report())
+
+    def test_counts_raised(self):
+        with Profile() as profile:
+            with self.assertRaises("does not match"):
+                assertAlmostEqual({"a": [1, {"b": 2}]}, {"a": [1, {"b": 3}]})
+        stats = {s.path: s for s in profile.hot()}
+        # THE SECOND data RULE TRIES "b" AGAIN
+        self.assertEqual(stats[".a[].b"].raised, 2)
+        self.assertEqual(stats[".a[].b"].nodes, 2)
+        self.assertEqual(stats[""].raised, 1)
+
+    def test_restored(self):
+        original = matcher._start
+        with Profile() as outer:
+            with Profile() as inner:
+                assertAlmostEqual([1], [1])
+            self.assertIsNot(matcher._start, original)
+            assertAlmostEqual({"a": 1}, {"a": 1})
+        self.assertIs(matcher._start, original)
+        self.assertIn(".a", [s.path for s in outer.hot()])
+        self.assertNotIn(".a", [s.path for s in inner.hot()])
+
+    def test_long_path(self):
+        deep = 1
+        for i in range(100):
+            deep = {"v": [deep, i]}
+        with Profile() as profile:
+            assertAlmostEqual(json.loads(json.dumps(deep)), deep)
+        report = profile.report()
+        self.assertIn(".v[].v[] ...(192 steps)... .v[].v[]", profile.report(top=1000))
+        self.assertIn(" steps)... ", report)
+        self.assertLess(max(len(line) for line in report.split("\n")), 150)
+
+    def test_threads(self):
+        barrier = threading.Barrier(4)
+
+        def compare():
+            barrier.wait()
+            for _ in range(20):
+                assertAlmostEqual([{"a": [i]} for i in range(50)], [{"a": [i]} for i in range(50)])
+
+        with Profile() as profile:
+            threads = [threading.Thread(target=compare) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        stats = {s.path: s for s in profile.hot(100)}
+        self.assertEqual(stats[""].nodes, 80)
+        for s in stats.values():
+            # EACH THREAD'S CHILDREN ARE TIMED AGAINST ITS OWN PARENTS
+            self.assertGreaterEqual(s.own_seconds, 0, s.path)
+        self.assertEqual(profile._running, [])
+
+    def test_keeps_only_the_branch(self):
+        expected = [{"a": {"b": [i, str(i)]}} for i in range(1000)]
+        with Profile() as profile:
+            assertAlmostEqual(json.loads(json.dumps(expected)), expected)
+        self.assertEqual(profile.stats["[].a.b[]"].nodes, 2000)
+        # ONLY THE PATHS FROM THE ROOT TO THE LAST ONE SEEN
+        self.assertLessEqual(len(profile._branch.paths), 4)
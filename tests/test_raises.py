@@ -0,0 +1,81 @@
+from unittest import mock
+
+from mo_logs import Except, Log
+
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+
+
+@add_error_reporting
+class TestRaises(FuzzyTestCase):
+
+    def test_class_does_not_wrap(self):
+        with mock.patch.object(Except, "wrap", side_effect=AssertionError("wrapped")):
+            with self.assertRaises(ZeroDivisionError):
+                1 / 0
+
+    def test_text_does_not_wrap(self):
+        with mock.patch.object(Except, "wrap", side_effect=AssertionError("wrapped")):
+            with self.assertRaises("division by zero"):
+                1 / 0
+            with self.assertRaises("ZeroDivisionError"):
+                1 / 0
+
+    def test_any_of_many(self):
+        with self.assertRaises(["not this", "nor this", "expected 42"]):
+            Log.error("expected {{value}}", value=42)
+        with self.assertRaises([KeyError, "zero"]):
+            1 / 0
+
+    def test_cause_chain(self):
+        def inner():
+            try:
+                {}["missing"]
+            except Exception as cause:
+                Log.error("outer problem", cause=cause)
+
+        with self.assertRaises("KeyError"):
+            inner()
+        with self.assertRaises("outer problem"):
+            inner()
+
+    def test_native_cause(self):
+        def inner():
+            try:
+                1 / 0
+            except Exception as cause:
+                raise ValueError("bad") from cause
+
+        with self.assertRaises("division by zero"):
+            inner()
+
+    def test_message_params(self):
+        with self.assertRaises("value 42"):
+            Log.error("value {{value}}", value=42)
+
+    def test_severity(self):
+        with self.assertRaises("ERROR"):
+            raise KeyError("x")
+
+    def test_mismatch(self):
+        with self.assertRaises(["Expecting", "not match"]):
+            assertAlmostEqual({"a": list(range(1000))}, {"a": list(range(999)) + [-1]})
+
+    def test_not_raised(self):
+        with self.assertRaises("problem is not raised"):
+            with self.assertRaises(["something else", KeyError]):
+                Log.error("a problem")
+
+    def test_not_raised_explains(self):
+        try:
+            with self.assertRaises("something else"):
+                Log.error("a problem")
+        except Exception as cause:
+            self.assertIn("something else", str(cause))
+            self.assertIn("a problem", str(cause))
+        else:
+            self.fail("expecting an error")
+
+    def test_expecting_an_error(self):
+        with self.assertRaises("Expecting an error"):
+            with self.assertRaises("anything"):
+                pass
@@ -0,0 +1,49 @@
+from mo_dots import to_data
+
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+from mo_testing.matcher import Plan
+from mo_testing.sets import ExpectedSet, exact_key, UNKNOWN
+
+
+@add_error_reporting
+class TestSets(FuzzyTestCase):
+
+    def test_element_not_used_twice(self):
+        # BOTH EXPECTED ELEMENTS MATCH 1.0000001, BUT ONLY ONE CAN HAVE IT
+        with self.assertRaises("not found"):
+            assertAlmostEqual([1.0000001, 7], {1, 1.00000011}, places=5)
+
+    def test_assignment_moves(self):
+        # GREEDY WOULD GIVE "a" TO THE FIRST TUPLE, AND LEAVE NOTHING FOR THE SECOND
+        assertAlmostEqual([["a", 1.0000001], ["a", 2]], {("a", lambda v: True), ("a", 1)}, places=5)
+
+    def test_rows_by_name(self):
+        expected = {to_data({"name": "row" + str(i), "v": i + 1.1}) for i in range(1000)}
+        test = [{"name": "row" + str(i), "v": i + 1.1 + 1e-9, "extra": i} for i in reversed(range(1000))]
+        assertAlmostEqual(test, expected, places=6)
+
+    def test_rows_by_name_mismatch(self):
+        expected = {to_data({"name": "row" + str(i), "v": i + 1.1}) for i in range(100)}
+        test = [{"name": "row" + str(i), "v": i + 1.1 + 1e-9} for i in range(100)]
+        test[40]["name"] = "row"
+        with self.assertRaises("row40"):
+            assertAlmostEqual(test, expected, places=6)
+
+    def test_wildcard_rows(self):
+        # SINGLETON LIST OF A ROW CAN NOT BE BUCKETED, BUT STILL MATCHES
+        expected = {to_data({"name": "a", "v": 1}), to_data({"name": "b", "v": 2})}
+        assertAlmostEqual([[{"name": "b", "v": 2.0}], {"name": "a", "v": 1.0}], expected)
+
+    def test_tuples_by_position(self):
+        expected = {("a", 1.5), ("b", 2.5), ("c", 3.5)}
+        assertAlmostEqual([["c", 3.5000001], ["a", 1.5000001], ["b", 2.5000001]], expected, places=5)
+
+    def test_exact_key(self):
+        self.assertEqual(exact_key({"a": [1, "b"]}), exact_key({"a": (1, "b")}))
+        self.assertIs(exact_key({"": 1}), UNKNOWN)
+        self.assertIs(exact_key(object()), UNKNOWN)
+
+    def test_choose_field(self):
+        index = ExpectedSet([Plan({"type": "x", "id": "1a"}), Plan({"type": "x", "id": "2a"})])
+        self.assertEqual(index.field, (False, "id"))
+        self.assertEqual(index.values, ["1a", "2a"])
@@ -0,0 +1,65 @@
+import datetime
+import os
+import shutil
+import tempfile
+
+from mo_dots import to_data
+
+from mo_testing import snapshots
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting
+from mo_testing.snapshots import canonical, match_snapshot
+
+
+@add_error_reporting
+class TestSnapshots(FuzzyTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def snapshot_directory(self):
+        return self.directory
+
+    def test_missing(self):
+        with self.assertRaises("snapshot"):
+            self.assertMatchesSnapshot({"a": 1}, "missing")
+
+    def test_update_then_match(self):
+        value = {"rows": [{"id": i, "v": i * 1.1} for i in range(100)]}
+        self.assertMatchesSnapshot(value, "rows", update=True)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "rows.snapshot")))
+        self.assertMatchesSnapshot(value, "rows")
+
+    def test_hash_skips_reading(self):
+        filename = os.path.join(self.directory, "a.snapshot")
+        match_snapshot({"a": 1}, filename, update=True)
+        original, snapshots._read = snapshots._read, None
+        try:
+            match_snapshot({"a": 1}, filename)
+        finally:
+            snapshots._read = original
+
+    def test_fuzzy_on_mismatch(self):
+        self.assertMatchesSnapshot({"a": 1.0, "b": [1, 2]}, "fuzzy", update=True)
+        self.assertMatchesSnapshot({"a": 1.0000001, "b": [1, 2], "extra": True}, "fuzzy", places=5)
+        with self.assertRaises("does not match"):
+            self.assertMatchesSnapshot({"a": 1.0, "b": [1, 3]}, "fuzzy")
+
+    def test_set_on_mismatch(self):
+        # THE HASH MISSES, SO THE SET IS COMPARED WITH THE SORTED LIST STORED FOR IT
+        self.assertMatchesSnapshot({"s": {8, 1}, "a": 1.0}, "set", update=True)
+        self.assertMatchesSnapshot({"s": {8, 1}, "a": 1.0000001}, "set", places=5)
+
+    def test_update_replaces(self):
+        self.assertMatchesSnapshot({"a": 1}, "replace", update=True)
+        self.assertMatchesSnapshot({"a": 2}, "replace", update=True)
+        self.assertMatchesSnapshot({"a": 2}, "replace")
+
+    def test_canonical(self):
+        self.assertEqual(canonical({"b": 1, "a": [1, 2]}), canonical(to_data({"a": (1, 2), "b": 1})))
+        self.assertEqual(canonical({"s": {3, 1, 2}}), b'{"s":[1,2,3]}')
+        self.assertEqual(canonical(datetime.datetime(2024, 1, 1)), b"1704067200")
+        with self.assertRaises("can not snapshot"):
+            canonical(object())
@@ -0,0 +1,107 @@
+import tracemalloc
+
+from mo_dots import to_data
+
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+from mo_testing.matcher import compile_expected
+from mo_testing import sets
+
+
+@add_error_reporting
+class TestStreams(FuzzyTestCase):
+
+    def test_ordered(self):
+        assertAlmostEqual(({"a": i, "b": i * 1.1} for i in range(1000)), [{"a": i} for i in range(1000)])
+
+    def test_ordered_mismatch_row(self):
+        with self.assertRaises("stream does not match at row 700"):
+            assertAlmostEqual((i if i != 700 else -1 for i in range(1000)), list(range(1000)))
+
+    def test_stops_at_first_mismatch(self):
+        consumed = []
+
+        def rows():
+            for i in range(1000):
+                consumed.append(i)
+                yield i if i != 10 else -1
+
+        with self.assertRaises("row 10"):
+            assertAlmostEqual(rows(), list(range(1000)))
+        self.assertEqual(len(consumed), 11)
+
+    def test_short_stream(self):
+        with self.assertRaises("row 3"):
+            assertAlmostEqual((i for i in range(3)), [0, 1, 2, 3])
+        assertAlmostEqual((i for i in range(3)), [0, 1, 2, None])
+
+    def test_empty(self):
+        assertAlmostEqual((i for i in range(0)), [])
+        with self.assertRaises("expected to be empty"):
+            assertAlmostEqual((i for i in range(1)), [])
+
+    def test_singleton(self):
+        for test, expected in [([1, 2], [[1, 2]]), ([1, 2], [[[1, 2]]]), ([2, 1], [{1, 2}]), ([5], [5]), ([5], [None])]:
+            assertAlmostEqual(test, expected)
+            assertAlmostEqual((t for t in test), expected)
+        with self.assertRaises("stream does not match at row 1"):
+            assertAlmostEqual((i for i in [1, 3]), [[1, 2]])
+        with self.assertRaises("does not match"):
+            assertAlmostEqual((i for i in [5, 6]), [5])
+
+    def test_one_list(self):
+        # A STREAM OF ONE list IS THAT list, AS A list OF ONE list IS
+        for test, expected in [([set()], set()), ([["1", "a", "b"]], ["1", "a"]), ([[1, 2]], {1, 2})]:
+            assertAlmostEqual(test, expected)
+            assertAlmostEqual((t for t in test), expected)
+        with self.assertRaises("does not match"):
+            assertAlmostEqual((t for t in [[1, 3]]), [1, 2])
+
+    def test_expected_stream(self):
+        assertAlmostEqual((i for i in range(1000)), (float(i) for i in range(1000)))
+        matcher = compile_expected(i for i in range(10))
+        matcher(i for i in range(10))
+        matcher(i for i in range(10))
+
+    def test_unordered(self):
+        expected = {to_data({"name": "row" + str(i), "v": i + 1.1}) for i in range(1000)}
+        assertAlmostEqual(({"name": "row" + str(i), "v": i + 1.1 + 1e-9} for i in range(1000)), expected, places=6)
+
+    def test_unordered_is_not_greedy(self):
+        # 1.00004 IS CLOSE TO BOTH, BUT 0.99997 IS CLOSE ONLY TO 1.0
+        values = [1.00004, 0.99997]
+        assertAlmostEqual(values, {1.0, 1.00008}, digits=4)
+        assertAlmostEqual((v for v in values), {1.0, 1.00008}, digits=4)
+
+    def test_unordered_mismatch(self):
+        with self.assertRaises("not found in stream"):
+            assertAlmostEqual((i for i in [1, 2, 2]), {1, 2, 3})
+        with self.assertRaises("more than the 3 expected"):
+            assertAlmostEqual((i for i in [1, 2, 3, 4]), {1, 2, 3})
+        with self.assertRaises("stream has 2 elements"):
+            assertAlmostEqual((i for i in [1, 2]), {1, 2, 3})
+
+    def test_unmatched_is_bounded(self):
+        old, sets.MAX_UNMATCHED = sets.MAX_UNMATCHED, 5
+        try:
+            with self.assertRaises("first at row 2"):
+                assertAlmostEqual((i for i in [1, 2, -1, -2, -3, -4, -5, -6]), set(range(1, 9)))
+        finally:
+            sets.MAX_UNMATCHED = old
+
+    def test_not_a_list(self):
+        with self.assertRaises("can not accept generators"):
+            assertAlmostEqual((i for i in range(3)), {"a": 1})
+
+    def test_memory_is_bounded(self):
+        def rows():
+            for i in range(5000):
+                yield {"a": i, "b": [i, "x" * 100], "c": {"d": i}}
+
+        tracemalloc.start()
+        try:
+            assertAlmostEqual(rows(), rows())
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # THE ROWS TAKE ABOUT 8MB ALTOGETHER
+        self.assertLess(peak, 1_000_000)
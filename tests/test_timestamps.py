@@ -0,0 +1,77 @@
+import datetime
+
+from mo_times import dates
+
+from mo_testing import timestamps
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting, assertAlmostEqual
+from mo_testing.timestamps import parse_unix, unix
+
+SAMPLES = [
+    "2024-01-02T03:04:05",
+    "2024-01-02T03:04:05.250",
+    "2024-01-02T03:04:05Z",
+    "2024-01-02T03:04:05+05:00",
+    "2024-01-02T03:04:05.5-0130",
+    "2024-01-02 03:04:05",
+    "2024-01-02 03:04:05.123456",
+    " 2024-01-02 03:04:05 ",
+    "2024-01-02",
+    "02/01/2024",
+    "2 Jan 2024",
+    "1700000000",
+    "1700000000123",
+    "170000000",
+    1700000000,
+    1700000000123,
+    1.5,
+    datetime.datetime(2024, 1, 2, 3, 4, 5),
+    datetime.date(2024, 1, 2),
+]
+
+
+@add_error_reporting
+class TestTimestamps(FuzzyTestCase):
+
+    def test_same_as_mo_times(self):
+        for fast in (True, False):
+            timestamps.FAST_PATH = fast
+            timestamps._text_unix.cache_clear()
+            try:
+                for value in SAMPLES:
+                    self.assertTrue(unix(value) == dates.Date(value).unix, f"{value!r} {fast}")
+                    self.assertTrue(parse_unix(value) == dates.parse(value).unix, f"{value!r} {fast}")
+            finally:
+                timestamps.FAST_PATH = True
+
+    def test_cached(self):
+        timestamps._text_unix.cache_clear()
+        for _ in range(100):
+            unix("2024-01-02T03:04:05")
+        info = timestamps._text_unix.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 99))
+
+    def test_relative_not_cached(self):
+        timestamps._text_unix.cache_clear()
+        self.assertIsNotNone(parse_unix("now"))
+        self.assertIsNotNone(parse_unix("today-day"))
+        self.assertIsNotNone(parse_unix("today|day"))
+        self.assertEqual(timestamps._text_unix.cache_info().currsize, 0)
+
+    def test_not_dates(self):
+        for value in ["hello", "", None, {"a": 1}, [1], "12ab", lambda v: v]:
+            self.assertIsNone(parse_unix(value))
+        with self.assertRaises("Can not convert"):
+            unix("2024-99-99 nonsense")
+        with self.assertRaises("Can not convert"):
+            # NOT ONE OF THE FORMATS mo_times KNOWS
+            unix("2024-01-02 03:04:05+05:00")
+
+    def test_compare(self):
+        moment = datetime.datetime(2024, 1, 2, 3, 4, 5)
+        assertAlmostEqual({"when": "2024-01-02T03:04:05"}, {"when": moment})
+        assertAlmostEqual({"when": "2024-01-02 03:04:05"}, {"when": dates.Date(moment).unix})
+        assertAlmostEqual({"when": 1704164645}, {"when": moment})
+        with self.assertRaises("does not match"):
+            assertAlmostEqual({"when": "2024-01-02T03:04:06"}, {"when": moment})
+        with self.assertRaises('"hello" != 1704164645'):
+            assertAlmostEqual("hello", dates.Date(moment).unix)
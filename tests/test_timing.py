@@ -0,0 +1,115 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from unittest import SkipTest
+
+from mo_testing import fuzzytestcase
+from mo_testing.fuzzytestcase import FuzzyTestCase, add_error_reporting
+from mo_testing.timing import Timings, load, shard
+
+
+@add_error_reporting
+class _Sample:
+    def test_fast(self):
+        pass
+
+    def test_slow(self):
+        sum(range(200_000))
+
+    def test_fail(self):
+        raise ValueError("failing on purpose")
+
+    def test_skip(self):
+        raise SkipTest("skipped on purpose")
+
+    def test_big(self):
+        return len([0] * 1_000_000)
+
+
+def _run(test):
+    return getattr(_Sample(), test)()
+
+
+@add_error_reporting
+class TestTiming(FuzzyTestCase):
+
+    def test_disabled(self):
+        self.assertIsNone(fuzzytestcase.TIMINGS)
+        _run("test_fast")
+
+    def test_records(self):
+        with Timings(memory=1) as timings:
+            _run("test_fast")
+            _run("test_slow")
+            with self.assertRaises("failing on purpose"):
+                _run("test_fail")
+            with self.assertRaises(SkipTest):
+                _run("test_skip")
+        self.assertIsNone(fuzzytestcase.TIMINGS)
+        name = __name__ + "._Sample."
+        outcomes = {n: t.outcome for n, t in timings.tests.items()}
+        self.assertEqual(
+            outcomes,
+            {
+                name + "test_fast": "pass",
+                name + "test_slow": "pass",
+                name + "test_fail": "fail",
+                name + "test_skip": "skip",
+            },
+        )
+        self.assertEqual(timings.slowest(1)[0].name, name + "test_slow")
+        self.assertGreater(timings.tests[name + "test_slow"].cpu, 0)
+        self.assertIn("test_slow", timings.report(2))
+        self.assertIn("(fail)", timings.report())
+
+    def test_memory(self):
+        with Timings(memory=2) as timings:
+            _run("test_fast")
+            _run("test_big")
+        self.assertIsNone(timings.tests[__name__ + "._Sample.test_fast"].peak_bytes)
+        self.assertGreater(timings.tests[__name__ + "._Sample.test_big"].peak_bytes, 8_000_000)
+
+    def test_memory_without_reset_peak(self):
+        # PYTHON 3.8 HAS NO tracemalloc.reset_peak()
+        reset_peak = getattr(tracemalloc, "reset_peak", None)
+        if reset_peak is not None:
+            del tracemalloc.reset_peak
+        tracemalloc.start()
+        try:
+            with Timings(memory=1) as timings:
+                _run("test_big")
+        finally:
+            tracemalloc.stop()
+            if reset_peak is not None:
+                tracemalloc.reset_peak = reset_peak
+        self.assertGreater(timings.tests[__name__ + "._Sample.test_big"].peak_bytes, 8_000_000)
+
+    def test_save_and_shard(self):
+        with Timings() as timings:
+            _run("test_fast")
+            _run("test_slow")
+        with tempfile.TemporaryDirectory() as temp:
+            filename = os.path.join(temp, "timings.json")
+            timings.save(filename)
+            with open(filename) as file:
+                self.assertEqual(json.load(file)["version"], 1)
+            seconds = load(filename)
+        self.assertEqual(set(seconds), set(timings.tests))
+
+        shards = shard(["a", "b", "c", "d", "e"], 2, {"a": 10, "b": 6, "c": 5, "d": 1})
+        # e IS UNKNOWN, SO IT IS GIVEN THE AVERAGE OF 5.5 SECONDS
+        self.assertEqual(shards, [["a", "c"], ["b", "e", "d"]])
+
+    def test_environment(self):
+        with tempfile.TemporaryDirectory() as temp:
+            filename = os.path.join(temp, "timings.json")
+            env = dict(os.environ, MO_TESTING_TIMING="3", MO_TESTING_TIMING_FILE=filename)
+            code = "from tests.test_timing import _run; _run('test_fast'); _run('test_slow')"
+            result = subprocess.run(
+                [sys.executable, "-c", code], env=env, capture_output=True, text=True, cwd=os.getcwd()
+            )
+            self.assertIn("mo-testing timing", result.stderr)
+            self.assertEqual(len(load(filename)), 2)